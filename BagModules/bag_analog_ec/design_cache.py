@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+"""This module contains a design result cache shared by schematic modules.
+
+Array schematics call design() with identical parameters on many instances, and each call
+redesigns the whole sub-hierarchy.  Decorating a module's design() method with
+:func:`cached_design` designs each unique (module class, parameters) pair once; later
+instances with the same parameters get a deep copy of the designed state of the first one,
+including the designed child modules, whose parent links point to the new instance.  Only
+project-wide objects, such as the project and the technology information, are shared.
+
+The cache is stored on the top level module of the design hierarchy, found by following
+the parent links, so it only lives for one top level design and never returns results of
+schematic templates or parameters from a previous design.
+"""
+
+from typing import Dict, Any, Callable
+
+import copy
+import inspect
+import functools
+
+# module attributes that depend on the instance location, and are never copied.
+_local_attrs = frozenset(('parent', '_parent', '_design_cache'))
+
+# module attributes shared by reference between all modules of a design.
+_shared_attrs = ('prj', '_prj', 'tech_info', '_tech_info')
+
+
+class _ModuleRef(object):
+    """Placeholder for the designed module in a cached design state."""
+    pass
+
+
+_module_ref = _ModuleRef()
+
+
+def freeze_params(val):
+    # type: (Any) -> Any
+    """Returns a hashable copy of the given parameter value."""
+    if isinstance(val, dict):
+        return tuple(sorted(((key, freeze_params(item)) for key, item in val.items())))
+    if isinstance(val, (list, tuple)):
+        return tuple((freeze_params(item) for item in val))
+    if isinstance(val, set):
+        return frozenset(val)
+    return val
+
+
+def _get_design_cache(module):
+    # type: (Any) -> Dict[Any, Dict[str, Any]]
+    """Returns the design cache of the design hierarchy containing the given module."""
+    root = module
+    while getattr(root, 'parent', None) is not None:
+        root = root.parent
+    cache = root.__dict__.get('_design_cache', None)
+    if cache is None:
+        cache = root.__dict__['_design_cache'] = {}
+    return cache
+
+
+def _copy_state(module, state, src, dst):
+    # type: (Any, Dict[str, Any], Any, Any) -> Dict[str, Any]
+    """Returns a deep copy of the given module state.
+
+    References to src are replaced by dst, so the parent links of the copied child modules
+    point to dst.  Project-wide objects of module are shared, everything else is copied.
+    """
+    memo = {id(src): dst}
+    for attr in _shared_attrs:
+        val = module.__dict__.get(attr, None)
+        if val is not None:
+            memo[id(val)] = val
+    return copy.deepcopy(state, memo)
+
+
+def cached_design(design_fun):
+    # type: (Callable) -> Callable
+    """Decorates a Module.design() method to reuse results of identical parameters.
+
+    Parameters passed to design() are combined with get_default_param_values() and the
+    default arguments of design(), so calls that only differ in omitted default values
+    share the same cache entry.
+
+    Parameters
+    ----------
+    design_fun : Callable
+        the design() method.
+
+    Returns
+    -------
+    wrapper : Callable
+        the cached design() method.
+    """
+    sig = inspect.signature(design_fun)
+    par_list = list(sig.parameters.values())[1:]
+    has_kwargs = any((par.kind == par.VAR_KEYWORD for par in par_list))
+    sig_defaults = {par.name: par.default for par in par_list
+                    if par.default is not par.empty and par.kind != par.VAR_KEYWORD}
+
+    @functools.wraps(design_fun)
+    def wrapper(self, *args, **kwargs):
+        params = dict(sig_defaults)
+        for key, val in self.get_default_param_values().items():
+            if has_kwargs or key in sig.parameters:
+                params[key] = val
+        bound = sig.bind_partial(self, *args, **kwargs)
+        for par in par_list:
+            if par.name in bound.arguments:
+                if par.kind == par.VAR_KEYWORD:
+                    params.update(bound.arguments[par.name])
+                else:
+                    params[par.name] = bound.arguments[par.name]
+
+        cache = _get_design_cache(self)
+        key = (self.__class__, freeze_params(params))
+        state = cache.get(key, None)
+        if state is None:
+            design_fun(self, **params)
+            state = {attr: val for attr, val in self.__dict__.items()
+                     if attr not in _local_attrs}
+            cache[key] = _copy_state(self, state, self, _module_ref)
+        else:
+            self.__dict__.update(_copy_state(self, state, _module_ref, self))
+
+    return wrapper
@@ -2,13 +2,9 @@
 
 from typing import Dict
 
-import os
-import pkg_resources
-
 from bag.design import Module
 
-
-yaml_file = pkg_resources.resource_filename(__name__, os.path.join('netlist_info', 'esd_diode.yaml'))
+from .registry import get_yaml_file
 
 
 # noinspection PyPep8Naming
@@ -19,6 +15,7 @@ class bag_analog_ec__esd_diode(Module):
     """
 
     def __init__(self, bag_config, parent=None, prj=None, **kwargs):
+        yaml_file = get_yaml_file('esd_diode')
         Module.__init__(self, bag_config, yaml_file, parent=parent, prj=prj, **kwargs)
 
     @classmethod
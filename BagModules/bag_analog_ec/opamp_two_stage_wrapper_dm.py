@@ -2,16 +2,10 @@
 
 from typing import Dict
 
-import os
-import pkg_resources
-
 from bag import float_to_si_string
 from bag.design import Module
 
-
-yaml_file = pkg_resources.resource_filename(__name__,
-                                            os.path.join('netlist_info',
-                                                         'opamp_two_stage_wrapper_dm.yaml'))
+from .registry import get_yaml_file
 
 
 # noinspection PyPep8Naming
@@ -22,6 +16,7 @@ class bag_analog_ec__opamp_two_stage_wrapper_dm(Module):
     """
 
     def __init__(self, bag_config, parent=None, prj=None, **kwargs):
+        yaml_file = get_yaml_file('opamp_two_stage_wrapper_dm')
         Module.__init__(self, bag_config, yaml_file, parent=parent, prj=prj, **kwargs)
 
     @classmethod
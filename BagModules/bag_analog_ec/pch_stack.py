@@ -2,14 +2,10 @@
 
 from typing import Dict, Any
 
-import os
-import pkg_resources
-
 from bag.design import Module
 
-
-yaml_file = pkg_resources.resource_filename(__name__, os.path.join('netlist_info',
-                                                                   'pch_stack.yaml'))
+from .design_cache import cached_design
+from .registry import get_yaml_file
 
 
 # noinspection PyPep8Naming
@@ -20,6 +16,7 @@ class bag_analog_ec__pch_stack(Module):
     """
 
     def __init__(self, bag_config, parent=None, prj=None, **kwargs):
+        yaml_file = get_yaml_file('pch_stack')
         Module.__init__(self, bag_config, yaml_file, parent=parent, prj=prj, **kwargs)
 
     @classmethod
@@ -31,6 +28,7 @@ class bag_analog_ec__pch_stack(Module):
             seg='Transistor number of segments.',
             intent='Transistor threshold flavor.',
             stack='Number of stacked transistors in a segment.',
+            compact='True to use one arrayed instance with bus internal nets for stacks.',
         )
 
     @classmethod
@@ -39,9 +37,11 @@ class bag_analog_ec__pch_stack(Module):
         return dict(
             intent='standard',
             stack=1,
+            compact=False,
         )
 
-    def design(self, w, l, seg, intent, stack):
+    @cached_design
+    def design(self, w, l, seg, intent, stack, compact):
         if seg == 1:
             raise ValueError('Cannot make 1 finger transistor.')
 
@@ -52,6 +52,20 @@ class bag_analog_ec__pch_stack(Module):
         term_list = []
         if stack == 1:
             self.instances[inst_name].design(w=w, l=l, nf=seg, intent=intent)
+        elif compact:
+            # one arrayed instance, where bit (idx * seg + seg_idx) is stack level idx.
+            mid_name = 'mid<%d:0>' % ((stack - 1) * seg - 1)
+            if seg == 1:
+                s_name = 'S,%s' % mid_name
+                d_name = '%s,D' % mid_name
+            else:
+                s_name = '<*%d>S,%s' % (seg, mid_name)
+                d_name = '%s,<*%d>D' % (mid_name, seg)
+            name_list.append('%s<%d:0>' % (inst_name, stack * seg - 1))
+            term_list.append(dict(S=s_name, D=d_name))
+
+            self.instances[inst_name].design(w=w, l=l, nf=1, intent=intent)
+            self.array_instance(inst_name, name_list, term_list=term_list)
         else:
             # add stack transistors
             for idx in range(stack):
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""This module resolves and caches the netlist_info YAML files of this library.
+
+YAML file paths are resolved on first use instead of at import time.  Parsed netlist
+structures are cached in memory, validated by the YAML file modification time.
+
+BAG's Module constructor takes a YAML file path and parses it on every instantiation, so
+the parsed netlist cache only serves readers in this package, such as
+:mod:`analog_ec.netlist`.  For the schematic modules, only the import time cost of
+resolving the YAML file paths is saved.
+"""
+
+from typing import Dict, Any, Tuple
+
+import os
+
+import yaml
+
+_netlist_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlist_info')
+
+# cache of parsed netlist structures, from YAML file path to (modification time, netlist).
+_info_cache = {}  # type: Dict[str, Tuple[float, Dict[str, Any]]]
+
+
+def get_yaml_file(cell_name):
+    # type: (str) -> str
+    """Returns the netlist_info YAML file path of the given cell in this library."""
+    return os.path.join(_netlist_dir, '%s.yaml' % cell_name)
+
+
+def load_netlist_info(yaml_file):
+    # type: (str) -> Dict[str, Any]
+    """Returns the parsed netlist structure of the given netlist_info YAML file.
+
+    The returned dictionary is shared between callers and must not be modified.
+
+    Parameters
+    ----------
+    yaml_file : str
+        the netlist_info YAML file path.
+
+    Returns
+    -------
+    info : Dict[str, Any]
+        the parsed netlist structure.
+    """
+    mtime = os.path.getmtime(yaml_file)
+    cache_val = _info_cache.get(yaml_file, None)
+    if cache_val is not None and cache_val[0] == mtime:
+        return cache_val[1]
+
+    with open(yaml_file, 'r') as f:
+        info = yaml.load(f)
+
+    _info_cache[yaml_file] = (mtime, info)
+    return info
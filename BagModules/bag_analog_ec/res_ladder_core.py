@@ -2,14 +2,10 @@
 
 from typing import Dict, Any
 
-import os
-import pkg_resources
-
 from bag.design import Module
 
-
-yaml_file = pkg_resources.resource_filename(__name__, os.path.join('netlist_info',
-                                                                   'res_ladder_core.yaml'))
+from .design_cache import cached_design
+from .registry import get_yaml_file
 
 
 # noinspection PyPep8Naming
@@ -20,6 +16,7 @@ class bag_analog_ec__res_ladder_core(Module):
     """
 
     def __init__(self, bag_config, parent=None, prj=None, **kwargs):
+        yaml_file = get_yaml_file('res_ladder_core')
         Module.__init__(self, bag_config, yaml_file, parent=parent, prj=prj, **kwargs)
 
     @classmethod
@@ -41,6 +38,7 @@ class bag_analog_ec__res_ladder_core(Module):
             sub_name='VSS',
         )
 
+    @cached_design
     def design(self, l, w, intent, nout, ndum, sub_name):
         if ndum < 0 or nout < 2:
             raise ValueError('Illegal values of ndum or npar')
@@ -2,14 +2,10 @@
 
 from typing import Dict, Any
 
-import os
-import pkg_resources
-
 from bag.design import Module
 
-
-yaml_file = pkg_resources.resource_filename(__name__, os.path.join('netlist_info',
-                                                                   'res_ladder_dac.yaml'))
+from .design_cache import cached_design
+from .registry import get_yaml_file
 
 
 # noinspection PyPep8Naming
@@ -20,6 +16,7 @@ class bag_analog_ec__res_ladder_dac(Module):
     """
 
     def __init__(self, bag_config, parent=None, prj=None, **kwargs):
+        yaml_file = get_yaml_file('res_ladder_dac')
         Module.__init__(self, bag_config, yaml_file, parent=parent, prj=prj, **kwargs)
 
     @classmethod
@@ -40,6 +37,7 @@ class bag_analog_ec__res_ladder_dac(Module):
             nout=1,
         )
 
+    @cached_design
     def design(self, nin0, nin1, nout, res_params, mux_params):
         nin = nin0 + nin1
         # rename pins
@@ -1,16 +1,12 @@
 # -*- coding: utf-8 -*-
 
-from typing import Dict, Any
+from typing import Dict, Any, Tuple, List, Sequence
 
-import os
-import pkg_resources
 from itertools import islice
 
 from bag.design import Module
 
-
-yaml_file = pkg_resources.resource_filename(__name__, os.path.join('netlist_info',
-                                                                   'res_ladder_dac_array.yaml'))
+from .registry import get_yaml_file
 
 
 # noinspection PyPep8Naming
@@ -21,6 +17,7 @@ class bag_analog_ec__res_ladder_dac_array(Module):
     """
 
     def __init__(self, bag_config, parent=None, prj=None, **kwargs):
+        yaml_file = get_yaml_file('res_ladder_dac_array')
         Module.__init__(self, bag_config, yaml_file, parent=parent, prj=prj, **kwargs)
 
     @classmethod
@@ -33,6 +30,7 @@ class bag_analog_ec__res_ladder_dac_array(Module):
             res_params='resistor ladder parameters.',
             mux_params='passgate mux parameters.',
             io_name_list='input/output names.',
+            bus_mode='True to use code/out bus pins.  See get_bus_name_table().',
         )
 
     @classmethod
@@ -41,12 +39,44 @@ class bag_analog_ec__res_ladder_dac_array(Module):
         return dict(
             nout=1,
             io_name_list=None,
+            bus_mode=False,
         )
 
-    def design(self, nin0, nin1, nout_arr_list, res_params, mux_params, io_name_list):
+    @classmethod
+    def get_bus_name_table(cls, nin, nout_arr_list, io_name_list):
+        # type: (int, Sequence[Tuple[int, int]], Sequence[str]) -> Dict[str, Tuple[str, List[str]]]
+        """Returns the bus net names of each named input/output in bus mode.
+
+        Parameters
+        ----------
+        nin : int
+            number of select bits per output.
+        nout_arr_list : Sequence[Tuple[int, int]]
+            list of number of outputs and mosaic factor.
+        io_name_list : Sequence[str]
+            input/output names.
+
+        Returns
+        -------
+        name_table : Dict[str, Tuple[str, List[str]]]
+            a dictionary from input/output name to the output net name and the list of code
+            net names, indexed by select bit.
+        """
+        num_io = sum((nout * nx for nout, nx in nout_arr_list))
+        if len(io_name_list) != num_io:
+            raise ValueError('io_name_list has %d names, but DAC array has %d outputs.'
+                             % (len(io_name_list), num_io))
+        return {name: ('out<%d>' % idx, ['code<%d>' % (idx * nin + bit) for bit in range(nin)])
+                for idx, name in enumerate(io_name_list)}
+
+    def design(self, nin0, nin1, nout_arr_list, res_params, mux_params, io_name_list,
+               bus_mode):
         nin = nin0 + nin1
 
-        if io_name_list is None:
+        if io_name_list is None or bus_mode:
+            if io_name_list is not None:
+                # check that every name maps to a bus index
+                self.get_bus_name_table(nin, nout_arr_list, io_name_list)
             name_list, term_list, nout_list = self._get_name_term_code(nin, nout_arr_list)
         else:
             name_list, term_list, nout_list = self._get_name_term(nin, nout_arr_list, io_name_list)
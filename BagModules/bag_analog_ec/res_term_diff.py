@@ -2,14 +2,9 @@
 
 from typing import Dict, Any
 
-import os
-import pkg_resources
-
 from bag.design import Module
 
-
-yaml_file = pkg_resources.resource_filename(__name__, os.path.join('netlist_info',
-                                                                   'res_term_diff.yaml'))
+from .registry import get_yaml_file
 
 
 # noinspection PyPep8Naming
@@ -20,6 +15,7 @@ class bag_analog_ec__res_term_diff(Module):
     """
 
     def __init__(self, bag_config, parent=None, prj=None, **kwargs):
+        yaml_file = get_yaml_file('res_term_diff')
         Module.__init__(self, bag_config, yaml_file, parent=parent, prj=prj, **kwargs)
 
     @classmethod
@@ -96,20 +92,15 @@ class bag_analog_ec__res_term_diff(Module):
                         term_list = None
                     self.array_instance(inst_name, ['%s<%d:0>' % (inst_name, npar - 1)], term_list=term_list)
             else:
-                name_list = []
-                term_list = []
-                for par_idx in range(npar):
-                    if nser == 2:
-                        pos_name = '%s,%s%d' % (in_name, mid_name, par_idx)
-                        neg_name = '%s%d,incm' % (mid_name, par_idx)
-                    else:
-                        pos_name = '%s,%s%d<%d:0>' % (in_name, mid_name, par_idx, nser - 2)
-                        neg_name = '%s%d<%d:0>,incm' % (mid_name, par_idx, nser - 2)
-                    if sub_name and sub_name != 'VSS':
-                        term_dict = dict(PLUS=pos_name, MINUS=neg_name, BULK=sub_name)
-                    else:
-                        term_dict = dict(PLUS=pos_name, MINUS=neg_name)
-                    name_list.append('%s%d<%d:0>' % (inst_name, par_idx, nser - 1))
-                    term_list.append(term_dict)
-
-                self.array_instance(inst_name, name_list, term_list=term_list)
+                # one 2-D arrayed instance, where bit (ser_idx * npar + par_idx) is resistor
+                # ser_idx of branch par_idx, and ser_idx = nser - 1 connects to the input.
+                rep = '' if npar == 1 else '<*%d>' % npar
+                mid_bus = '%s<%d:0>' % (mid_name, (nser - 1) * npar - 1)
+                pos_name = '%s%s,%s' % (rep, in_name, mid_bus)
+                neg_name = '%s,%sincm' % (mid_bus, rep)
+                if sub_name and sub_name != 'VSS':
+                    term_dict = dict(PLUS=pos_name, MINUS=neg_name, BULK=sub_name)
+                else:
+                    term_dict = dict(PLUS=pos_name, MINUS=neg_name)
+                self.array_instance(inst_name, ['%s<%d:0>' % (inst_name, npar * nser - 1)],
+                                    term_list=[term_dict])
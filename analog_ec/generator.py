@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+"""This module contains a layout generation session that shares state across many specs.
+
+A GeneratorSession keeps one BagProject and one TemplateDB for each (library, routing grid)
+pair.  Every spec generated through the same TemplateDB reuses masters created by previous
+specs, so common sub-blocks are only drawn once.
+
+Long-running sessions can reload generator sources.  A reload drops all TemplateDBs and
+removes the packages of the layout generator classes from sys.modules, so they are imported
+again on next use.  The bag package itself is never reloaded.
+"""
+
+from typing import TYPE_CHECKING, Dict, Any, List, Tuple, Sequence, Type, Optional
+
+import os
+import sys
+import time
+import sysconfig
+import importlib
+
+import yaml
+
+from bag.layout import RoutingGrid, TemplateDB
+
+from .verify import get_package_hash
+
+if TYPE_CHECKING:
+    from bag.core import BagProject
+    from bag.layout.template import TemplateBase
+
+
+def load_specs(fname):
+    # type: (str) -> Dict[str, Any]
+    """Read the given YAML specification file."""
+    with open(fname, 'r') as f:
+        return yaml.load(f)
+
+
+def get_template_class(specs):
+    # type: (Dict[str, Any]) -> Type[TemplateBase]
+    """Returns the layout generator class of the given specs.
+
+    The class is given by the layout_package and layout_class entries of the specs.
+    """
+    if 'layout_package' not in specs or 'layout_class' not in specs:
+        raise ValueError('Specs of cell %s must have layout_package and layout_class '
+                         'entries.' % specs.get('impl_cell', ''))
+    mod = importlib.import_module(specs['layout_package'])
+    return getattr(mod, specs['layout_class'])
+
+
+def get_grid_key(grid_specs):
+    # type: (Dict[str, Any]) -> Tuple[Any, ...]
+    """Returns a hashable key of the given routing grid specification."""
+    return (tuple(grid_specs['layers']), tuple(grid_specs['spaces']),
+            tuple(grid_specs['widths']), grid_specs['bot_dir'])
+
+
+class GeneratorSession(object):
+    """A layout generation session that shares TemplateDBs across specs.
+
+    Parameters
+    ----------
+    prj : BagProject
+        the BagProject instance.
+    use_cybagoa : bool
+        True to use cybagoa to write layouts.
+    auto_reload : bool
+        True to reload generator sources that changed since they were imported before
+        every run_job() and batch_generate() call.
+    """
+
+    def __init__(self, prj, use_cybagoa=True, auto_reload=False):
+        # type: (BagProject, bool, bool) -> None
+        self._prj = prj
+        self._use_cybagoa = use_cybagoa
+        self._auto_reload = auto_reload
+        self._db_table = {}  # type: Dict[Tuple[Any, ...], TemplateDB]
+        # source hash of the packages of imported layout generator classes.
+        self._src_hash = {}  # type: Dict[str, str]
+
+    @property
+    def prj(self):
+        # type: () -> BagProject
+        return self._prj
+
+    def reload(self):
+        # type: () -> None
+        """Drop all TemplateDBs and re-import the packages of the layout generator classes.
+
+        Masters and module level caches of the reloaded packages are discarded.  Classes
+        passed to new_template() with temp_cls are not reloaded.
+        """
+        pkg_names = set(self._src_hash.keys())
+        for mod_name in list(sys.modules.keys()):
+            if mod_name.split('.', 1)[0] in pkg_names:
+                del sys.modules[mod_name]
+        self._src_hash.clear()
+        self._db_table.clear()
+
+    def update_sources(self):
+        # type: () -> bool
+        """Reload if any source file of an imported generator package changed.
+
+        Returns
+        -------
+        reloaded : bool
+            True if the sources were reloaded.
+        """
+        for pkg_name, src_hash in self._src_hash.items():
+            if get_package_hash([pkg_name]) != src_hash:
+                self.reload()
+                return True
+        return False
+
+    def _track_sources(self, temp_cls):
+        # type: (Type[TemplateBase]) -> None
+        """Record the source hash of the packages of the given class and its base classes.
+
+        Single modules, standard library packages, and the bag package are not tracked.
+        """
+        paths = sysconfig.get_paths()
+        std_dir = os.path.join(os.path.realpath(paths['stdlib']), '')
+        site_dirs = tuple((os.path.join(os.path.realpath(paths[key]), '')
+                           for key in ('purelib', 'platlib')))
+        for cls in temp_cls.__mro__:
+            pkg_name = cls.__module__.split('.', 1)[0]
+            if pkg_name == 'bag' or pkg_name in self._src_hash:
+                continue
+            pkg_dirs = getattr(sys.modules.get(pkg_name, None), '__path__', None)
+            if pkg_dirs:
+                pkg_dir = os.path.realpath(list(pkg_dirs)[0])
+                if not pkg_dir.startswith(std_dir) or pkg_dir.startswith(site_dirs):
+                    self._src_hash[pkg_name] = get_package_hash([pkg_name])
+
+    def get_template_db(self, impl_lib, grid_specs):
+        # type: (str, Dict[str, Any]) -> TemplateDB
+        """Returns the TemplateDB of the given library and routing grid, creating it if needed.
+
+        Parameters
+        ----------
+        impl_lib : str
+            the layout library name.
+        grid_specs : Dict[str, Any]
+            the routing grid specification.
+
+        Returns
+        -------
+        temp_db : TemplateDB
+            the template database.
+        """
+        key = (impl_lib, get_grid_key(grid_specs))
+        temp_db = self._db_table.get(key, None)
+        if temp_db is None:
+            routing_grid = RoutingGrid(self._prj.tech_info, grid_specs['layers'],
+                                       grid_specs['spaces'], grid_specs['widths'],
+                                       grid_specs['bot_dir'])
+            temp_db = TemplateDB('template_libs.def', routing_grid, impl_lib,
+                                 use_cybagoa=self._use_cybagoa)
+            self._db_table[key] = temp_db
+        return temp_db
+
+    def new_template(self, specs, temp_cls=None):
+        # type: (Dict[str, Any], Optional[Type[TemplateBase]]) -> Tuple[TemplateDB, TemplateBase]
+        """Create the layout master of the given specs.
+
+        Parameters
+        ----------
+        specs : Dict[str, Any]
+            the cell specification dictionary.
+        temp_cls : Optional[Type[TemplateBase]]
+            the layout generator class.  If None, use get_template_class().
+
+        Returns
+        -------
+        temp_db : TemplateDB
+            the template database the master belongs to.
+        master : TemplateBase
+            the layout master.
+        """
+        if temp_cls is None:
+            temp_cls = get_template_class(specs)
+            self._track_sources(temp_cls)
+        temp_db = self.get_template_db(specs['impl_lib'], specs['routing_grid'])
+        return temp_db, temp_db.new_template(params=specs['params'], temp_cls=temp_cls)
+
+    def batch_generate(self, specs_list):
+        # type: (Sequence[Dict[str, Any]]) -> List[Tuple[str, float]]
+        """Generate the layouts of all given specs.
+
+        Masters of all specs are created first, then each TemplateDB writes all of its top
+        cells with a single batch_layout() call.
+
+        Parameters
+        ----------
+        specs_list : Sequence[Dict[str, Any]]
+            list of cell specification dictionaries.
+
+        Returns
+        -------
+        time_list : List[Tuple[str, float]]
+            list of (cell name, master creation time in seconds), followed by one
+            ('<impl_lib>', layout write time in seconds) entry per TemplateDB.
+        """
+        if self._auto_reload:
+            self.update_sources()
+
+        time_list = []
+        db_info = []
+        db_index = {}
+        for specs in specs_list:
+            impl_cell = specs['impl_cell']
+            t0 = time.time()
+            temp_db, master = self.new_template(specs)
+            time_list.append((impl_cell, time.time() - t0))
+
+            idx = db_index.get(id(temp_db), None)
+            if idx is None:
+                idx = db_index[id(temp_db)] = len(db_info)
+                db_info.append((temp_db, specs['impl_lib'], [], []))
+            db_info[idx][2].append(master)
+            db_info[idx][3].append(impl_cell)
+
+        for temp_db, impl_lib, master_list, name_list in db_info:
+            t0 = time.time()
+            temp_db.batch_layout(self._prj, master_list, name_list)
+            time_list.append(('<%s>' % impl_lib, time.time() - t0))
+
+        return time_list
+
+    def run_job(self, job):
+        # type: (Dict[str, Any]) -> Dict[str, Any]
+        """Run a single generation or design job.
+
+        Parameters
+        ----------
+        job : Dict[str, Any]
+            the job dictionary.  The 'specs' entry is the cell specification dictionary.
+            Optional entries are:
+
+            impl_lib : str
+                overrides the output library name of the specs.
+            impl_cell : str
+                overrides the output cell name of the specs.
+            gen_lay : bool
+                True to write the layout.  Defaults to True.
+            gen_sch : bool
+                True to generate the schematic.  Defaults to the opposite of gen_lay.
+            sch_params : Dict[str, Any]
+                schematic parameters of a schematic-only job (gen_lay is False).  If given,
+                no layout master is created, so the specs need no layout_package or
+                layout_class entries.
+
+        Returns
+        -------
+        result : Dict[str, Any]
+            the job result, with the cell bounding box in layout units (None if no layout
+            master is created), the schematic parameters, the generated library/cell names,
+            and the run time in seconds.
+        """
+        if self._auto_reload:
+            self.update_sources()
+
+        specs = job['specs'].copy()
+        for key in ('impl_lib', 'impl_cell'):
+            if key in job:
+                specs[key] = job[key]
+        gen_lay = job.get('gen_lay', True)
+        gen_sch = job.get('gen_sch', not gen_lay)
+
+        impl_lib = specs['impl_lib']
+        impl_cell = specs['impl_cell']
+        t0 = time.time()
+        if not gen_lay and 'sch_params' in job:
+            # schematic-only design job
+            sch_params = job['sch_params']
+            bbox = None
+        else:
+            temp_db, master = self.new_template(specs)
+            if gen_lay:
+                temp_db.batch_layout(self._prj, [master], [impl_cell])
+            sch_params = getattr(master, 'sch_params', None)
+            bnd_box = master.bound_box
+            bbox = [bnd_box.left, bnd_box.bottom, bnd_box.right, bnd_box.top]
+
+        if gen_sch:
+            if sch_params is None:
+                raise ValueError('Layout generator of cell %s has no schematic '
+                                 'parameters.' % impl_cell)
+            dsn = self._prj.create_design_module(specs['sch_lib'], specs['sch_cell'])
+            dsn.design(**sch_params)
+            dsn.implement_design(impl_lib, top_cell_name=impl_cell)
+
+        return dict(
+            impl_lib=impl_lib,
+            impl_cell=impl_cell,
+            bbox=bbox,
+            sch_params=sch_params,
+            layout=gen_lay,
+            schematic=gen_sch,
+            time=time.time() - t0,
+        )
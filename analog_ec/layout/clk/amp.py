@@ -34,12 +34,26 @@ class InvAmp(AnalogBase):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
         AnalogBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
+        self._num_fg = None
+        self._num_fg_dum = None
 
     @property
     def sch_params(self):
         # type: () -> Dict[str, Any]
         return self._sch_params
 
+    @property
+    def num_fg(self):
+        # type: () -> int
+        """Number of transistor fingers drawn, excluding dummies."""
+        return self._num_fg
+
+    @property
+    def num_fg_dum(self):
+        # type: () -> int
+        """Number of dummy transistor fingers.  fill_dummy() fills all unused fingers."""
+        return self._num_fg_dum
+
     @classmethod
     def get_params_info(cls):
         # type: () -> Dict[str, str]
@@ -150,6 +164,8 @@ class InvAmp(AnalogBase):
             seg_dict=seg_dict,
             dum_info=self.get_sch_dummy_info(),
         )
+        self._num_fg = seg_p + seg_n
+        self._num_fg_dum = seg_tot * (len(nw_list) + len(pw_list)) - self._num_fg
 
 
 class NorAmp(AnalogBase):
@@ -174,12 +190,26 @@ class NorAmp(AnalogBase):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
         AnalogBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
+        self._num_fg = None
+        self._num_fg_dum = None
 
     @property
     def sch_params(self):
         # type: () -> Dict[str, Any]
         return self._sch_params
 
+    @property
+    def num_fg(self):
+        # type: () -> int
+        """Number of transistor fingers drawn, excluding dummies."""
+        return self._num_fg
+
+    @property
+    def num_fg_dum(self):
+        # type: () -> int
+        """Number of dummy transistor fingers.  fill_dummy() fills all unused fingers."""
+        return self._num_fg_dum
+
     @classmethod
     def get_params_info(cls):
         # type: () -> Dict[str, str]
@@ -314,3 +344,5 @@ class NorAmp(AnalogBase):
             seg_dict=seg_dict,
             dum_info=self.get_sch_dummy_info(),
         )
+        self._num_fg = seg_invn + seg_enn + seg_invp + seg_enp
+        self._num_fg_dum = seg_tot * (len(nw_list) + len(pw_list)) - self._num_fg
@@ -5,13 +5,14 @@
 from typing import TYPE_CHECKING, Dict, Set, Any
 
 from bag.layout.routing import TrackID, TrackManager
-from bag.layout.digital import StdCellTemplate, StdCellBase
+
+from ..stdcell import StdCellCachedBase
 
 if TYPE_CHECKING:
     from bag.layout.template import TemplateDB
 
 
-class ClkReset(StdCellBase):
+class ClkReset(StdCellCachedBase):
     """Clock receiver startup logic circuit.
 
     Parameters
@@ -31,7 +32,7 @@ class ClkReset(StdCellBase):
 
     def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
-        StdCellBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        StdCellCachedBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
 
     @property
@@ -64,7 +65,6 @@ class ClkReset(StdCellBase):
     def draw_layout(self):
         # type: () -> None
 
-        config_file = self.params['config_file']
         tr_widths = self.params['tr_widths']
         tr_spaces = self.params['tr_spaces']
         top_layer = self.params['top_layer']
@@ -80,12 +80,9 @@ class ClkReset(StdCellBase):
         self.set_draw_boundaries(True)
 
         # create masters
-        tap_params = dict(cell_name='tap_pwr', config_file=config_file)
-        tap_master = self.new_template(params=tap_params, temp_cls=StdCellTemplate)
-        flop_params = dict(cell_name='dff_1x', config_file=config_file)
-        flop_master = self.new_template(params=flop_params, temp_cls=StdCellTemplate)
-        inv_params = dict(cell_name='inv_clk_16x', config_file=config_file)
-        inv_master = self.new_template(params=inv_params, temp_cls=StdCellTemplate)
+        tap_master = self.get_std_master('tap_pwr')
+        flop_master = self.get_std_master('dff_1x')
+        inv_master = self.get_std_master('inv_clk_16x')
 
         # place instances
         flop_ncol = flop_master.std_size[0]
@@ -139,6 +139,7 @@ class ClkInvAmp(TemplateBase):
         cap_master = cap_master.new_template_with(port_idx=(None, cap_outn_tidx))
         capn = self.add_instance(cap_master, 'XCAPN', loc=(0, y_capn), unit_mode=True)
         capp = self.add_instance(cap_master, 'XCAPP', loc=(0, y_capp), orient='MX', unit_mode=True)
+        MOMCapCore.draw_deferred_fill(self, [capn, capp])
 
         # connect wires
         res_inp = res.get_all_port_pins('inp')[0]
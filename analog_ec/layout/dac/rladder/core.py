@@ -3,17 +3,19 @@
 """This module defines the resistor ladder DAC template.
 """
 
-from typing import TYPE_CHECKING, Dict, Set, Any
+from typing import TYPE_CHECKING, Dict, Set, Any, Tuple
 
 from bag.layout.template import TemplateBase
 from bag.layout.util import BBox
 
 from abs_templates_ec.routing.fill import PowerFill
 
-from ...passives.resistor.ladder import ResLadderTop
+from ...passives.resistor.ladder import ResLadder, ResLadderTop
+from ...routing import get_arith_runs, reexport_mosaic_ports
 from .mux_stdcell import RLadderMuxArray
 
 if TYPE_CHECKING:
+    from bag.layout.routing import RoutingGrid, WireArray
     from bag.layout.template import TemplateDB
 
 
@@ -69,6 +71,151 @@ class ResLadderDAC(TemplateBase):
             show_pins=True,
         )
 
+    @classmethod
+    def get_y_offsets(cls, grid, res_warr, mux_warr):
+        # type: (RoutingGrid, WireArray, WireArray) -> Tuple[int, int]
+        """Returns the resistor ladder and mux Y offsets that align their reference tracks.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        res_warr : WireArray
+            the out<1> pin of the resistor ladder.
+        mux_warr : WireArray
+            the in<1> pin of the mux array.
+
+        Returns
+        -------
+        res_yo : int
+            the resistor ladder Y offset, in resolution units.
+        mux_yo : int
+            the mux array Y offset, in resolution units.
+        """
+        tr_pitch = grid.get_track_pitch(mux_warr.layer_id, unit_mode=True)
+        mux_tr = mux_warr.track_id.base_index
+        res_tr = res_warr.track_id.base_index
+        res_yo = int(round(max(mux_tr - res_tr, 0))) * tr_pitch
+        mux_yo = int(round(max(res_tr - mux_tr, 0))) * tr_pitch
+        return res_yo, mux_yo
+
+    @classmethod
+    def get_fill_box(cls, grid, top_layer, fill_config, width, height):
+        # type: (RoutingGrid, int, Dict[int, Any], int, int) -> Tuple[BBox, int, int]
+        """Returns the bounding box of the given size rounded up to whole fill blocks.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box.
+        nfill_x : int
+            number of fill blocks in a row.
+        nfill_y : int
+            number of fill blocks in a column.
+        """
+        blk_w, blk_h = grid.get_fill_size(top_layer, fill_config, unit_mode=True)
+        nfill_x = -(-width // blk_w)  # type: int
+        nfill_y = -(-height // blk_h)  # type: int
+        bnd_box = BBox(0, 0, nfill_x * blk_w, nfill_y * blk_h, grid.resolution, unit_mode=True)
+        return bnd_box, nfill_x, nfill_y
+
+    @classmethod
+    def estimate_size(cls, temp_db, params):
+        # type: (TemplateDB, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        temp_db : TemplateDB
+            the template database.  Used to create the resistor ladder and mux leaf masters.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        return cls.get_size_info(temp_db, params)[0]
+
+    @classmethod
+    def get_size_info(cls, temp_db, params):
+        # type: (TemplateDB, Dict[str, Any]) -> Tuple[BBox, int, int]
+        """Compute the size of this template without drawing it.
+
+        The resistor ladder and mux array sizes come from their estimate_size() methods.
+        The ladder output track is read from the ResLadder leaf, and the mux input track
+        from the mux leaf, since those tracks are set by the resistor array and standard
+        cell placement.  Placement uses get_y_offsets() and get_fill_box(), the same as
+        draw_layout().
+
+        Parameters
+        ----------
+        temp_db : TemplateDB
+            the template database.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        top_layer : int
+            the top layer ID.
+        code_layer : int
+            the code input pin layer ID.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        nin0 = params['nin0']
+        nin1 = params['nin1']
+        fill_config = params['fill_config']
+        nout = params['nout']
+        top_layer = params['top_layer']
+        grid = temp_db.grid
+
+        if nout <= 0:
+            raise ValueError('nout must be positive.')
+
+        num_mux_left = nout // 2
+        num_mux_right = nout - num_mux_left
+
+        r_params = params['res_params'].copy()
+        r_params['nx'] = 2 ** nin0
+        r_params['ny'] = 2 ** nin1
+        r_params['show_pins'] = False
+        res_box = ResLadderTop.estimate_size(temp_db, r_params)
+        # the ResLadder master that ResLadderTop creates in draw_layout()
+        res_leaf = temp_db.new_template(params=r_params, temp_cls=ResLadder)
+        res_warr = res_leaf.get_port('out<1>').get_pins()[0]
+        # ResLadderTop is quantized on the layer above the ladder output/supply layer
+        res_top_layer = res_warr.layer_id + 1
+        sup_layer = res_top_layer + 1
+        if top_layer is None:
+            top_layer = res_top_layer + 1
+        elif top_layer < sup_layer:
+            raise ValueError('top_layer must be >= %d' % sup_layer)
+
+        m_params = params['mux_params'].copy()
+        m_params['col_nbits'] = nin0
+        m_params['row_nbits'] = nin1
+        m_params['top_layer'] = res_top_layer
+        m_params['show_pins'] = False
+        m_params['num_mux'] = num_mux_right
+        rmux_box, mux_warr, code_layer = RLadderMuxArray.get_size_info(temp_db, m_params)
+
+        res_yo, mux_yo = cls.get_y_offsets(grid, res_warr, mux_warr)
+        xo = 0
+        if num_mux_left > 0:
+            m_params['num_mux'] = num_mux_left
+            xo += RLadderMuxArray.estimate_size(temp_db, m_params).width_unit
+        xo += res_box.width_unit + rmux_box.width_unit
+        yo = max(mux_yo + rmux_box.height_unit, res_yo + res_box.height_unit)
+        bnd_box = cls.get_fill_box(grid, top_layer, fill_config, xo, yo)[0]
+        return bnd_box, top_layer, code_layer
+
     def draw_layout(self):
         # type: () -> None
         nin0 = self.params['nin0']
@@ -84,7 +231,6 @@ class ResLadderDAC(TemplateBase):
         if nout <= 0:
             raise ValueError('nout must be positive.')
 
-        res = self.grid.resolution
         num_mux_left = nout // 2
         num_mux_right = nout - num_mux_left
         num_col = 2 ** nin0
@@ -103,6 +249,8 @@ class ResLadderDAC(TemplateBase):
         elif top_layer < sup_layer:
             raise ValueError('top_layer must be >= %d' % sup_layer)
 
+        # the mux fill, tiled or not, stops at the ladder top layer.  The sup_layer fill
+        # is drawn over the whole DAC below.
         m_params = mux_params.copy()
         m_params['col_nbits'] = nin0
         m_params['row_nbits'] = nin1
@@ -118,13 +266,8 @@ class ResLadderDAC(TemplateBase):
         rmux_master = self.new_template(params=m_params, temp_cls=RLadderMuxArray)
 
         # figure out Y coordinates
-        mux_warr = rmux_master.get_port('in<1>').get_pins()[0]
-        pin_layer = mux_warr.layer_id
-        tr_pitch = self.grid.get_track_pitch(pin_layer, unit_mode=True)
-        mux_tr = mux_warr.track_id.base_index
-        res_tr = res_master.get_port('out<1>').get_pins()[0].track_id.base_index
-        res_yo = int(round(max(mux_tr - res_tr, 0))) * tr_pitch
-        mux_yo = int(round(max(res_tr - mux_tr, 0))) * tr_pitch
+        res_yo, mux_yo = self.get_y_offsets(self.grid, res_master.get_port('out<1>').get_pins()[0],
+                                            rmux_master.get_port('in<1>').get_pins()[0])
 
         # place left mux
         sup_table = {'VDD': [], 'VSS': []}
@@ -136,13 +279,12 @@ class ResLadderDAC(TemplateBase):
             # gather supply and re-export inputs
             for port_name, port_list in sup_table.items():
                 port_list.extend(lmux_inst.port_pins_iter(port_name))
-            for mux_idx in range(num_mux_left):
-                self.reexport(lmux_inst.get_port('out<%d>' % mux_idx), show=show_pins)
-                for bit_idx in range(nbits_tot):
-                    self.reexport(lmux_inst.get_port('code<%d>' % (bit_idx + mux_idx * nbits_tot)),
-                                  show=show_pins)
+            reexport_mosaic_ports(self, lmux_inst, 'out', lambda row, col, bit: bit,
+                                  nbits=num_mux_left, show=show_pins)
+            reexport_mosaic_ports(self, lmux_inst, 'code', lambda row, col, bit: bit,
+                                  nbits=num_mux_left * nbits_tot, show=show_pins)
 
-            vref_left = int(round(lmux_inst.get_port('in<1>').get_pins()[0].lower / res))
+            vref_left = min((warr.lower_unit for warr in lmux_inst.get_all_port_pins('in<1>')))
             xo = blk_w
             self.array_box = lmux_inst.array_box
         else:
@@ -155,7 +297,7 @@ class ResLadderDAC(TemplateBase):
         for port_name, port_list in sup_table.items():
             port_list.extend(res_inst.port_pins_iter(port_name))
         if vref_left < 0:
-            vref_left = int(round(res_inst.get_port('out<1>').get_pins()[0].lower / res))
+            vref_left = min((warr.lower_unit for warr in res_inst.get_all_port_pins('out<1>')))
 
         res_w, res_h = self.grid.get_size_dimension(res_master.size, unit_mode=True)
         xo += res_w
@@ -167,28 +309,32 @@ class ResLadderDAC(TemplateBase):
         in_off = num_mux_left * nbits_tot
         for port_name, port_list in sup_table.items():
             port_list.extend(rmux_inst.port_pins_iter(port_name))
-        for mux_idx in range(num_mux_right):
-            old_name = 'out<%d>' % mux_idx
-            new_name = 'out' if nout == 1 else 'out<%d>' % (mux_idx + out_off)
-            self.reexport(rmux_inst.get_port(old_name), net_name=new_name, show=show_pins)
-            for bit_idx in range(nbits_tot):
-                old_name = 'code<%d>' % (bit_idx + mux_idx * nbits_tot)
-                new_name = 'code<%d>' % (bit_idx + mux_idx * nbits_tot + in_off)
-                self.reexport(rmux_inst.get_port(old_name), net_name=new_name, show=show_pins)
-        vref_right = int(round(rmux_inst.get_port('in<1>').get_pins()[0].upper / res))
+        if nout == 1:
+            reexport_mosaic_ports(self, rmux_inst, 'out<0>', lambda row, col, bit: None,
+                                  new_name='out', show=show_pins)
+        else:
+            reexport_mosaic_ports(self, rmux_inst, 'out', lambda row, col, bit: bit + out_off,
+                                  nbits=num_mux_right, show=show_pins)
+        reexport_mosaic_ports(self, rmux_inst, 'code', lambda row, col, bit: bit + in_off,
+                              nbits=num_mux_right * nbits_tot, show=show_pins)
+        vref_right = max((warr.upper_unit for warr in rmux_inst.get_all_port_pins('in<1>')))
 
+        # draw reference wires as arrayed WireArrays, one per arithmetic run of tracks
+        vref_tracks = {}
         for vref_idx in range(2 ** nbits_tot):
-            vref_warr = rmux_inst.get_port('in<%d>' % vref_idx).get_pins()[0]
-            vref_tr = vref_warr.track_id.base_index
-            vref_layer = vref_warr.track_id.layer_id
-            self.add_wires(vref_layer, vref_tr, vref_left, vref_right, unit_mode=True)
+            vref_tid = rmux_inst.get_port('in<%d>' % vref_idx).get_pins()[0].track_id
+            vref_tracks.setdefault(vref_tid.layer_id, []).append(vref_tid.base_index)
+        for vref_layer, tr_list in vref_tracks.items():
+            for run in get_arith_runs(tr_list):
+                tr0 = tr_list[run[0]]
+                pitch = tr_list[run[1]] - tr0 if len(run) > 1 else 0
+                self.add_wires(vref_layer, tr0, vref_left, vref_right, num=len(run), pitch=pitch,
+                               unit_mode=True)
 
         # set size
         yo = max(mux_yo + rmux_h, res_yo + res_h)
+        bnd_box, nfill_x, nfill_y = self.get_fill_box(self.grid, top_layer, fill_config, xo, yo)
         blk_w, blk_h = self.grid.get_fill_size(top_layer, fill_config, unit_mode=True)
-        nfill_x = -(-xo // blk_w)  # type: int
-        nfill_y = -(-yo // blk_h)
-        bnd_box = BBox(0, 0, nfill_x * blk_w, nfill_y * blk_h, res, unit_mode=True)
         self.set_size_from_bound_box(top_layer, bnd_box)
         self.array_box = bnd_box
         self.add_cell_boundary(bnd_box)
@@ -198,8 +344,9 @@ class ResLadderDAC(TemplateBase):
         vss_list = sup_table['VSS']
         flip_fill = (fill_orient_mode & 2 != 0)
         fill_width, fill_space, space, space_le = fill_config[sup_layer]
-        vdd_list, vss_list = self.do_power_fill(sup_layer, space, space_le, vdd_warrs=vdd_list,
-                                                vss_warrs=vss_list, fill_width=fill_width,
+        vdd_list, vss_list = self.do_power_fill(sup_layer, space, space_le,
+                                                vdd_warrs=vdd_list, vss_warrs=vss_list,
+                                                fill_width=fill_width,
                                                 fill_space=fill_space, flip=flip_fill,
                                                 unit_mode=True)
         # add fill cells
@@ -3,14 +3,44 @@
 """This module contains classes for resistor ladder DAC output muxes.
 """
 
-from typing import Dict, Set, Any
+from typing import TYPE_CHECKING, Dict, Set, Any, List, Tuple, Optional
 
+import numpy as np
+
+from bag.layout.util import BBox
 from bag.layout.routing import TrackID
 from bag.layout.template import TemplateDB
-from bag.layout.digital import StdCellTemplate, StdCellBase
+
+from ...routing import get_arith_runs, get_mosaic_pins, reexport_mosaic_ports
+from ...stdcell import StdCellCachedBase, get_std_config
+
+if TYPE_CHECKING:
+    from bag.layout.objects import Instance
+    from bag.layout.routing import WireArray
+    from bag.layout.digital import StdCellBase
+
+
+def get_bit_matrix(num, nbits):
+    # type: (int, int) -> np.ndarray
+    """Returns the binary representation of range(num) as a boolean matrix.
+
+    Entry [idx, bit_idx] is True if bit bit_idx of idx is 1.
+    """
+    return ((np.arange(num)[:, np.newaxis] >> np.arange(nbits)) & 1).astype(bool)
+
+
+def get_interleaved_pins(inst_list, port_name):
+    # type: (List[Instance], str) -> np.ndarray
+    """Returns the pins of two row-interleaved mosaic instances, ordered by row."""
+    pin_arr0 = get_mosaic_pins(inst_list[0], port_name)[:, 0]
+    pin_arr1 = get_mosaic_pins(inst_list[1], port_name)[:, 0]
+    pin_arr = np.empty(pin_arr0.size + pin_arr1.size, dtype=object)
+    pin_arr[0::2] = pin_arr0
+    pin_arr[1::2] = pin_arr1
+    return pin_arr
 
 
-class PassgateRow(StdCellBase):
+class PassgateRow(StdCellCachedBase):
     """A row of passgates.
 
     Parameters
@@ -30,7 +60,7 @@ class PassgateRow(StdCellBase):
 
     def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
-        StdCellBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        StdCellCachedBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
 
     @property
@@ -56,7 +86,6 @@ class PassgateRow(StdCellBase):
     def draw_layout(self):
         # type: () -> None
         col_nbits = self.params['col_nbits']
-        config_file = self.params['config_file']
         show_pins = self.params['show_pins']
 
         # use standard cell routing grid
@@ -65,8 +94,7 @@ class PassgateRow(StdCellBase):
         num_col = 2 ** col_nbits
 
         # get template masters
-        pg_params = dict(cell_name='passgate_2x', config_file=config_file)
-        pg_master = self.new_template(params=pg_params, temp_cls=StdCellTemplate)
+        pg_master = self.get_std_master('passgate_2x')
 
         # add pass gates.
         xo = 0
@@ -101,7 +129,7 @@ class PassgateRow(StdCellBase):
         self._sch_params['nin'] = num_col
 
 
-class InputBuffer(StdCellBase):
+class InputBuffer(StdCellCachedBase):
     """resistor ladder mux input buffers.
 
     Parameters
@@ -121,7 +149,7 @@ class InputBuffer(StdCellBase):
 
     def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
-        StdCellBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        StdCellCachedBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._inv_params = None
 
     @property
@@ -147,14 +175,12 @@ class InputBuffer(StdCellBase):
     def draw_layout(self):
         # type: () -> None
         num_bits = self.params['num_bits']
-        config_file = self.params['config_file']
         show_pins = self.params['show_pins']
 
         # use standard cell routing grid
         self.update_routing_grid()
 
-        inv_params = dict(cell_name='inv_2x', config_file=config_file)
-        inv_master = self.new_template(params=inv_params, temp_cls=StdCellTemplate)
+        inv_master = self.get_std_master('inv_2x')
 
         port_layer = inv_master.get_port('O').get_pins()[0].layer_id + 1
         num_tracks = inv_master.get_num_tracks(port_layer)
@@ -191,7 +217,7 @@ class InputBuffer(StdCellBase):
         self._inv_params = inv_master.sch_params
 
 
-class RowDecoder(StdCellBase):
+class RowDecoder(StdCellCachedBase):
     """The row decoder.
 
     Parameters
@@ -211,7 +237,7 @@ class RowDecoder(StdCellBase):
 
     def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
-        StdCellBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        StdCellCachedBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._dec_params = None
 
     @property
@@ -237,7 +263,6 @@ class RowDecoder(StdCellBase):
     def draw_layout(self):
         # type: () -> None
         row_nbits = self.params['row_nbits']
-        config_file = self.params['config_file']
         show_pins = self.params['show_pins']
 
         # use standard cell routing grid
@@ -248,38 +273,34 @@ class RowDecoder(StdCellBase):
         num_row = 2 ** row_nbits
 
         dec_name = 'decoder%d_unit_diff_horiz_1x' % row_nbits
-        dec_params = dict(cell_name=dec_name, config_file=config_file)
-        dec_master = self.new_template(params=dec_params, temp_cls=StdCellTemplate)
+        dec_master = self.get_std_master(dec_name)
 
         # add decoders
         inst_list = [self.add_std_instance(dec_master, ny=num_row // 2, spy=2),
                      self.add_std_instance(dec_master, loc=(0, 1), ny=num_row // 2, spy=2)]
 
-        # get input pins and export outputs
-        in_lists = [([], [], []) for _ in range(row_nbits)]
+        # export outputs
         for idx in range(num_row):
             inst = inst_list[idx % 2]
             ridx = idx // 2
             self.reexport(inst.get_port('O', row=ridx), net_name='out<%d>' % idx, show=show_pins)
             self.reexport(inst.get_port('OB', row=ridx), net_name='outb<%d>' % idx, show=show_pins)
-            for bit_idx in range(row_nbits):
-                in_lists[bit_idx][0].append(
-                    inst.get_port('IN<%d>' % bit_idx, row=ridx).get_pins()[0])
-                if (idx & (1 << bit_idx)) >> bit_idx == 1:
-                    in_lists[bit_idx][2].append(idx)
-                else:
-                    in_lists[bit_idx][1].append(idx)
 
-        in_layer = in_lists[0][0][0].layer_id + 1
-        for idx, (pin_list, outb_idx_list, out_idx_list) in enumerate(in_lists):
-            outb_tr = self.grid.find_next_track(in_layer, pin_list[0].lower, mode=1,
+        # connect input pins of each bit to true/complement tracks
+        bit_mat = get_bit_matrix(num_row, row_nbits)
+        in_layer = None
+        for bit_idx in range(row_nbits):
+            pin_arr = get_interleaved_pins(inst_list, 'IN<%d>' % bit_idx)
+            if in_layer is None:
+                in_layer = pin_arr[0].layer_id + 1
+            outb_tr = self.grid.find_next_track(in_layer, pin_arr[0].lower, mode=1,
                                                 half_track=True)
-            warr = self.connect_to_tracks([pin_list[idx] for idx in outb_idx_list],
+            warr = self.connect_to_tracks(list(pin_arr[~bit_mat[:, bit_idx]]),
                                           TrackID(in_layer, outb_tr))
-            self.add_pin('inb<%d>' % idx, warr, show=show_pins)
-            warr = self.connect_to_tracks([pin_list[idx] for idx in out_idx_list],
+            self.add_pin('inb<%d>' % bit_idx, warr, show=show_pins)
+            warr = self.connect_to_tracks(list(pin_arr[bit_mat[:, bit_idx]]),
                                           TrackID(in_layer, outb_tr + 1))
-            self.add_pin('in<%d>' % idx, warr, show=show_pins)
+            self.add_pin('in<%d>' % bit_idx, warr, show=show_pins)
 
         # set template size
         self.set_std_size((dec_master.std_size[0], num_row))
@@ -289,7 +310,7 @@ class RowDecoder(StdCellBase):
         self._dec_params['nin'] = row_nbits
 
 
-class ColDecoder(StdCellBase):
+class ColDecoder(StdCellCachedBase):
     """The column decoder.
 
     Parameters
@@ -309,7 +330,7 @@ class ColDecoder(StdCellBase):
 
     def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
-        StdCellBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        StdCellCachedBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._dec_params = None
 
     @property
@@ -335,44 +356,41 @@ class ColDecoder(StdCellBase):
     def draw_layout(self):
         # type: () -> None
         col_nbits = self.params['col_nbits']
-        config_file = self.params['config_file']
         show_pins = self.params['show_pins']
 
         # use standard cell routing grid
         self.update_routing_grid()
 
+        if col_nbits <= 0:
+            raise ValueError('col_nbits must be positive.')
         num_col = 2 ** col_nbits
 
         dec_name = 'decoder%d_unit_diff_vert_1x' % col_nbits
-        dec_params = dict(cell_name=dec_name, config_file=config_file)
-        dec_master = self.new_template(params=dec_params, temp_cls=StdCellTemplate)
+        dec_master = self.get_std_master(dec_name)
 
         # add decoders
         inst = self.add_std_instance(dec_master, nx=num_col, spx=dec_master.std_size[0])
 
-        # get input pins and export outputs
-        in_lists = [([], [], []) for _ in range(col_nbits)]
+        # export outputs
         for idx in range(num_col):
             self.reexport(inst.get_port('O', col=idx), net_name='out<%d>' % idx, show=show_pins)
             self.reexport(inst.get_port('OB', col=idx), net_name='outb<%d>' % idx, show=show_pins)
-            for bit_idx in range(col_nbits):
-                in_lists[bit_idx][0].append(
-                    inst.get_port('IN<%d>' % bit_idx, col=idx).get_pins()[0])
-                if (idx & (1 << bit_idx)) >> bit_idx == 1:
-                    in_lists[bit_idx][2].append(idx)
-                else:
-                    in_lists[bit_idx][1].append(idx)
 
-        in_layer = in_lists[0][0][0].layer_id + 1
-        for idx, (pin_list, outb_idx_list, out_idx_list) in enumerate(in_lists):
-            outb_tr = self.grid.find_next_track(in_layer, pin_list[0].lower, half_track=True,
+        # connect input pins of each bit to true/complement tracks
+        bit_mat = get_bit_matrix(num_col, col_nbits)
+        in_layer = None
+        for bit_idx in range(col_nbits):
+            pin_arr = get_mosaic_pins(inst, 'IN<%d>' % bit_idx)[0, :]
+            if in_layer is None:
+                in_layer = pin_arr[0].layer_id + 1
+            outb_tr = self.grid.find_next_track(in_layer, pin_arr[0].lower, half_track=True,
                                                 mode=1)
-            warr = self.connect_to_tracks([pin_list[idx] for idx in outb_idx_list],
+            warr = self.connect_to_tracks(list(pin_arr[~bit_mat[:, bit_idx]]),
                                           TrackID(in_layer, outb_tr))
-            self.add_pin('inb<%d>' % idx, warr, show=show_pins)
-            warr = self.connect_to_tracks([pin_list[idx] for idx in out_idx_list],
+            self.add_pin('inb<%d>' % bit_idx, warr, show=show_pins)
+            warr = self.connect_to_tracks(list(pin_arr[bit_mat[:, bit_idx]]),
                                           TrackID(in_layer, outb_tr + 1))
-            self.add_pin('in<%d>' % idx, warr, show=show_pins)
+            self.add_pin('in<%d>' % bit_idx, warr, show=show_pins)
 
         # set template size
         self.set_std_size((dec_master.std_size[0] * num_col, dec_master.std_size[1]))
@@ -382,7 +400,7 @@ class ColDecoder(StdCellBase):
         self._dec_params['nin'] = col_nbits
 
 
-class RLadderMux(StdCellBase):
+class RLadderMux(StdCellCachedBase):
     """The column decoder.
 
     Parameters
@@ -402,7 +420,7 @@ class RLadderMux(StdCellBase):
 
     def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
-        StdCellBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        StdCellCachedBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
 
     @property
@@ -445,8 +463,7 @@ class RLadderMux(StdCellBase):
         num_row = 2 ** row_nbits
         num_col = 2 ** col_nbits
 
-        tap_params = dict(cell_name='tap_pwr', config_file=config_file)
-        tap_master = self.new_template(params=tap_params, temp_cls=StdCellTemplate)
+        tap_master = self.get_std_master('tap_pwr')
         buf_params = dict(num_bits=col_nbits + row_nbits, config_file=config_file, show_pins=False)
         buf_master = self.new_template(params=buf_params, temp_cls=InputBuffer)
         col_params = dict(col_nbits=col_nbits, config_file=config_file, show_pins=False)
@@ -629,7 +646,173 @@ class RLadderMux(StdCellBase):
                                       track_upper=mid_coord + min_len / 2)
 
 
-class RLadderMuxArray(StdCellBase):
+def draw_input_straps(template, inst, num_in, show_pins, upper=None):
+    # type: (StdCellBase, Instance, int, bool, Optional[int]) -> None
+    """Strap the mux inputs of all elements of a mosaic instance and export them.
+
+    Each input is drawn as one wire starting from 0.  Inputs with the same layer, width,
+    and extent are drawn as arrayed wires, one per arithmetic run of tracks.
+
+    Parameters
+    ----------
+    template : StdCellBase
+        the template to draw in.
+    inst : Instance
+        the mux mosaic instance.
+    num_in : int
+        number of mux inputs.
+    show_pins : bool
+        True to show pins.
+    upper : Optional[int]
+        the strap upper coordinate, in resolution units.  Defaults to the input pin upper
+        coordinate of the last element.
+    """
+    res = template.grid.resolution
+    x_last = (inst.nx - 1) * inst.spx_unit
+    in_table = {}
+    for idx in range(num_in):
+        in_pin = inst.get_port('in<%d>' % idx, col=0).get_pins()[0]
+        tid = in_pin.track_id
+        if upper is None:
+            in_upper = int(round(in_pin.upper / res)) + x_last
+        else:
+            in_upper = upper
+        key = (tid.layer_id, tid.width, in_upper)
+        in_table.setdefault(key, ([], []))
+        in_table[key][0].append(idx)
+        in_table[key][1].append(tid.base_index)
+    for (in_layer, in_w, in_upper), (idx_list, tr_list) in in_table.items():
+        for run in get_arith_runs(tr_list):
+            tr0 = tr_list[run[0]]
+            pitch = tr_list[run[1]] - tr0 if len(run) > 1 else 0
+            warr = template.add_wires(in_layer, tr0, 0, in_upper, width=in_w, num=len(run),
+                                      pitch=pitch, unit_mode=True)
+            for idx, in_warr in zip(run, warr.to_warr_list()):
+                template.add_pin('in<%d>' % idx_list[idx], in_warr, show=show_pins)
+
+
+def draw_mux_power_fill(template, vdd_list, vss_list, top_layer, tile=False):
+    # type: (StdCellBase, List[WireArray], List[WireArray], int, bool) -> Tuple[List, List]
+    """Draw mux power fill from the supply layer up to top_layer.
+
+    If tile is True, horizontal fill wires run to the left and right edges of the template,
+    so abutting tiles can be strapped together.  Vertical fill wires keep half a fill pitch
+    from the left and right edges, so the fill pitch is kept across abutting tiles.
+
+    Returns the VDD and VSS wires on top_layer.
+    """
+    grid = template.grid
+    fill_width, fill_space = 2, 1
+    sup_layer = vdd_list[0].layer_id
+    for next_layer in range(sup_layer + 1, top_layer + 1):
+        if not tile:
+            x_margin = 100
+        elif grid.get_direction(next_layer) == 'x':
+            x_margin = 0
+        else:
+            tr_pitch = grid.get_track_pitch(next_layer, unit_mode=True)
+            x_margin = tr_pitch * (fill_width + fill_space) // 2
+        vdd_list, vss_list = template.do_power_fill(next_layer, 200, 200, vdd_list, vss_list,
+                                                    fill_width=fill_width, fill_space=fill_space,
+                                                    x_margin=x_margin, y_margin=100,
+                                                    unit_mode=True)
+    return vdd_list, vss_list
+
+
+class RLadderMuxTile(StdCellCachedBase):
+    """A resistor ladder mux with its own power fill.
+
+    This is the unit tile of a tiled RLadderMuxArray.  The power fill is computed once for
+    a single mux pitch, and the inputs are strapped across the whole tile, so abutting
+    tiles form continuous input wires.  The supply wires on the highest horizontal fill
+    layer run across the whole tile and are exported, so the array can strap the tile
+    supplies together.
+
+    Parameters
+    ----------
+    temp_db : TemplateDB
+        the template database.
+    lib_name : str
+        the layout library name.
+    params : Dict[str, Any]
+        the parameter values.
+    used_names : Set[str]
+        a set of already used cell names.
+    **kwargs :
+        dictionary of optional parameters.  See documentation of
+        :class:`bag.layout.template.TemplateBase` for details.
+    """
+
+    def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
+        # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
+        StdCellCachedBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        self._sch_params = None
+        self._strap_layer = None
+
+    @property
+    def sch_params(self):
+        return self._sch_params
+
+    @property
+    def strap_layer(self):
+        # type: () -> int
+        return self._strap_layer
+
+    @classmethod
+    def get_params_info(cls):
+        # type: () -> Dict[str, str]
+        return RLadderMux.get_params_info()
+
+    @classmethod
+    def get_default_param_values(cls):
+        # type: () -> Dict[str, Any]
+        return RLadderMux.get_default_param_values()
+
+    def draw_layout(self):
+        # type: () -> None
+        col_nbits = self.params['col_nbits']
+        row_nbits = self.params['row_nbits']
+        show_pins = self.params['show_pins']
+
+        # use standard cell routing grid
+        self.update_routing_grid()
+
+        mux_params = self.params.copy()
+        mux_params['show_pins'] = False
+        mux_master = self.new_template(params=mux_params, temp_cls=RLadderMux)
+        top_layer = mux_master.top_layer
+        mux_inst = self.add_std_instance(mux_master)
+        self.set_std_size(mux_master.std_size, top_layer=top_layer)
+
+        # strap inputs across the tile before drawing fill, so fill avoids them.
+        nbits_tot = col_nbits + row_nbits
+        draw_input_straps(self, mux_inst, 2 ** nbits_tot, show_pins,
+                          upper=self.bound_box.right_unit)
+        self.reexport(mux_inst.get_port('out'), show=show_pins)
+        for idx in range(nbits_tot):
+            self.reexport(mux_inst.get_port('code<%d>' % idx), show=show_pins)
+
+        # fill up to the highest horizontal layer first, and export its supply wires as
+        # straps between abutting tiles.
+        vdd_list = mux_inst.get_all_port_pins('VDD')
+        vss_list = mux_inst.get_all_port_pins('VSS')
+        sup_layer = vdd_list[0].layer_id
+        strap_layer = max((lay for lay in range(sup_layer, top_layer + 1)
+                           if self.grid.get_direction(lay) == 'x'))
+        vdd_list, vss_list = draw_mux_power_fill(self, vdd_list, vss_list, strap_layer,
+                                                 tile=True)
+        if strap_layer < top_layer:
+            self.add_pin('VDD', vdd_list, show=show_pins)
+            self.add_pin('VSS', vss_list, show=show_pins)
+            vdd_list, vss_list = draw_mux_power_fill(self, vdd_list, vss_list, top_layer,
+                                                     tile=True)
+        self.add_pin('VDD', vdd_list, show=show_pins)
+        self.add_pin('VSS', vss_list, show=show_pins)
+        self._sch_params = mux_master.sch_params
+        self._strap_layer = strap_layer
+
+
+class RLadderMuxArray(StdCellCachedBase):
     """The column decoder.
 
     Parameters
@@ -649,7 +832,7 @@ class RLadderMuxArray(StdCellBase):
 
     def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
-        StdCellBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        StdCellCachedBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._mux_params = None
 
     @property
@@ -665,6 +848,7 @@ class RLadderMuxArray(StdCellBase):
             row_nbits='number of row bits.',
             config_file='Standard cell configuration file.',
             top_layer='top layer ID.',
+            tile_fill='True to draw power fill once per mux and array it.',
             show_pins='True to show pins.',
         )
 
@@ -673,9 +857,84 @@ class RLadderMuxArray(StdCellBase):
         # type: () -> Dict[str, Any]
         return dict(
             top_layer=None,
+            tile_fill=False,
             show_pins=True,
         )
 
+    @classmethod
+    def estimate_size(cls, temp_db, params):
+        # type: (TemplateDB, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        temp_db : TemplateDB
+            the template database.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        return cls.get_size_info(temp_db, params)[0]
+
+    @classmethod
+    def get_size_info(cls, temp_db, params):
+        # type: (TemplateDB, Dict[str, Any]) -> Tuple[BBox, WireArray, int]
+        """Compute the size and input pin locations of this template without drawing it.
+
+        Only the RLadderMux leaf is created.  A RLadderMuxTile has the same size and pins
+        as the mux it wraps, so the tile and its power fill are never drawn here.  The array
+        size and the mux offset use the same standard cell boundary arithmetic as
+        StdCellBase.set_std_size() and add_std_instance().
+
+        Parameters
+        ----------
+        temp_db : TemplateDB
+            the template database.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        in1_warr : WireArray
+            the in<1> pin of the first mux.  Input straps are drawn on the same track.
+        code_layer : int
+            the code input pin layer ID.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        mux_params = dict(col_nbits=params['col_nbits'], row_nbits=params['row_nbits'],
+                          config_file=params['config_file'], top_layer=params['top_layer'],
+                          show_pins=False)
+        mux_master = temp_db.new_template(params=mux_params, temp_cls=RLadderMux)
+        mux_ncol, mux_nrow = mux_master.std_size
+        top_layer = mux_master.top_layer
+        grid = mux_master.grid
+
+        # same arithmetic as set_std_size() with boundaries enabled
+        bound_params = get_std_config(params['config_file'])['boundaries']
+        col_w = mux_master.std_col_width_unit
+        row_h = mux_master.std_row_height_unit
+        dx = bound_params['lr_width'] * col_w
+        dy = bound_params['tb_height'] * row_h
+        arr_w = mux_ncol * params['num_mux'] * col_w + 2 * dx
+        arr_h = mux_nrow * row_h + 2 * dy
+        blk_w, blk_h = grid.get_block_size(top_layer, unit_mode=True)
+        bnd_box = BBox(0, 0, -(-arr_w // blk_w) * blk_w, -(-arr_h // blk_h) * blk_h,
+                       grid.resolution, unit_mode=True)
+
+        in1_warr = mux_master.get_port('in<1>').transform(grid, loc=(dx, dy),
+                                                          unit_mode=True).get_pins()[0]
+        code_layer = mux_master.get_port('code<0>').get_pins()[0].layer_id
+        return bnd_box, in1_warr, code_layer
+
     def draw_layout(self):
         # type: () -> None
         num_mux = self.params['num_mux']
@@ -683,6 +942,7 @@ class RLadderMuxArray(StdCellBase):
         row_nbits = self.params['row_nbits']
         config_file = self.params['config_file']
         top_layer = self.params['top_layer']
+        tile_fill = self.params['tile_fill']
         show_pins = self.params['show_pins']
 
         # use standard cell routing grid
@@ -693,7 +953,10 @@ class RLadderMuxArray(StdCellBase):
         # place muxes
         mux_params = dict(col_nbits=col_nbits, row_nbits=row_nbits, config_file=config_file,
                           top_layer=top_layer, show_pins=False)
-        mux_master = self.new_template(params=mux_params, temp_cls=RLadderMux)
+        if tile_fill:
+            mux_master = self.new_template(params=mux_params, temp_cls=RLadderMuxTile)
+        else:
+            mux_master = self.new_template(params=mux_params, temp_cls=RLadderMux)
         mux_ncol, mux_nrow = mux_master.std_size
         top_layer = mux_master.top_layer
 
@@ -705,30 +968,45 @@ class RLadderMuxArray(StdCellBase):
 
         # export inputs
         nbits_tot = col_nbits + row_nbits
-        for idx in range(2 ** nbits_tot):
-            name = 'in<%d>' % idx
-            warrs = self.connect_wires(mux_inst.get_all_port_pins(name), lower=0.0)
-            self.add_pin(name, warrs, show=show_pins)
+        num_in = 2 ** nbits_tot
+        if tile_fill:
+            # inputs are already strapped across each tile.  Join the tile straps into one
+            # wire starting from 0, the same as draw_input_straps().
+            for idx in range(num_in):
+                name = 'in<%d>' % idx
+                warr = self.connect_wires(mux_inst.get_all_port_pins(name), lower=0,
+                                          unit_mode=True)
+                self.add_pin(name, warr, show=show_pins)
+        else:
+            draw_input_straps(self, mux_inst, num_in, show_pins)
 
         # export outputs/code
-        for idx in range(num_mux):
-            self.reexport(mux_inst.get_port('out', col=idx), net_name='out<%d>' % idx,
-                          show=show_pins)
-            for bit_idx in range(nbits_tot):
-                old_name = 'code<%d>' % bit_idx
-                new_name = 'code<%d>' % (bit_idx + nbits_tot * idx)
-                self.reexport(mux_inst.get_port(old_name, col=idx), net_name=new_name,
+        reexport_mosaic_ports(self, mux_inst, 'out', lambda row, col, bit: col, show=show_pins)
+        reexport_mosaic_ports(self, mux_inst, 'code',
+                              lambda row, col, bit: bit + nbits_tot * col, nbits=nbits_tot,
                               show=show_pins)
 
         # export power
         vdd_list = mux_inst.get_all_port_pins('VDD')
         vss_list = mux_inst.get_all_port_pins('VSS')
-        sup_layer = vdd_list[0].layer_id
-        # draw power fill and export supplies
-        for next_layer in range(sup_layer + 1, top_layer + 1):
-            vdd_list, vss_list = self.do_power_fill(next_layer, 200, 200, vdd_list, vss_list,
-                                                    fill_width=2, fill_space=1, x_margin=100,
-                                                    y_margin=100, unit_mode=True)
+        if tile_fill:
+            # power fill is already drawn in each tile.  Strap the tile supplies across tile
+            # boundaries on the strap layer, then export the top layer wires.
+            strap_layer = mux_master.strap_layer
+            xl = mux_inst.bound_box.left_unit
+            xr = mux_inst.bound_box.right_unit
+            sup_list = []
+            for warr_list in (vdd_list, vss_list):
+                straps = [warr for warr in warr_list if warr.layer_id == strap_layer]
+                straps = self.connect_wires(straps, lower=xl, upper=xr, unit_mode=True)
+                if strap_layer < top_layer:
+                    top_warrs = [warr for warr in warr_list if warr.layer_id == top_layer]
+                    sup_list.append(self.connect_wires(top_warrs))
+                else:
+                    sup_list.append(straps)
+            vdd_list, vss_list = sup_list
+        else:
+            vdd_list, vss_list = draw_mux_power_fill(self, vdd_list, vss_list, top_layer)
 
         self.add_pin('VDD', vdd_list, show=show_pins)
         self.add_pin('VSS', vss_list, show=show_pins)
@@ -9,17 +9,30 @@ from typing import TYPE_CHECKING, Dict, Set, Any, List, Tuple, Optional
 from itertools import chain
 
 from bag.layout.util import BBox
+from bag.layout.routing import WireArray
 from bag.layout.template import TemplateBase
 
 from abs_templates_ec.routing.fill import PowerFill
 from abs_templates_ec.routing.bias import BiasShield, join_bias_vroutes, compute_vroute_width
 
+from BagModules.bag_analog_ec.res_ladder_dac_array import bag_analog_ec__res_ladder_dac_array
+
+from ...rc import get_wire_info, get_tech_rc_table, estimate_rc_table
 from .core import ResLadderDAC
 
 if TYPE_CHECKING:
+    from bag.layout.routing import RoutingGrid
     from bag.layout.template import TemplateDB
 
 
+class _GridView(object):
+    """A template stand-in for routing helpers that only read the routing grid."""
+
+    def __init__(self, grid):
+        # type: (RoutingGrid) -> None
+        self.grid = grid
+
+
 class RDACRow(TemplateBase):
     """A row of resistor ladder DACs.
 
@@ -44,6 +57,7 @@ class RDACRow(TemplateBase):
         self._sch_params = None
         self._bias_layer = None
         self._bias_info = None
+        self._out_wire_info = None
 
     @property
     def sch_params(self):
@@ -60,11 +74,17 @@ class RDACRow(TemplateBase):
         # type: () -> List[int, Optional[Tuple[Any]]]
         return self._bias_info
 
+    @property
+    def out_wire_info(self):
+        # type: () -> List[List[Tuple[int, int, int, int]]]
+        """List of wire segments from each DAC output to its bias track, in output order."""
+        return self._out_wire_info
+
     @classmethod
     def get_cache_properties(cls):
         # type: () -> List[str]
         """Returns a list of properties to cache."""
-        return ['sch_params', 'bias_info']
+        return ['sch_params', 'bias_info', 'out_wire_info']
 
     @classmethod
     def get_params_info(cls):
@@ -93,6 +113,140 @@ class RDACRow(TemplateBase):
             show_pins=True,
         )
 
+    @classmethod
+    def get_bus_dimensions(cls, grid, io_layer, top_layer, nin, nout_tot, num_vdd, dac_h,
+                           fill_config, bias_config, in_tr0=1):
+        # type: (RoutingGrid, int, int, int, int, int, int, Dict, Dict, int) -> Tuple[int, ...]
+        """Returns the input and output bus dimensions of a DAC row.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        io_layer : int
+            the input and output bus layer ID.
+        top_layer : int
+            the DAC top layer ID.
+        nin : int
+            number of select bits per DAC output.
+        nout_tot : int
+            total number of DAC outputs.
+        num_vdd : int
+            number of outputs routed on the VDD bias bus.
+        dac_h : int
+            the DAC height, in resolution units.
+        fill_config : Dict[int, Any]
+            the fill configuration dictionary.
+        bias_config : Dict[int, Any]
+            the bias configuration dictionary.
+        in_tr0 : int
+            the first input bus track index.
+
+        Returns
+        -------
+        ny_input : int
+            number of fill blocks in a column of the input bus.
+        out_y0 : int
+            bottom Y coordinate of the VDD bias bus.
+        out_y1 : int
+            bottom Y coordinate of the VSS bias bus.
+        tot_h : int
+            the total row height.
+        """
+        ntot = nin * nout_tot + nout_tot + 1 + in_tr0
+        in_pitch = grid.get_track_pitch(io_layer, unit_mode=True)
+        blk_h = grid.get_fill_size(top_layer, fill_config, unit_mode=True)[1]
+        ny_input = (-(-(ntot * in_pitch) // blk_h) + 1)
+        num_vss = nout_tot - num_vdd
+        vdd_h = 0 if num_vdd == 0 else BiasShield.get_block_size(grid, io_layer, bias_config,
+                                                                 num_vdd)[1]
+        vss_h = 0 if num_vss == 0 else BiasShield.get_block_size(grid, io_layer, bias_config,
+                                                                 num_vss)[1]
+
+        out_y0 = ny_input * blk_h + dac_h
+        out_y1 = -(-(out_y0 + vdd_h) // blk_h) * blk_h
+        tot_h = -(-(out_y1 + vss_h) // blk_h) * blk_h
+        return ny_input, out_y0, out_y1, tot_h
+
+    @classmethod
+    def estimate_size(cls, temp_db, params):
+        # type: (TemplateDB, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        temp_db : TemplateDB
+            the template database.  Used to create the resistor ladder and mux leaf masters.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        return cls.get_size_info(temp_db, params)[0]
+
+    @classmethod
+    def get_size_info(cls, temp_db, params):
+        # type: (TemplateDB, Dict[str, Any]) -> Tuple[BBox, int, int]
+        """Compute the size of this template without drawing it.
+
+        DAC sizes are computed with ResLadderDAC.get_size_info(), and the input and output
+        bus heights with get_bus_dimensions(), the same as draw_layout().
+
+        Parameters
+        ----------
+        temp_db : TemplateDB
+            the template database.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        top_layer : int
+            the top layer ID.
+        bias_layer : int
+            the bias bus layer ID.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        nin0 = params['nin0']
+        nin1 = params['nin1']
+        nout_list = params['nout_list']
+        fill_config = params['fill_config']
+        grid = temp_db.grid
+
+        dac_params = dict(
+            nin0=nin0,
+            nin1=nin1,
+            res_params=params['res_params'],
+            mux_params=params['mux_params'],
+            fill_config=fill_config,
+            top_layer=params['top_layer'],
+            fill_orient_mode=params['fill_orient_mode'],
+            show_pins=False
+        )
+        info_cache = {}
+        xcur = 0
+        for nout in nout_list:
+            if nout not in info_cache:
+                dac_params['nout'] = nout
+                info_cache[nout] = ResLadderDAC.get_size_info(temp_db, dac_params)
+            xcur += info_cache[nout][0].width_unit
+
+        dac_box, top_layer, code_layer = info_cache[nout_list[0]]
+        io_layer = code_layer - 1
+        tot_h = cls.get_bus_dimensions(grid, io_layer, top_layer, nin0 + nin1, sum(nout_list),
+                                       params['num_vdd'], dac_box.height_unit, fill_config,
+                                       params['bias_config'])[3]
+        bnd_box = BBox(0, 0, xcur, tot_h, grid.resolution, unit_mode=True)
+        return bnd_box, top_layer, io_layer
+
     def draw_layout(self):
         # type: () -> None
         in_tr0 = 1
@@ -147,19 +301,14 @@ class RDACRow(TemplateBase):
         top_layer = master0.top_layer
         io_layer = master0.get_port('code<0>').get_pins()[0].layer_id - 1
 
-        # compute space required for input bus
+        # compute space required for input and output bus
         nin = nin0 + nin1
-        ntot = nin * nout_tot + nout_tot + 1 + in_tr0
-        in_pitch = self.grid.get_track_pitch(io_layer, unit_mode=True)
+        num_vss = nout_tot - num_vdd
+        tmp = self.get_bus_dimensions(self.grid, io_layer, top_layer, nin, nout_tot, num_vdd,
+                                      dac_h, fill_config, bias_config, in_tr0=in_tr0)
+        ny_input, out_y0, out_y1, tot_h = tmp
         blk_w, blk_h = self.grid.get_fill_size(top_layer, fill_config, unit_mode=True)
-        ny_input = (-(-(ntot * in_pitch) // blk_h) + 1)
         in_h = ny_input * blk_h
-        # compute space required for output bus
-        num_vss = nout_tot - num_vdd
-        vdd_h = 0 if num_vdd == 0 else BiasShield.get_block_size(self.grid, io_layer, bias_config,
-                                                                 num_vdd)[1]
-        vss_h = 0 if num_vss == 0 else BiasShield.get_block_size(self.grid, io_layer, bias_config,
-                                                                 num_vss)[1]
 
         inst_list = []
         xcur = 0
@@ -170,10 +319,6 @@ class RDACRow(TemplateBase):
             xcur += nx * spx
             inst_list.append((inst, nx))
 
-        out_y0 = in_h + dac_h
-        out_y1 = out_y0 + vdd_h
-        out_y1 = -(-out_y1 // blk_h) * blk_h
-        tot_h = -(-(out_y1 + vss_h) // blk_h) * blk_h
         bnd_box = BBox(0, 0, xcur, tot_h, res, unit_mode=True)
         self.set_size_from_bound_box(top_layer, bnd_box)
         self.array_box = bnd_box
@@ -198,15 +343,25 @@ class RDACRow(TemplateBase):
         )
         self._bias_layer = io_layer
 
+    def _get_out_wire_info(self, out_pin, track):
+        """Returns the wire segments from the given DAC output pin to its bias track."""
+        tid = track.track_id
+        y_tr = self.grid.track_to_coord(tid.layer_id, tid.base_index, unit_mode=True)
+        lay_id, width, _, num = get_wire_info(self.grid, out_pin)
+        return [(lay_id, width, abs(y_tr - out_pin.upper_unit), num),
+                get_wire_info(self.grid, track)]
+
     def _connect_output(self, io_layer, bias_config, out_pins, fill_master, num_vdd, num_vss,
                         y0, y1, ytop, blk_w, blk_h, show_pins, fill_orient_mode):
         bias_info = [None, None]
+        self._out_wire_info = []
         if num_vdd > 0:
             vdd_out = out_pins[:num_vdd]
             vdd_info = BiasShield.connect_bias_shields(self, io_layer, bias_config, vdd_out, y0,
                                                        tr_lower=0, lu_end_mode=1)
-            for idx, tr in enumerate(vdd_info.tracks):
+            for idx, (out_pin, tr) in enumerate(zip(vdd_out, vdd_info.tracks)):
                 self.add_pin('out<%d>' % idx, tr, show=show_pins, edge_mode=-1)
+                self._out_wire_info.append(self._get_out_wire_info(out_pin, tr))
             vdd_list = vdd_info.supplies
             bias_info[1] = (num_vdd, vdd_info.p0, vdd_info.p1[1] - vdd_info.p0[1])
         else:
@@ -216,8 +371,9 @@ class RDACRow(TemplateBase):
             vss_out = out_pins[num_vdd:]
             vss_info = BiasShield.connect_bias_shields(self, io_layer, bias_config, vss_out, y1,
                                                        tr_lower=0, lu_end_mode=1)
-            for idx, tr in enumerate(vss_info.tracks):
+            for idx, (out_pin, tr) in enumerate(zip(vss_out, vss_info.tracks)):
                 self.add_pin('out<%d>' % (idx + num_vdd), tr, show=show_pins, edge_mode=-1)
+                self._out_wire_info.append(self._get_out_wire_info(out_pin, tr))
             vss_list = vss_info.supplies
             bias_info[0] = (num_vss, vss_info.p0, vss_info.p1[1] - vss_info.p0[1])
         else:
@@ -324,6 +480,7 @@ class RDACArray(TemplateBase):
         TemplateBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
         self._bias_info = None
+        self._bias_wire_info = None
 
     @property
     def sch_params(self):
@@ -335,11 +492,62 @@ class RDACArray(TemplateBase):
         # type: () -> Tuple[Tuple[int, List[str]], Tuple[int, List[str]]]
         return self._bias_info
 
+    @property
+    def bias_wire_info(self):
+        # type: () -> Dict[str, List[Tuple[int, int, int, int]]]
+        """Dictionary from bias name to its wire segments, from the DAC output to the pin."""
+        return self._bias_wire_info
+
     @classmethod
     def get_cache_properties(cls):
         # type: () -> List[str]
         """Returns a list of properties to cache."""
-        return ['sch_params', 'bias_info']
+        return ['sch_params', 'bias_info', 'bias_wire_info']
+
+    def _get_vroute_wire_info(self, out_pin, vroute):
+        """Returns the wire segments from a row bias track to the pin, from the drawn wires.
+
+        vroute is the vertical route WireArray returned by join_bias_vroutes(), which extends
+        the row bias track to the route.  The jog is that extension, from the row edge to the
+        center of the drawn route wire.  The route is counted with its full drawn length.
+        """
+        grid = self.grid
+        x_v = vroute.get_bbox_array(grid).base.xc_unit
+        x_out = out_pin.lower_unit
+        jog = WireArray(out_pin.track_id, min(x_v, x_out), max(x_v, x_out),
+                        res=grid.resolution, unit_mode=True)
+        return [get_wire_info(grid, jog), get_wire_info(grid, vroute)]
+
+    def get_bias_rc(self, rc_table=None, allow_missing=False):
+        # type: (Optional[Dict[int, Dict[str, float]]], bool) -> Dict[str, Tuple[float, ...]]
+        """Estimate the RC of each bias route from its geometry.
+
+        Each route is modeled as a single line from the DAC output to the far end of its pin,
+        with all loads at the far end.  The resistance and delay are therefore upper bounds;
+        a load that taps the route closer to the DAC sees less series resistance.
+
+        Parameters
+        ----------
+        rc_table : Optional[Dict[int, Dict[str, float]]]
+            the RC table, see :mod:`analog_ec.layout.rc`.  If None, use the tech RC table.
+        allow_missing : bool
+            True to return an empty dictionary if rc_table is None and the technology has no
+            RC table.  Otherwise, a ValueError is raised.
+
+        Returns
+        -------
+        result : Dict[str, Tuple[float, ...]]
+            dictionary from bias name to (resistance, capacitance, Elmore delay) tuple.  The
+            delay is from the DAC output to the pin; see :func:`analog_ec.layout.rc.estimate_rc`.
+        """
+        if rc_table is None:
+            rc_table = get_tech_rc_table(self.grid.tech_info)
+            if rc_table is None:
+                if allow_missing:
+                    return {}
+                raise ValueError('No RC table given, and the technology has no '
+                                 'layout/rc_extract entry.')
+        return estimate_rc_table(self._bias_wire_info, rc_table, self.grid)
 
     @classmethod
     def get_params_info(cls):
@@ -356,6 +564,9 @@ class RDACArray(TemplateBase):
             bias_config='bias configuration dictionary.',
             top_layer='top layer ID.',
             fill_orient_mode='Fill block orientation mode.',
+            bus_mode='True to name pins with code/out buses instead of bias names.  The bus '
+                     'index of each bias name is given by the get_bus_name_table() method of '
+                     'the res_ladder_dac_array schematic generator.',
             show_pins='True to show pins.',
         )
 
@@ -365,9 +576,80 @@ class RDACArray(TemplateBase):
         return dict(
             top_layer=None,
             fill_orient_mode=0,
+            bus_mode=False,
             show_pins=True,
         )
 
+    @classmethod
+    def get_vroute_info(cls, grid, vm_layer, top_layer, num_vdd, num_vss, fill_config,
+                        bias_config):
+        # type: (RoutingGrid, int, int, int, int, Dict[int, Any], Dict[int, Any]) -> Tuple
+        """Returns the bias vertical route width and track locations.
+
+        compute_vroute_width() only reads the routing grid of the given template, so no
+        template is needed.
+
+        Returns
+        -------
+        route_w : int
+            the bias route width, in resolution units.
+        vdd_x : Any
+            the VDD route locations, see compute_vroute_width().
+        vss_x : Any
+            the VSS route locations, see compute_vroute_width().
+        """
+        blk_w = grid.get_fill_size(top_layer, fill_config, unit_mode=True)[0]
+        return compute_vroute_width(_GridView(grid), vm_layer, blk_w, num_vdd, num_vss,
+                                    bias_config)
+
+    @classmethod
+    def estimate_size(cls, temp_db, params):
+        # type: (TemplateDB, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Row sizes are computed with RDACRow.get_size_info(), and the bias route width with
+        get_vroute_info(), the same as draw_layout().  Only the resistor ladder and mux leaf
+        masters are created.
+
+        Parameters
+        ----------
+        temp_db : TemplateDB
+            the template database.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        nout_list2 = params['nout_list2']
+        num_vdd_list = params['num_vdd_list']
+
+        num_vdd_tot = sum(num_vdd_list)
+        num_vss_tot = sum((sum(nout_list) for nout_list in nout_list2)) - num_vdd_tot
+
+        row_params = params.copy()
+        row_params['show_pins'] = False
+        width = height = 0
+        route_w = None
+        for num_vdd, nout_list in zip(num_vdd_list, nout_list2):
+            row_params['nout_list'] = nout_list
+            row_params['num_vdd'] = num_vdd
+            row_box, top_layer, bias_layer = RDACRow.get_size_info(temp_db, row_params)
+            if route_w is None:
+                route_w = cls.get_vroute_info(temp_db.grid, bias_layer - 1, top_layer,
+                                              num_vdd_tot, num_vss_tot, params['fill_config'],
+                                              params['bias_config'])[0]
+            width = max(width, row_box.width_unit)
+            height += row_box.height_unit
+
+        return BBox(0, 0, route_w + width, height, temp_db.grid.resolution, unit_mode=True)
+
     def draw_layout(self):
         # type: () -> None
         nin0 = self.params['nin0']
@@ -378,6 +660,7 @@ class RDACArray(TemplateBase):
         fill_config = self.params['fill_config']
         bias_config = self.params['bias_config']
         fill_orient_mode = self.params['fill_orient_mode']
+        bus_mode = self.params['bus_mode']
         show_pins = self.params['show_pins']
 
         # get number of VDD/VSS bias wires
@@ -415,8 +698,8 @@ class RDACArray(TemplateBase):
                 res_params = master.sch_params['res_params']
                 mux_params = master.sch_params['mux_params']
                 blk_w, blk_h = self.grid.get_fill_size(top_layer, fill_config, unit_mode=True)
-                tmp = compute_vroute_width(self, vm_layer, blk_w, num_vdd_tot, num_vss_tot,
-                                           bias_config)
+                tmp = self.get_vroute_info(self.grid, vm_layer, top_layer, num_vdd_tot,
+                                           num_vss_tot, fill_config, bias_config)
                 route_w, vdd_x, vss_x = tmp
 
             ny = master.bound_box.height_unit // blk_h
@@ -452,7 +735,15 @@ class RDACArray(TemplateBase):
         xr_tot = tot_box.right_unit
 
         nin = nin0 + nin1
+        if bus_mode:
+            all_names = [name for name_list in name_list2 for name in name_list]
+            sch_cls = bag_analog_ec__res_ladder_dac_array
+            bus_table = sch_cls.get_bus_name_table(nin, nout_arr_list, all_names)
+        else:
+            bus_table = None
         io_name_list = []
+        wire_table = {}
+        pin_to_name = {}
         vdd_pins = []
         vss_pins = []
         vdd_names = []
@@ -474,20 +765,25 @@ class RDACArray(TemplateBase):
 
             in_cnt = out_cnt = 0
             for name in name_list:
-                opin_name = 'v_%s' % name
+                if bus_table is None:
+                    opin_name = 'v_%s' % name
+                    ipin_names = ['bias_%s<%d>' % (name, in_idx) for in_idx in range(nin)]
+                else:
+                    opin_name, ipin_names = bus_table[name]
                 out_pin = inst.get_pin('out<%d>' % out_cnt)
                 io_name_list.append(name)
+                wire_table[name] = list(inst.master.out_wire_info[out_cnt])
+                pin_to_name[opin_name] = (name, out_pin)
                 if out_cnt < num_vdd:
                     vdd_pins.append((opin_name, out_pin))
                     vdd_names.append(opin_name)
                 else:
                     vss_pins.append((opin_name, out_pin))
                     vss_names.append(opin_name)
-                for in_idx in range(nin):
+                for ipin_name in ipin_names:
                     in_pin = inst.get_pin('code<%d>' % in_cnt)
                     in_pin = self.extend_wires(in_pin, upper=xr_tot, unit_mode=True)
-                    self.add_pin('bias_%s<%d>' % (name, in_idx), in_pin, show=show_pins,
-                                 edge_mode=1)
+                    self.add_pin(ipin_name, in_pin, show=show_pins, edge_mode=1)
                     in_cnt += 1
                 out_cnt += 1
 
@@ -498,6 +794,8 @@ class RDACArray(TemplateBase):
         vdd_pins, vss_pins, vdd_list, vss_list = tmp
         for name, warr in chain(vdd_pins, vss_pins):
             self.add_pin(name, warr, show=show_pins, edge_mode=1)
+            bias_name, out_pin = pin_to_name[name]
+            wire_table[bias_name].extend(self._get_vroute_wire_info(out_pin, warr))
 
         # draw fill over routes
         nx = route_w // blk_w
@@ -524,5 +822,7 @@ class RDACArray(TemplateBase):
             res_params=res_params,
             mux_params=mux_params,
             io_name_list=io_name_list,
+            bus_mode=bus_mode,
         )
         self._bias_info = ((vdd_x[0], vdd_names), (vss_x[0], vss_names))
+        self._bias_wire_info = wire_table
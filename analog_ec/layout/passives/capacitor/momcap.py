@@ -3,7 +3,7 @@
 """This package defines various passives template classes.
 """
 
-from typing import TYPE_CHECKING, Dict, Set, Any
+from typing import TYPE_CHECKING, Dict, Set, Any, Optional, Iterable
 
 from bag.layout.util import BBox
 from bag.layout.routing import TrackID
@@ -14,6 +14,7 @@ from abs_templates_ec.analog_mos.mos import DummyFillActive
 from ..substrate import SubstrateWrapper
 
 if TYPE_CHECKING:
+    from bag.layout.objects import Instance
     from bag.layout.template import TemplateDB
 
 
@@ -41,12 +42,19 @@ class MOMCapCore(TemplateBase):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
         TemplateBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
+        self._fill_info = None
 
     @property
     def sch_params(self):
         # type: () -> Dict[str, Any]
         return self._sch_params
 
+    @property
+    def fill_info(self):
+        # type: () -> Optional[Dict[str, Any]]
+        """The dummy fill information if fill is deferred, None otherwise."""
+        return self._fill_info
+
     @classmethod
     def get_params_info(cls):
         # type: () -> Dict[str, str]
@@ -63,6 +71,8 @@ class MOMCapCore(TemplateBase):
             fill_config='Fill configuration dictionary.  If not None, quantize to fill grid.',
             fill_dummy='True to draw dummy fill.',
             fill_pitch='dummy fill pitch.',
+            defer_fill='True to record dummy fill regions instead of drawing dummy fill.  '
+                       'The parent template must call MOMCapCore.draw_deferred_fill().',
             mos_type='dummy fill transistor type.',
             threshold='dummy fill threshold.',
             half_blk_x='True to allow half horizontal blocks.',
@@ -81,7 +91,8 @@ class MOMCapCore(TemplateBase):
             options=None,
             fill_config=None,
             fill_dummy=False,
-            filL_pitch=2,
+            fill_pitch=2,
+            defer_fill=False,
             mos_type='nch',
             threshold='standard',
             half_blk_x=True,
@@ -103,6 +114,7 @@ class MOMCapCore(TemplateBase):
         fill_config = self.params['fill_config']
         fill_dummy = self.params['fill_dummy']
         fill_pitch = self.params['fill_pitch']
+        defer_fill = self.params['defer_fill']
         mos_type = self.params['mos_type']
         threshold = self.params['threshold']
         half_blk_x = self.params['half_blk_x']
@@ -196,16 +208,25 @@ class MOMCapCore(TemplateBase):
         self.add_pin('minus', out_warr, show=show_pins)
 
         if fill_dummy:
-            for lay in range(1, io_layer + 1):
-                self.do_max_space_fill(lay, bnd_box, fill_pitch=fill_pitch)
-            dum_params = dict(
-                mos_type=mos_type,
-                threshold=threshold,
-                width=w_tot,
-                height=h_tot
-            )
-            master_dum = self.new_template(params=dum_params, temp_cls=DummyFillActive)
-            self.add_instance(master_dum, unit_mode=True)
+            if defer_fill:
+                self._fill_info = dict(
+                    fill_layer=io_layer,
+                    fill_box=bnd_box,
+                    fill_pitch=fill_pitch,
+                    mos_type=mos_type,
+                    threshold=threshold,
+                )
+            else:
+                for lay in range(1, io_layer + 1):
+                    self.do_max_space_fill(lay, bnd_box, fill_pitch=fill_pitch)
+                dum_params = dict(
+                    mos_type=mos_type,
+                    threshold=threshold,
+                    width=w_tot,
+                    height=h_tot
+                )
+                master_dum = self.new_template(params=dum_params, temp_cls=DummyFillActive)
+                self.add_instance(master_dum, unit_mode=True)
 
         lay_unit = self.grid.layout_unit
         self._sch_params = dict(
@@ -213,6 +234,58 @@ class MOMCapCore(TemplateBase):
             res_out_info=(io_layer, out_w * res * lay_unit, out_min_len * res * lay_unit),
         )
 
+    @classmethod
+    def draw_deferred_fill(cls, template, inst_list):
+        # type: (TemplateBase, Iterable[Instance]) -> None
+        """Draw dummy fill for all MOM caps with deferred fill in a single pass.
+
+        The fill regions of all given instances are transformed to the coordinate of
+        template.  The regions of an arrayed instance whose elements abut or overlap are
+        filled as one box with one do_max_space_fill call per layer; all other regions are
+        filled separately, so circuits between MOM caps are never filled over.  One
+        DummyFillActive instance is added per MOM cap.  Instances of templates that wrap a
+        MOM cap, such as MOMCapChar, are supported through their fill_info property.
+        Instances without deferred fill are ignored.
+
+        Parameters
+        ----------
+        template : TemplateBase
+            the template containing the MOM cap instances.
+        inst_list : Iterable[Instance]
+            the MOM cap instances.  Arrayed instances are supported.
+        """
+        for inst in inst_list:
+            fill_info = getattr(inst.master, 'fill_info', None)
+            if fill_info is not None:
+                fill_layer = fill_info['fill_layer']
+                fill_pitch = fill_info['fill_pitch']
+                box0 = inst.translate_master_box(fill_info['fill_box'])
+                box_list = [box0.move_by(dx=col * inst.spx_unit, dy=row * inst.spy_unit,
+                                         unit_mode=True)
+                            for col in range(inst.nx) for row in range(inst.ny)]
+
+                # array elements that abut or overlap cover their bounding box exactly
+                abut_x = inst.nx == 1 or 0 < abs(inst.spx_unit) <= box0.width_unit
+                abut_y = inst.ny == 1 or 0 < abs(inst.spy_unit) <= box0.height_unit
+                if abut_x and abut_y:
+                    fill_box_list = [box_list[0].merge(box_list[-1])]
+                else:
+                    fill_box_list = box_list
+                for fill_box in fill_box_list:
+                    for lay in range(1, fill_layer + 1):
+                        template.do_max_space_fill(lay, fill_box, fill_pitch=fill_pitch)
+
+                dum_params = dict(
+                    mos_type=fill_info['mos_type'],
+                    threshold=fill_info['threshold'],
+                    width=box0.width_unit,
+                    height=box0.height_unit,
+                )
+                master_dum = template.new_template(params=dum_params, temp_cls=DummyFillActive)
+                for box in box_list:
+                    template.add_instance(master_dum, loc=(box.left_unit, box.bottom_unit),
+                                          unit_mode=True)
+
 
 class MOMCapChar(SubstrateWrapper):
     """A MOM Cap with substrate contact.
@@ -3,7 +3,7 @@
 """This module defines various passive high-pass filter generators
 """
 
-from typing import TYPE_CHECKING, Dict, Set, Any
+from typing import TYPE_CHECKING, Dict, Set, Any, Tuple, List, Optional
 
 import numbers
 
@@ -14,12 +14,87 @@ from bag.layout.template import TemplateBase
 
 from abs_templates_ec.resistor.core import ResArrayBase, ResArrayBaseInfo
 
+from ...routing import get_arith_runs, reexport_mosaic_ports
 from ..substrate import SubstrateWrapper
 
 if TYPE_CHECKING:
+    from bag.layout.routing import RoutingGrid, WireArray
     from bag.layout.template import TemplateDB
 
 
+def get_res_length(info, w_unit, h_unit):
+    # type: (ResArrayBaseInfo, int, int) -> int
+    """Returns the longest resistor length whose single resistor block is shorter than h_unit.
+
+    Parameters
+    ----------
+    info : ResArrayBaseInfo
+        the resistor array information object.
+    w_unit : int
+        the resistor width, in resolution units.
+    h_unit : int
+        the block height, in resolution units.
+
+    Returns
+    -------
+    l_unit : int
+        the resistor length, in resolution units.
+    """
+    lmin, lmax = info.get_res_length_bounds()
+    bin_iter = BinaryIterator(lmin, lmax, step=2)
+    while bin_iter.has_next():
+        lcur = bin_iter.get_next()
+        htot = info.get_place_info(lcur, w_unit, 1, 1)[3]
+        if htot < h_unit:
+            bin_iter.save()
+            bin_iter.up()
+        else:
+            bin_iter.down()
+
+    return bin_iter.get_last_save()
+
+
+def get_port_tr_w(port_tr_w, lay_id):
+    # type: (Any, int) -> int
+    """Returns the port width on the given layer, in number of tracks.
+
+    port_tr_w is either a single width for all layers, or a dictionary from layer ID to width.
+    """
+    if isinstance(port_tr_w, numbers.Integral):
+        return port_tr_w
+    return port_tr_w[lay_id]
+
+
+def get_metal_res_bounds(coord, width, go_up):
+    # type: (int, int, bool) -> Tuple[int, int, int, int]
+    """Returns the metal resistor and port wire intervals at the end of a capacitor port.
+
+    Parameters
+    ----------
+    coord : int
+        the capacitor port end coordinate, in resolution units.
+    width : int
+        the capacitor port wire width, in resolution units.  The metal resistor and the port
+        wire are both this long.
+    go_up : bool
+        True to draw the metal resistor above coord, False to draw it below.
+
+    Returns
+    -------
+    res_lower : int
+        the metal resistor lower coordinate.
+    res_upper : int
+        the metal resistor upper coordinate.
+    port_lower : int
+        the port wire lower coordinate.
+    port_upper : int
+        the port wire upper coordinate.
+    """
+    if go_up:
+        return coord, coord + width, coord + width, coord + 2 * width
+    return coord - width, coord, coord - 2 * width, coord - width
+
+
 class HighPassDiffCore(ResArrayBase):
     """A differential RC high-pass filter.
 
@@ -123,19 +198,9 @@ class HighPassDiffCore(ResArrayBase):
                                 res_type=res_type, grid_type=None, ext_dir='y', options=my_options,
                                 connect_up=True, half_blk_x=half_blk_x, half_blk_y=True)
 
-        lmin, lmax = info.get_res_length_bounds()
-        bin_iter = BinaryIterator(lmin, lmax, step=2)
-        while bin_iter.has_next():
-            lcur = bin_iter.get_next()
-            htot = info.get_place_info(lcur, w_unit, 1, 1)[3]
-            if htot < h_unit:
-                bin_iter.save()
-                bin_iter.up()
-            else:
-                bin_iter.down()
+        l_unit = get_res_length(info, w_unit, h_unit)
 
         # draw resistor
-        l_unit = bin_iter.get_last_save()
         nx = 2 * (nser + ndum)
         self.draw_array(l_unit * lay_unit * res, w, sub_type, threshold, nx=nx, ny=1,
                         top_layer=top_layer, res_type=res_type, grid_type=None, ext_dir='y',
@@ -385,6 +450,71 @@ class HighPassDiff(SubstrateWrapper):
             show_pins=True,
         )
 
+    @classmethod
+    def estimate_size(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Pin track locations are given by the in_tr_info, out_tr_info, and vdd_tr_info
+        parameters, so only the bounding box is computed.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        w = params['w']
+        h_unit = params['h_unit']
+        sub_w = params['sub_w']
+        sub_lch = params['sub_lch']
+        sub_type = params['sub_type']
+        threshold = params['threshold']
+        top_layer = params['top_layer']
+        res_type = params['res_type']
+        res_options = params['res_options']
+        end_mode = params['end_mode']
+
+        # same arithmetic as draw_layout() and HighPassDiffCore.draw_layout()
+        bot_end_mode, top_end_mode = cls.get_sub_end_modes(end_mode)
+        h_subb = cls.get_substrate_height(grid, top_layer, sub_lch, sub_w, sub_type, threshold,
+                                          end_mode=bot_end_mode, is_passive=True)
+        h_subt = cls.get_substrate_height(grid, top_layer, sub_lch, sub_w, sub_type, threshold,
+                                          end_mode=top_end_mode, is_passive=True)
+        h_core = h_unit - h_subb - h_subt
+
+        res = grid.resolution
+        lay_unit = grid.layout_unit
+        w_unit = int(round(w / lay_unit / res))
+        if res_options is None:
+            my_options = dict(well_end_mode=2)
+        else:
+            my_options = res_options.copy()
+            my_options['well_end_mode'] = 2
+        half_blk_x = (sub_w == 0)
+        res_kwargs = dict(res_type=res_type, grid_type=None, ext_dir='y', options=my_options,
+                          connect_up=True)
+        info = ResArrayBaseInfo(grid, sub_type, threshold, top_layer=top_layer,
+                                half_blk_x=half_blk_x, half_blk_y=True, **res_kwargs)
+        l_unit = get_res_length(info, w_unit, h_core)
+
+        nx = 2 * (params['nser'] + params['ndum'])
+        core_box = cls.get_res_array_box(grid, l_unit * lay_unit * res, w, sub_type, threshold,
+                                         nx, 1, top_layer, min_height=h_core,
+                                         half_blk_x=half_blk_x, half_blk_y=True, **res_kwargs)
+        return cls.get_wrapped_box(grid, core_box, top_layer, sub_lch, sub_w, sub_type,
+                                   threshold, end_mode=end_mode, is_passive=True)
+
     def draw_layout(self):
         h_unit = self.params['h_unit']
         sub_w = self.params['sub_w']
@@ -452,6 +582,7 @@ class HighPassArrayCore(ResArrayBase):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
         ResArrayBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
+        self._tr_w_cache = {}
 
     @property
     def sch_params(self):
@@ -493,10 +624,111 @@ class HighPassArrayCore(ResArrayBase):
             show_pins=True,
         )
 
+    @classmethod
+    def get_array_params(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> Tuple[float, int, Dict[str, Any]]
+        """Returns the resistor length, number of resistors, and other draw_array() parameters.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values, including default values.
+
+        Returns
+        -------
+        l : float
+            the unit resistor length, in meters.
+        nx : int
+            number of resistors.
+        arr_params : Dict[str, Any]
+            the other draw_array() parameters.
+        """
+        w = params['w']
+        h_unit = params['h_unit']
+        sub_type = params['sub_type']
+        threshold = params['threshold']
+        top_layer = params['top_layer']
+        nser = params['nser']
+        res_type = params['res_type']
+        res_options = params['res_options']
+        half_blk_x = params['half_blk_x']
+
+        if nser % 2 != 0:
+            raise ValueError('This generator only supports even nser.')
+
+        res = grid.resolution
+        lay_unit = grid.layout_unit
+        w_unit = int(round(w / lay_unit / res))
+
+        if res_options is None:
+            my_options = dict(well_end_mode=2)
+        else:
+            my_options = res_options.copy()
+            my_options['well_end_mode'] = 2
+        res_kwargs = dict(res_type=res_type, grid_type=None, ext_dir='y', options=my_options,
+                          connect_up=True)
+        # find resistor length
+        info = ResArrayBaseInfo(grid, sub_type, threshold, top_layer=top_layer,
+                                half_blk_x=half_blk_x, half_blk_y=True, **res_kwargs)
+        l_unit = get_res_length(info, w_unit, h_unit)
+
+        nx = 2 * params['ndum'] + params['narr'] * nser
+        arr_params = dict(top_layer=top_layer, half_blk_x=half_blk_x, half_blk_y=True,
+                          min_height=h_unit, **res_kwargs)
+        return l_unit * lay_unit * res, nx, arr_params
+
+    @classmethod
+    def get_cap_y_bounds(cls, yb, yt, cap_spy, cap_h):
+        # type: (int, int, int, int) -> Tuple[int, int]
+        """Returns the bottom and top Y coordinates of a MOM cap.
+
+        The cap is cap_spy below yt, extends down by cap_h, and stays cap_spy above yb.
+        """
+        cap_yt = yt - cap_spy
+        return max(yb + cap_spy, cap_yt - cap_h), cap_yt
+
+    @classmethod
+    def get_in_pin_bottom(cls, grid, arr_h, top_layer, cap_spy, cap_h_list, port_tr_w):
+        # type: (RoutingGrid, int, int, int, List[int], Any) -> int
+        """Returns the lowest clock input pin coordinate of the given filter array.
+
+        The clock input pins are the port wires below the input metal resistors, drawn at
+        the bottom end of the top layer MOM cap ports.  add_mom_cap() draws the ports over
+        the whole cap height, so each port ends at the cap bottom edge.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        arr_h : int
+            the resistor array height, in resolution units.
+        top_layer : int
+            the top layer ID.
+        cap_spy : int
+            the capacitor vertical margin, in resolution units.
+        cap_h_list : List[int]
+            the capacitor heights, in resolution units.
+        port_tr_w : Any
+            the port widths, in number of tracks.
+
+        Returns
+        -------
+        yb : int
+            the lowest clock input pin coordinate, in resolution units.
+        """
+        in_w = grid.get_track_width(top_layer, get_port_tr_w(port_tr_w, top_layer),
+                                    unit_mode=True)
+        yb_min = arr_h
+        for cap_h in cap_h_list:
+            cap_yb = cls.get_cap_y_bounds(0, arr_h, cap_spy, cap_h)[0]
+            yb_min = min(yb_min, get_metal_res_bounds(cap_yb, in_w, False)[2])
+        return yb_min
+
     def draw_layout(self):
         # type: () -> None
         w = self.params['w']
-        h_unit = self.params['h_unit']
         narr = self.params['narr']
         sub_type = self.params['sub_type']
         threshold = self.params['threshold']
@@ -505,48 +737,13 @@ class HighPassArrayCore(ResArrayBase):
         ndum = self.params['ndum']
         port_tr_w = self.params['port_tr_w']
         res_type = self.params['res_type']
-        res_options = self.params['res_options']
         cap_spx = self.params['cap_spx']
         cap_spy = self.params['cap_spy']
         cap_h_list = self.params['cap_h_list']
-        half_blk_x = self.params['half_blk_x']
         show_pins = self.params['show_pins']
 
-        if nser % 2 != 0:
-            raise ValueError('This generator only supports even nser.')
-
-        res = self.grid.resolution
-        lay_unit = self.grid.layout_unit
-        w_unit = int(round(w / lay_unit / res))
-
-        if res_options is None:
-            my_options = dict(well_end_mode=2)
-        else:
-            my_options = res_options.copy()
-            my_options['well_end_mode'] = 2
-        # find resistor length
-        info = ResArrayBaseInfo(self.grid, sub_type, threshold, top_layer=top_layer,
-                                res_type=res_type, ext_dir='y', options=my_options,
-                                connect_up=True, half_blk_x=half_blk_x, half_blk_y=True)
-
-        lmin, lmax = info.get_res_length_bounds()
-        bin_iter = BinaryIterator(lmin, lmax, step=2)
-        while bin_iter.has_next():
-            lcur = bin_iter.get_next()
-            htot = info.get_place_info(lcur, w_unit, 1, 1)[3]
-            if htot < h_unit:
-                bin_iter.save()
-                bin_iter.up()
-            else:
-                bin_iter.down()
-
-        # draw resistor
-        l_unit = bin_iter.get_last_save()
-        nx = 2 * ndum + narr * nser
-        self.draw_array(l_unit * lay_unit * res, w, sub_type, threshold, nx=nx, ny=1,
-                        top_layer=top_layer, res_type=res_type, grid_type=None, ext_dir='y',
-                        options=my_options, connect_up=True, half_blk_x=half_blk_x,
-                        half_blk_y=True, min_height=h_unit)
+        l, nx, arr_params = self.get_array_params(self.grid, self.params)
+        self.draw_array(l, w, sub_type, threshold, nx=nx, ny=1, **arr_params)
 
         # get cap settings
         bot_layer = self.bot_layer_id + 1
@@ -570,7 +767,7 @@ class HighPassArrayCore(ResArrayBase):
             narr=narr,
             ndum=ndum * 2,
             hp_params=dict(
-                l=l_unit * lay_unit * res,
+                l=l,
                 w=w,
                 intent=res_type,
                 nser=nser,
@@ -614,10 +811,8 @@ class HighPassArrayCore(ResArrayBase):
         hm_vext = self.grid.get_via_extensions(hm_layer, 1, 1, unit_mode=True)[0]
         hm_margin = hm_sp_le + hm_vext
 
-        if isinstance(port_tr_w, numbers.Integral):
-            bias_spx = self.grid.get_space(vm_layer, port_tr_w, unit_mode=True)
-        else:
-            bias_spx = self.grid.get_space(vm_layer, port_tr_w[vm_layer], unit_mode=True)
+        bias_spx = self.grid.get_space(vm_layer, get_port_tr_w(port_tr_w, vm_layer),
+                                       unit_mode=True)
 
         # get capacitor X interval, connect resistors, and get ports
         out_list = []
@@ -665,64 +860,115 @@ class HighPassArrayCore(ResArrayBase):
         grid = self.grid
         res = grid.resolution
 
-        # get port location
-        bnd_box = self.bound_box
-        cap_yt = bnd_box.top_unit - cap_spy
-
         # draw MOM cap
+        bnd_box = self.bound_box
         num_layer = top_layer - bot_layer + 1
 
-        out_list = []
-        out_res_info = in_res_info = None
+        out_list, in_list = [], []
         for cap_idx, ((cap_xl, cap_xr), cap_h) in enumerate(zip(cap_x_list, cap_h_list)):
-            cap_yb = max(bnd_box.bottom_unit + cap_spy, cap_yt - cap_h)
+            cap_yb, cap_yt = self.get_cap_y_bounds(bnd_box.bottom_unit, bnd_box.top_unit,
+                                                   cap_spy, cap_h)
             cap_box = BBox(cap_xl, cap_yb, cap_xr, cap_yt, res, unit_mode=True)
             parity = cap_idx % 2
             port_par = (parity, 1 - parity)
             ports = self.add_mom_cap(cap_box, bot_layer, num_layer, port_widths=port_tr_w,
                                      port_parity={bot_layer: port_par, top_layer: port_par})
             if parity == 0:
-                warr_in = ports[top_layer][1 - parity][0]
-                out = ports[bot_layer][parity][0]
+                in_list.append(ports[top_layer][1 - parity][0])
+                out_list.append(ports[bot_layer][parity][0])
             else:
-                warr_in = ports[top_layer][parity][0]
-                out = ports[bot_layer][1 - parity][0]
+                in_list.append(ports[top_layer][parity][0])
+                out_list.append(ports[bot_layer][1 - parity][0])
 
-            out_list.append(out)
-            # draw output metal resistor and port
-            out_port, out_res_info = self._add_metal_res(out, go_up=True)
+        # draw output/clock metal resistors and ports
+        out_ports, out_info_list = self._add_metal_res_array(out_list, go_up=True)
+        in_ports, in_info_list = self._add_metal_res_array(in_list, go_up=False)
+        for cap_idx, (out_port, in_port) in enumerate(zip(out_ports, in_ports)):
             self.add_pin('out<%d>' % cap_idx, out_port, show=show_pins)
-            # draw clock metal resistor and port
-            in_port, in_res_info = self._add_metal_res(warr_in, go_up=False)
             self.add_pin('in<%d>' % cap_idx, in_port, show=show_pins)
 
+        out_res_info = out_info_list[-1] if out_info_list else None
+        in_res_info = in_info_list[-1] if in_info_list else None
         # return ports
         return out_list, out_res_info, in_res_info
 
-    def _add_metal_res(self, warr, go_up=True):
-        tid = warr.track_id
-        tidx = tid.base_index
-        lay_id = tid.layer_id
-        tr_w = tid.width
-        width = self.grid.get_track_width(lay_id, tid.width, unit_mode=True)
-        if go_up:
-            coord = warr.upper_unit
-            self.add_res_metal_warr(lay_id, tidx, coord, coord + width, width=tr_w, unit_mode=True)
-            port = self.add_wires(lay_id, tidx, coord + width, coord + 2 * width,
-                                  width=tr_w, unit_mode=True)
-        else:
-            coord = warr.lower_unit
-            self.add_res_metal_warr(lay_id, tidx, coord - width, coord, width=tr_w, unit_mode=True)
-            port = self.add_wires(lay_id, tidx, coord - 2 * width, coord - width,
-                                  width=tr_w, unit_mode=True)
-
+    def _get_track_width(self, lay_id, tr_w):
+        # type: (int, int) -> int
+        key = (lay_id, tr_w)
+        width = self._tr_w_cache.get(key, None)
+        if width is None:
+            width = self._tr_w_cache[key] = self.grid.get_track_width(lay_id, tr_w,
+                                                                      unit_mode=True)
+        return width
+
+    def _add_metal_res_array(self, warr_list, go_up=True):
+        """Draw metal resistors and port wires on all given wires.
+
+        Wires on the same layer with the same width and end coordinate are grouped into
+        arithmetic track sequences, and each sequence is drawn with a single arrayed
+        metal resistor and a single arrayed port wire.
+
+        Parameters
+        ----------
+        warr_list : List[WireArray]
+            list of single-track capacitor port wires.
+        go_up : bool
+            True to draw metal resistors above the wires, False to draw them below.
+
+        Returns
+        -------
+        port_list : List[WireArray]
+            the port wires, in the same order as warr_list.
+        res_info_list : List[Tuple[int, float, float]]
+            the metal resistor information, in the same order as warr_list.
+        """
         scale = self.grid.resolution * self.grid.layout_unit
-        return port, (lay_id, width * scale, width * scale)
+
+        # group wires by layer, width, and metal resistor coordinate
+        groups = {}
+        for idx, warr in enumerate(warr_list):
+            tid = warr.track_id
+            coord = warr.upper_unit if go_up else warr.lower_unit
+            key = (tid.layer_id, tid.width, coord)
+            if key in groups:
+                groups[key].append(idx)
+            else:
+                groups[key] = [idx]
+
+        port_list = [None] * len(warr_list)
+        res_info_list = [None] * len(warr_list)
+        for (lay_id, tr_w, coord), idx_list in groups.items():
+            width = self._get_track_width(lay_id, tr_w)
+            res_lower, res_upper, port_lower, port_upper = get_metal_res_bounds(coord, width,
+                                                                                go_up)
+            res_info = (lay_id, width * scale, width * scale)
+
+            tr_list = [warr_list[idx].track_id.base_index for idx in idx_list]
+            for run in get_arith_runs(tr_list):
+                tidx = tr_list[run[0]]
+                num = len(run)
+                pitch = tr_list[run[1]] - tidx if num > 1 else 0
+                self.add_res_metal_warr(lay_id, tidx, res_lower, res_upper, width=tr_w,
+                                        num=num, pitch=pitch, unit_mode=True)
+                port = self.add_wires(lay_id, tidx, port_lower, port_upper, width=tr_w,
+                                      num=num, pitch=pitch, unit_mode=True)
+                for ridx, warr in zip(run, port.to_warr_list()):
+                    port_list[idx_list[ridx]] = warr
+                    res_info_list[idx_list[ridx]] = res_info
+
+        return port_list, res_info_list
 
 
 class HighPassArrayClkCore(TemplateBase):
     """An array of clock RC high-pass filters.
 
+    By default, all clock inputs connect to a single differential clock trunk.  If narr_seg
+    is given, the filters are split into segments of narr_seg filters.  Each segment has its
+    own local clkp/clkn trunk, and the middle clkp/clkn input of each segment is extended
+    down to a global clkp/clkn trunk below the local trunks.  The clkp/clkn pins are on the
+    global trunk, so every segment is driven at its center, and each connection call only
+    sees the inputs of one segment or one tap per segment.
+
     Parameters
     ----------
     temp_db : :class:`bag.layout.template.TemplateDB`
@@ -768,6 +1014,7 @@ class HighPassArrayClkCore(TemplateBase):
             res_options='Configuration dictionary for ResArrayBase.',
             cap_spx='Capacitor horizontal separation, in resolution units.',
             cap_spy='Capacitor vertical margin, in resolution units.',
+            narr_seg='Number of filters per clock trunk segment.  None for a single trunk.',
             half_blk_x='True to allow for half horizontal blocks.',
             show_pins='True to show pins.',
         )
@@ -781,23 +1028,40 @@ class HighPassArrayClkCore(TemplateBase):
             res_options=None,
             cap_spx=0,
             cap_spy=0,
+            narr_seg=None,
             half_blk_x=True,
             show_pins=True,
         )
 
+    @classmethod
+    def get_num_segments(cls, narr, narr_seg):
+        # type: (int, Optional[int]) -> int
+        """Returns the number of clock trunk segments.
+
+        The last segment also takes the remaining narr % narr_seg filters.
+        """
+        if narr_seg is None:
+            return 1
+        if narr_seg <= 0 or narr_seg % 4 != 0:
+            raise ValueError('narr_seg = %d must be a positive multiple of 4.' % narr_seg)
+        return max(1, narr // narr_seg)
+
     def draw_layout(self):
         top_layer = self.params['top_layer']
         narr = self.params['narr']
         tr_widths = self.params['tr_widths']
         tr_spaces = self.params['tr_spaces']
+        narr_seg = self.params['narr_seg']
         show_pins = self.params['show_pins']
 
+        num_seg = self.get_num_segments(narr, narr_seg)
+
         params = self.params.copy()
         params['show_pins'] = False
         master = self.new_template(params=params, temp_cls=HighPassArrayCore)
 
         tr_manager = TrackManager(self.grid, tr_widths, tr_spaces, half_space=True)
-        pidx, nidx, y0 = self._place_clock_wires(master, narr, top_layer, tr_manager)
+        tr_list, y0 = self._place_clock_wires(master, narr, top_layer, tr_manager, num_seg)
 
         xm_layer = top_layer + 1
         xm_w = tr_manager.get_width(xm_layer, 'clk')
@@ -815,49 +1079,130 @@ class HighPassArrayClkCore(TemplateBase):
         vssr = self.extend_wires(vssr, upper=bnd_box.right_unit, unit_mode=True)
         self.add_pin('VSSL', vssl, label='VSS:', show=show_pins)
         self.add_pin('VSSR', vssr, label='VSS:', show=show_pins)
+        for name in ('bias', 'out'):
+            reexport_mosaic_ports(self, inst, name, lambda row, col, bit: bit, nbits=narr,
+                                  show=show_pins)
+
+        in_list = [inst.get_pin('in<%d>' % idx) for idx in range(narr)]
+        if num_seg == 1:
+            clkp, clkn = self._connect_clock_trunk(in_list, xm_layer, tr_list[0], tr_list[1],
+                                                   xm_w)[:2]
+        else:
+            seg_bnds = [seg_idx * narr_seg for seg_idx in range(num_seg)] + [narr]
+            trunk_list = []
+            ptap_list = []
+            ntap_list = []
+            for start, stop in zip(seg_bnds, seg_bnds[1:]):
+                ptrunk, ntrunk, ptap, ntap = self._connect_clock_trunk(in_list[start:stop],
+                                                                       xm_layer, tr_list[0],
+                                                                       tr_list[1], xm_w)
+                trunk_list.append((ptrunk, ntrunk))
+                ptap_list.append(ptap)
+                ntap_list.append(ntap)
+
+            # local trunks on the same track must not touch
+            sp_le = self.grid.get_line_end_space(xm_layer, xm_w, unit_mode=True)
+            for seg_idx in range(num_seg - 1):
+                for warr0, warr1 in zip(trunk_list[seg_idx], trunk_list[seg_idx + 1]):
+                    if warr1.lower_unit - warr0.upper_unit < sp_le:
+                        raise ValueError('Clock trunks of segments %d and %d violate line-end '
+                                         'spacing.' % (seg_idx, seg_idx + 1))
+
+            clkp, clkn = self.connect_differential_tracks(ptap_list, ntap_list, xm_layer,
+                                                          tr_list[2], tr_list[3], width=xm_w)
+
+        self.add_pin('clkp', clkp, show=show_pins)
+        self.add_pin('clkn', clkn, show=show_pins)
+
+        self._sch_params = master.sch_params
+
+    def _connect_clock_trunk(self, in_list, xm_layer, pidx, nidx, xm_w):
+        # type: (List[WireArray], int, float, float, int) -> Tuple[WireArray, ...]
+        """Connect the given clock inputs to a differential trunk.
+
+        in_list must start at a filter index that is a multiple of 4, so the clkp/clkn
+        polarity of each input is given by its position in the list.
+
+        Returns
+        -------
+        clkp : WireArray
+            the clkp trunk.
+        clkn : WireArray
+            the clkn trunk.
+        clkp_tap : WireArray
+            the middle clkp input.
+        clkn_tap : WireArray
+            the middle clkn input.
+        """
         clkp_list = []
         clkn_list = []
-        for idx in range(narr):
-            suf = '<%d>' % idx
-            self.reexport(inst.get_port('bias' + suf), show=show_pins)
-            self.reexport(inst.get_port('out' + suf), show=show_pins)
+        for idx, warr in enumerate(in_list):
             parity = idx % 4
             if parity == 0 or parity == 3:
-                clkp_list.append(inst.get_pin('in' + suf))
+                clkp_list.append(warr)
             else:
-                clkn_list.append(inst.get_pin('in' + suf))
+                clkn_list.append(warr)
         clkp, clkn = self.connect_differential_tracks(clkp_list, clkn_list, xm_layer, pidx, nidx,
                                                       width=xm_w)
-        self.add_pin('clkp', clkp, show=show_pins)
-        self.add_pin('clkn', clkn, show=show_pins)
+        return (clkp, clkn, clkp_list[(len(clkp_list) - 1) // 2],
+                clkn_list[(len(clkn_list) - 1) // 2])
 
-        self._sch_params = master.sch_params
-
-    def _place_clock_wires(self, master, narr, top_layer, tr_manager):
+    def _place_clock_wires(self, master, narr, top_layer, tr_manager, num_seg):
         yb_min = master.bound_box.top_unit
         for idx in range(narr):
             yb_min = min(yb_min, master.get_port('in<%d>' % idx).get_pins()[0].lower_unit)
 
+        return self.get_clock_tracks(self.grid, yb_min, top_layer, tr_manager, num_seg=num_seg)
+
+    @classmethod
+    def get_clock_tracks(cls, grid, yb_min, top_layer, tr_manager, num_seg=1):
+        # type: (RoutingGrid, int, int, TrackManager, int) -> Tuple[List[float], int]
+        """Returns the clock track indices and the filter array Y offset.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        yb_min : int
+            the lowest clock input pin coordinate of the filter array, in resolution units.
+        top_layer : int
+            the filter array top layer ID.
+        tr_manager : TrackManager
+            the track manager.
+        num_seg : int
+            number of clock trunk segments.
+
+        Returns
+        -------
+        tr_list : List[float]
+            the clock track indices, from top to bottom.  The first two are the clkp/clkn
+            trunk tracks.  If num_seg > 1, they are followed by the clkp/clkn global trunk
+            tracks.  The last two tracks always have the clkp/clkn pins.
+        dy : int
+            the filter array Y offset, in resolution units.
+        """
         xm_layer = top_layer + 1
         xm_w = tr_manager.get_width(xm_layer, 'clk')
 
-        pidx = self.grid.find_next_track(xm_layer, yb_min, tr_width=xm_w, half_track=True,
-                                         mode=-1, unit_mode=True)
-        nidx = tr_manager.get_next_track(xm_layer, pidx, 'clk', 'clk', up=False)
+        pidx = grid.find_next_track(xm_layer, yb_min, tr_width=xm_w, half_track=True,
+                                    mode=-1, unit_mode=True)
+        tr_list = [pidx]
+        for _ in range(1 if num_seg == 1 else 3):
+            tr_list.append(tr_manager.get_next_track(xm_layer, tr_list[-1], 'clk', 'clk',
+                                                     up=False))
 
-        edge_tr2 = int(round(2 * nidx)) - xm_w
+        edge_tr2 = int(round(2 * tr_list[-1])) - xm_w
         if edge_tr2 < -1:
-            tr_pitch = self.grid.get_track_pitch(xm_layer, unit_mode=True)
+            tr_pitch = grid.get_track_pitch(xm_layer, unit_mode=True)
             dy = (edge_tr2 + 1) * tr_pitch // 2
-            blk_h = self.grid.get_block_size(top_layer, unit_mode=True)[1]
+            blk_h = grid.get_block_size(top_layer, unit_mode=True)[1]
             dy = -(-dy // blk_h) * blk_h
             tr_delta = dy / tr_pitch
-            pidx += tr_delta
-            nidx += tr_delta
+            tr_list = [tidx + tr_delta for tidx in tr_list]
         else:
             dy = 0
 
-        return pidx, nidx, dy
+        return tr_list, dy
 
 
 class HighPassArrayClk(SubstrateWrapper):
@@ -904,6 +1249,7 @@ class HighPassArrayClk(SubstrateWrapper):
             res_options='Configuration dictionary for ResArrayBase.',
             cap_spx='Capacitor horizontal separation, in resolution units.',
             cap_spy='Capacitor vertical margin, in resolution units.',
+            narr_seg='Number of filters per clock trunk segment.  None for a single trunk.',
             sub_tr_w='substrate track width in number of tracks.  None for default.',
             end_mode='substrate end mode flag.',
             show_pins='True to show pins.',
@@ -918,11 +1264,111 @@ class HighPassArrayClk(SubstrateWrapper):
             res_options=None,
             cap_spx=0,
             cap_spy=0,
+            narr_seg=None,
             sub_tr_w=None,
             end_mode=15,
             show_pins=True,
         )
 
+    @classmethod
+    def estimate_size(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        return cls.get_size_info(grid, params)[0]
+
+    @classmethod
+    def get_size_info(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> Tuple[BBox, float, float]
+        """Compute the size and clock track locations of this template without drawing it.
+
+        The resistor array and clock input pin locations come from the HighPassArrayCore
+        helpers that its draw_layout() uses, so the substrate-wrapped core is sized from the
+        same parameters.  See HighPassArrayCore.get_in_pin_bottom().
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        clkp_idx : float
+            the clkp track index on layer top_layer + 1.
+        clkn_idx : float
+            the clkn track index on layer top_layer + 1.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        h_unit = params['h_unit']
+        sub_w = params['sub_w']
+        sub_lch = params['sub_lch']
+        sub_type = params['sub_type']
+        threshold = params['threshold']
+        top_layer = params['top_layer']
+        narr = params['narr']
+        end_mode = params['end_mode']
+
+        # same arithmetic as draw_layout()
+        xm_layer = top_layer + 1
+        bot_end_mode = cls.get_sub_end_modes(end_mode)[0]
+        h_subb = cls.get_substrate_height(grid, xm_layer, sub_lch, sub_w, sub_type, threshold,
+                                          end_mode=bot_end_mode, is_passive=True)
+        h_core = h_unit - h_subb
+
+        # the HighPassArrayCore parameters, with half_blk_x set by place_instances()
+        core_params = params.copy()
+        core_params['h_unit'] = h_core
+        core_params['half_blk_x'] = (sub_w == 0)
+        l, nx, arr_params = HighPassArrayCore.get_array_params(grid, core_params)
+        arr_box = cls.get_res_array_box(grid, l, params['w'], sub_type, threshold, nx, 1,
+                                        **arr_params)
+        arr_h = arr_box.height_unit
+        yb_min = HighPassArrayCore.get_in_pin_bottom(grid, arr_h, top_layer, params['cap_spy'],
+                                                     params['cap_h_list'][:narr],
+                                                     params['port_tr_w'])
+
+        # same arithmetic as HighPassArrayClkCore.draw_layout()
+        tr_manager = TrackManager(grid, params['tr_widths'], params['tr_spaces'],
+                                  half_space=True)
+        num_seg = HighPassArrayClkCore.get_num_segments(narr, params['narr_seg'])
+        tr_list, dy = HighPassArrayClkCore.get_clock_tracks(grid, yb_min, top_layer, tr_manager,
+                                                            num_seg=num_seg)
+        blk_w, blk_h = grid.get_block_size(xm_layer, unit_mode=True, half_blk_x=True,
+                                           half_blk_y=True)
+        core_w = -(-arr_box.width_unit // blk_w) * blk_w
+        core_h = -(-(arr_h + max(dy, 0)) // blk_h) * blk_h
+        core_box = BBox(0, 0, core_w, core_h, grid.resolution, unit_mode=True)
+
+        bnd_box = cls.get_wrapped_box(grid, core_box, xm_layer, sub_lch, sub_w, sub_type,
+                                      threshold, end_mode=end_mode, is_passive=True,
+                                      bot_only=True)
+        # the substrate contact is below the core
+        yoff = bnd_box.height_unit - core_h
+        clk_idx_list = [grid.coord_to_track(xm_layer, grid.track_to_coord(xm_layer, tidx,
+                                                                          unit_mode=True) + yoff,
+                                            unit_mode=True)
+                        for tidx in tr_list[-2:]]
+        return bnd_box, clk_idx_list[0], clk_idx_list[1]
+
     def draw_layout(self):
         h_unit = self.params['h_unit']
         sub_w = self.params['sub_w']
@@ -13,6 +13,8 @@ from abs_templates_ec.resistor.core import ResArrayBase
 from analog_ec.layout.passives.substrate import SubstrateWrapper
 
 if TYPE_CHECKING:
+    from bag.layout.util import BBox
+    from bag.layout.routing import RoutingGrid
     from bag.layout.template import TemplateDB
 
 
@@ -38,11 +40,25 @@ class ResLadderCore(ResArrayBase):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
         ResArrayBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
+        self._res_set = set()
+        self._dum_set = set()
 
     @property
     def sch_params(self):
         return self._sch_params
 
+    @property
+    def num_res(self):
+        # type: () -> int
+        """Number of resistors connected in the ladder, excluding dummies."""
+        return len(self._res_set)
+
+    @property
+    def num_res_dum(self):
+        # type: () -> int
+        """Number of resistors connected as dummies."""
+        return len(self._dum_set)
+
     @classmethod
     def get_params_info(cls):
         # type: () -> Dict[str, str]
@@ -195,6 +211,7 @@ class ResLadderCore(ResArrayBase):
 
     def _connect_dummy(self, row_idx, col_idx, conn_tb, tp_idx, bp_idx,
                        hcon_idx_list, vcon_idx_list):
+        self._dum_set.add((row_idx, col_idx))
         hm_off, vm_off = self.get_track_offsets(row_idx, col_idx)[:2]
         hm_layer = self.bot_layer_id
         self.add_via_on_grid(hm_layer, hm_off + tp_idx, vm_off + vcon_idx_list[3])
@@ -209,6 +226,7 @@ class ResLadderCore(ResArrayBase):
 
     def _connect_lr(self, row_idx, col_idx, nx, ndum, tp_idx, bp_idx, hcon_idx_list,
                     vcon_idx_list, xm_bot_idx):
+        self._res_set.update(((row_idx, col_idx), (row_idx, col_idx + 1)))
         hm_off, vm_off, xm_off = self.get_track_offsets(row_idx, col_idx)[:3]
         vm_next = self.get_track_offsets(row_idx, col_idx + 1)[1]
         hm_layer = self.bot_layer_id
@@ -237,6 +255,10 @@ class ResLadderCore(ResArrayBase):
     def _connect_tb(self, row_idx, col_idx, ndum, tp_idx, hcon_idx_list,
                     vcon_idx_list, xm_bot_idx, mode=0):
         # mode = 0 is normal connection, mode = 1 is vdd connection, mode = -1 is vss connection
+        if mode >= 0:
+            self._res_set.add((row_idx, col_idx))
+        if mode <= 0:
+            self._res_set.add((row_idx + 1, col_idx))
         hm_off, vm_off = self.get_track_offsets(row_idx, col_idx)[:2]
         hm_next, _, xm_next = self.get_track_offsets(row_idx + 1, col_idx)[:3]
         hm_layer = self.bot_layer_id
@@ -426,6 +448,57 @@ class ResLadder(SubstrateWrapper):
         ans['sub_tr_w'] = None
         return ans
 
+    @classmethod
+    def estimate_size(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        nx = params['nx']
+        ny = params['ny']
+        ndum = params['ndum']
+        sub_w = params['sub_w']
+        sub_type = params['sub_type']
+        threshold = params['threshold']
+        res_options = params['res_options']
+
+        if nx % 2 != 0 or nx <= 0:
+            raise ValueError('number of resistors in a row must be even and positive.')
+        if ny % 2 != 0 or ny <= 0:
+            raise ValueError('number of resistors in a column must be even and positive.')
+
+        if res_options is None:
+            res_options = {}
+        else:
+            res_options = res_options.copy()
+            res_options.pop('min_tracks', None)
+
+        # same arithmetic as ResLadderCore.draw_layout()
+        top_layer = ResArrayBase.get_port_layer_id(grid.tech_info) + 3
+        half_blk_x = params['half_blk_x'] if sub_w == 0 else False
+        core_box = cls.get_res_array_box(grid, params['l'], params['w'], sub_type, threshold,
+                                         nx + 2 * ndum, ny + 2 * ndum, top_layer,
+                                         min_tracks=(4, 7, nx, 1), connect_up=True,
+                                         half_blk_x=half_blk_x,
+                                         half_blk_y=params['half_blk_y'], **res_options)
+        return cls.get_wrapped_box(grid, core_box, top_layer, params['sub_lch'], sub_w,
+                                   sub_type, threshold, is_passive=True)
+
     def draw_layout(self):
         # type: () -> None
 
@@ -471,11 +544,25 @@ class ResLadderTop(TemplateBase):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
         TemplateBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
+        self._num_res = None
+        self._num_res_dum = None
 
     @property
     def sch_params(self):
         return self._sch_params
 
+    @property
+    def num_res(self):
+        # type: () -> int
+        """Number of resistors connected in the ladder, excluding dummies."""
+        return self._num_res
+
+    @property
+    def num_res_dum(self):
+        # type: () -> int
+        """Number of resistors connected as dummies."""
+        return self._num_res_dum
+
     @classmethod
     def get_params_info(cls):
         # type: () -> Dict[str, str]
@@ -486,6 +573,25 @@ class ResLadderTop(TemplateBase):
         # type: () -> Dict[str, Any]
         return ResLadder.get_default_param_values()
 
+    @classmethod
+    def estimate_size(cls, temp_db, params):
+        # type: (TemplateDB, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        temp_db : TemplateDB
+            the template database.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        return ResLadder.estimate_size(temp_db.grid, params)
+
     def draw_layout(self):
         # type: () -> None
         show_pins = self.params['show_pins']
@@ -507,6 +613,8 @@ class ResLadderTop(TemplateBase):
         self.set_size_from_bound_box(top_layer, master.bound_box)
         self.array_box = master.array_box
         self._sch_params = master.sch_params
+        self._num_res = master.num_res
+        self._num_res_dum = master.num_res_dum
 
         # get power fill width and spacing
         sup_width = 1
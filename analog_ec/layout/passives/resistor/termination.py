@@ -3,7 +3,7 @@
 """This module defines termination resistor layout generators.
 """
 
-from typing import TYPE_CHECKING, Dict, Set, Any, List
+from typing import TYPE_CHECKING, Dict, Set, Any, List, Tuple
 
 import math
 from itertools import chain
@@ -15,8 +15,9 @@ from abs_templates_ec.resistor.core import ResArrayBase
 from analog_ec.layout.passives.substrate import SubstrateWrapper
 
 if TYPE_CHECKING:
+    from bag.layout.util import BBox
     from bag.layout.template import TemplateDB
-    from bag.layout.routing import WireArray
+    from bag.layout.routing import RoutingGrid, WireArray
 
 
 class TerminationCore(ResArrayBase):
@@ -41,11 +42,25 @@ class TerminationCore(ResArrayBase):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
         ResArrayBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
+        self._res_set = set()
+        self._dum_set = set()
 
     @property
     def sch_params(self):
         return self._sch_params
 
+    @property
+    def num_res(self):
+        # type: () -> int
+        """Number of resistors connected in the termination, excluding dummies."""
+        return len(self._res_set)
+
+    @property
+    def num_res_dum(self):
+        # type: () -> int
+        """Number of resistors connected as dummies."""
+        return len(self._dum_set)
+
     @classmethod
     def get_params_info(cls):
         # type: () -> Dict[str, str]
@@ -59,6 +74,7 @@ class TerminationCore(ResArrayBase):
             ndum='number of dummy resistors.',
             port_layer='The port layer.',
             em_specs='EM specifications for the termination network.',
+            half_blk_x='True to allow half horizontal blocks.',
             show_pins='True to show pins.',
             res_options='Configuration dictionary for ResArrayBase.',
         )
@@ -68,25 +84,40 @@ class TerminationCore(ResArrayBase):
         # type: () -> Dict[str, Any]
         return dict(
             em_specs=None,
+            half_blk_x=True,
             show_pins=True,
             res_options=None,
         )
 
-    def draw_layout(self):
-        # type: () -> None
-        l = self.params['l']
-        w = self.params['w']
-        sub_type = self.params['sub_type']
-        threshold = self.params['threshold']
-        nser = self.params['nser']
-        npar = self.params['npar']
-        ndum = self.params['ndum']
-        port_layer = self.params['port_layer']
-        em_specs = self.params['em_specs']
-        show_pins = self.params['show_pins']
-        res_options = self.params['res_options']
-
-        bot_layer_id = self.bot_layer_id
+    @classmethod
+    def get_array_params(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> Tuple[int, int, Dict[str, Any]]
+        """Returns the resistor array size and the other draw_array() parameters.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values, including default values.
+
+        Returns
+        -------
+        nx : int
+            number of resistor columns.
+        ny : int
+            number of resistor rows.
+        arr_params : Dict[str, Any]
+            the other draw_array() parameters.
+        """
+        npar = params['npar']
+        nser = params['nser']
+        ndum = params['ndum']
+        port_layer = params['port_layer']
+        em_specs = params['em_specs']
+        res_options = params['res_options']
+
+        bot_layer_id = ResArrayBase.get_port_layer_id(grid.tech_info)
         if port_layer < bot_layer_id + 2:
             raise ValueError('port_layer = %d must be at least %d' % (port_layer, bot_layer_id + 2))
 
@@ -98,9 +129,8 @@ class TerminationCore(ResArrayBase):
             res_options = res_options.copy()
             res_options.pop('min_tracks')
 
-        direction = self.grid.get_direction(port_layer)
         min_tracks = [1] * (port_layer - bot_layer_id)
-        if direction == 'x':
+        if grid.get_direction(port_layer) == 'x':
             nx = npar + 2 * ndum
             ny = 2 * (nser + ndum)
             min_tracks[1] = 2
@@ -115,10 +145,60 @@ class TerminationCore(ResArrayBase):
             else:
                 div_em_specs[key] = 0.0
 
+        arr_params = dict(min_tracks=min_tracks, em_specs=div_em_specs, top_layer=port_layer,
+                          connect_up=True, half_blk_x=params['half_blk_x'], **res_options)
+        return nx, ny, arr_params
+
+    @classmethod
+    def estimate_size(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        nx, ny, arr_params = cls.get_array_params(grid, params)
+        return SubstrateWrapper.get_res_array_box(grid, params['l'], params['w'],
+                                                  params['sub_type'], params['threshold'],
+                                                  nx, ny, **arr_params)
+
+    def draw_layout(self):
+        # type: () -> None
+        l = self.params['l']
+        w = self.params['w']
+        sub_type = self.params['sub_type']
+        threshold = self.params['threshold']
+        nser = self.params['nser']
+        npar = self.params['npar']
+        ndum = self.params['ndum']
+        port_layer = self.params['port_layer']
+        em_specs = self.params['em_specs']
+        show_pins = self.params['show_pins']
+        res_options = self.params['res_options']
+
+        if em_specs is None:
+            em_specs = {}
+        if res_options is None:
+            res_options = {}
+
+        nx, ny, arr_params = self.get_array_params(self.grid, self.params)
+        direction = self.grid.get_direction(port_layer)
         port_width = self.grid.get_min_track_width(port_layer, **em_specs)
 
-        self.draw_array(l, w, sub_type, threshold, nx=nx, ny=ny, min_tracks=min_tracks,
-                        em_specs=div_em_specs, top_layer=port_layer, connect_up=True, **res_options)
+        self.draw_array(l, w, sub_type, threshold, nx=nx, ny=ny, **arr_params)
 
         dum_warrs = self._connect_dummies(direction, nx, ny, ndum)
 
@@ -217,6 +297,7 @@ class TerminationCore(ResArrayBase):
             for row_idx in range(ndum, ny - ndum - 1):
                 ports_b = self.get_res_ports(row_idx, col_idx)
                 ports_t = self.get_res_ports(row_idx + 1, col_idx)
+                self._res_set.update(((row_idx, col_idx), (row_idx + 1, col_idx)))
                 con_par = (col_idx + row_idx) % 2
                 mid_wire = self.connect_to_tracks([ports_b[con_par], ports_t[con_par]],
                                                   tr_id_sel[con_par])
@@ -240,6 +321,7 @@ class TerminationCore(ResArrayBase):
             for col_idx in range(ndum, nx - ndum - 1):
                 ports_l = self.get_res_ports(row_idx, col_idx)
                 ports_r = self.get_res_ports(row_idx, col_idx + 1)
+                self._res_set.update(((row_idx, col_idx), (row_idx, col_idx + 1)))
                 con_par = (col_idx + row_idx) % 2
                 mid_wire = self.connect_wires([ports_l[con_par], ports_r[con_par]])
                 if col_idx == ndum:
@@ -262,6 +344,7 @@ class TerminationCore(ResArrayBase):
             bot_warrs, top_warrs = [], []
             for col_idx in range(nx):
                 bot_port, top_port = self.get_res_ports(row_idx, col_idx)
+                self._dum_set.add((row_idx, col_idx))
                 bot_warrs.append(bot_port)
                 top_warrs.append(top_port)
             row_warrs.extend(self.connect_wires(bot_warrs))
@@ -273,6 +356,7 @@ class TerminationCore(ResArrayBase):
             bot_warrs, top_warrs = [], []
             for col_idx in range(0, ndum):
                 bot_port, top_port = self.get_res_ports(row_idx, col_idx)
+                self._dum_set.add((row_idx, col_idx))
                 bot_warrs.append(bot_port)
                 top_warrs.append(top_port)
             left_warrs.extend(self.connect_wires(bot_warrs))
@@ -280,6 +364,7 @@ class TerminationCore(ResArrayBase):
             bot_warrs, top_warrs = [], []
             for col_idx in range(nx - ndum, nx):
                 bot_port, top_port = self.get_res_ports(row_idx, col_idx)
+                self._dum_set.add((row_idx, col_idx))
                 bot_warrs.append(bot_port)
                 top_warrs.append(top_port)
             right_warrs.extend(self.connect_wires(bot_warrs))
@@ -368,6 +453,37 @@ class Termination(SubstrateWrapper):
             res_options=None,
         )
 
+    @classmethod
+    def estimate_size(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        core_params = params.copy()
+        sub_w = core_params.pop('sub_w')
+        sub_lch = core_params.pop('sub_lch')
+        if sub_w != 0:
+            # same as SubstrateWrapper.place_instances()
+            core_params['half_blk_x'] = False
+        core_box = TerminationCore.estimate_size(grid, core_params)
+        return cls.get_wrapped_box(grid, core_box, params['port_layer'], sub_lch, sub_w,
+                                   params['sub_type'], params['threshold'], is_passive=True)
+
     def draw_layout(self):
         # type: () -> None
 
@@ -409,11 +525,25 @@ class TerminationCMCore(ResArrayBase):
         # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
         ResArrayBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
+        self._res_set = set()
+        self._dum_set = set()
 
     @property
     def sch_params(self):
         return self._sch_params
 
+    @property
+    def num_res(self):
+        # type: () -> int
+        """Number of resistors connected in the termination, excluding dummies."""
+        return len(self._res_set)
+
+    @property
+    def num_res_dum(self):
+        # type: () -> int
+        """Number of resistors connected as dummies."""
+        return len(self._dum_set)
+
     @classmethod
     def get_default_param_values(cls):
         # type: () -> Dict[str, Any]
@@ -439,6 +569,72 @@ class TerminationCMCore(ResArrayBase):
             res_options='Configuration dictionary for ResArrayBase.',
         )
 
+    @classmethod
+    def get_array_params(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> Tuple[int, int, Dict[str, Any]]
+        """Returns the resistor array size and the other draw_array() parameters.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values, including default values.
+
+        Returns
+        -------
+        nx : int
+            number of resistor columns.
+        ny : int
+            number of resistor rows.
+        arr_params : Dict[str, Any]
+            the other draw_array() parameters.
+        """
+        nres = params['nres']
+        nseg = params['nseg']
+        ndum = params['ndum']
+        top_layer = params['top_layer']
+        res_options = params['res_options']
+
+        if nseg % 2 != 0 or nseg < 0:
+            raise ValueError('nseg = %d is not positive and even' % nseg)
+        if res_options is None:
+            res_options = {}
+        elif 'min_tracks' in res_options:
+            res_options = res_options.copy()
+            res_options.pop('min_tracks')
+        if top_layer is None:
+            top_layer = ResArrayBase.get_port_layer_id(grid.tech_info) + 2
+
+        arr_params = dict(min_tracks=(1, 2), top_layer=top_layer, **res_options)
+        return nseg + 2 * ndum, 2 * (nres + ndum), arr_params
+
+    @classmethod
+    def estimate_size(cls, grid, params):
+        # type: (RoutingGrid, Dict[str, Any]) -> BBox
+        """Returns the bounding box of this template without drawing it.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        params : Dict[str, Any]
+            the parameter values.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the bounding box of this template.
+        """
+        tmp = cls.get_default_param_values()
+        tmp.update(params)
+        params = tmp
+
+        nx, ny, arr_params = cls.get_array_params(grid, params)
+        return SubstrateWrapper.get_res_array_box(grid, params['l'], params['w'],
+                                                  params['sub_type'], params['threshold'],
+                                                  nx, ny, **arr_params)
+
     def draw_layout(self):
         # type: () -> None
         l = self.params['l']
@@ -449,27 +645,14 @@ class TerminationCMCore(ResArrayBase):
         nseg = self.params['nseg']
         ndum = self.params['ndum']
         show_pins = self.params['show_pins']
-        top_layer = self.params['top_layer']
         res_options = self.params['res_options']
 
-        bot_layer_id = self.bot_layer_id
-        hm_layer = bot_layer_id + 2
-
-        if nseg % 2 != 0 or nseg < 0:
-            raise ValueError('nseg = %d is not positive and even' % nseg)
+        hm_layer = self.bot_layer_id + 2
         if res_options is None:
             res_options = {}
-        elif 'min_tracks' in res_options:
-            res_options = res_options.copy()
-            res_options.pop('min_tracks')
-        if top_layer is None:
-            top_layer = hm_layer
 
-        min_tracks = (1, 2)
-        nx = nseg + 2 * ndum
-        ny = 2 * (nres + ndum)
-        self.draw_array(l, w, sub_type, threshold, nx=nx, ny=ny, min_tracks=min_tracks,
-                        top_layer=top_layer, **res_options)
+        nx, ny, arr_params = self.get_array_params(self.grid, self.params)
+        self.draw_array(l, w, sub_type, threshold, nx=nx, ny=ny, **arr_params)
 
         # connect resistors
         dum_warrs = self._connect_dummies('x', nx, ny, ndum)
@@ -521,11 +704,13 @@ class TerminationCMCore(ResArrayBase):
                 row_idx = row_offset_top + row_cnt
                 ports_b0 = self.get_res_ports(row_idx, col_idx)
                 ports_t0 = self.get_res_ports(row_idx + 1, col_idx)
+                self._res_set.update(((row_idx, col_idx), (row_idx + 1, col_idx)))
                 self.connect_to_tracks([ports_b0[con_par], ports_t0[con_par]], tr_id_sel[con_par])
                 # bottom half
                 row_idx = row_offset_bot - row_cnt
                 ports_t1 = self.get_res_ports(row_idx, col_idx)
                 ports_b1 = self.get_res_ports(row_idx - 1, col_idx)
+                self._res_set.update(((row_idx, col_idx), (row_idx - 1, col_idx)))
                 self.connect_to_tracks([ports_b1[1 - con_par], ports_t1[1 - con_par]],
                                        tr_id_sel[con_par])
                 # save input wires
@@ -550,6 +735,7 @@ class TerminationCMCore(ResArrayBase):
             for row_idx, port_idx in row_port_list:
                 ports_l = self.get_res_ports(row_idx, col_idx)
                 ports_r = self.get_res_ports(row_idx, col_idx + 1)
+                self._res_set.update(((row_idx, col_idx), (row_idx, col_idx + 1)))
                 self.connect_wires([ports_l[port_idx], ports_r[port_idx]])
 
         return inp, inn, incm
@@ -565,6 +751,7 @@ class TerminationCMCore(ResArrayBase):
             bot_warrs, top_warrs = [], []
             for col_idx in range(nx):
                 bot_port, top_port = self.get_res_ports(row_idx, col_idx)
+                self._dum_set.add((row_idx, col_idx))
                 bot_warrs.append(bot_port)
                 top_warrs.append(top_port)
             row_warrs.extend(self.connect_wires(bot_warrs))
@@ -576,6 +763,7 @@ class TerminationCMCore(ResArrayBase):
             bot_warrs, top_warrs = [], []
             for col_idx in range(0, ndum):
                 bot_port, top_port = self.get_res_ports(row_idx, col_idx)
+                self._dum_set.add((row_idx, col_idx))
                 bot_warrs.append(bot_port)
                 top_warrs.append(top_port)
             left_warrs.extend(self.connect_wires(bot_warrs))
@@ -583,6 +771,7 @@ class TerminationCMCore(ResArrayBase):
             bot_warrs, top_warrs = [], []
             for col_idx in range(nx - ndum, nx):
                 bot_port, top_port = self.get_res_ports(row_idx, col_idx)
+                self._dum_set.add((row_idx, col_idx))
                 bot_warrs.append(bot_port)
                 top_warrs.append(top_port)
             right_warrs.extend(self.connect_wires(bot_warrs))
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from typing import TYPE_CHECKING, Dict, Any, Set, Union
+from typing import TYPE_CHECKING, Dict, Any, Set, Union, Tuple, Optional
 
 import importlib
 
@@ -9,11 +9,17 @@ from bag.layout.template import TemplateBase
 
 from abs_templates_ec.analog_core.base import AnalogBase
 from abs_templates_ec.analog_core.substrate import SubstrateContact
+from abs_templates_ec.resistor.core import ResArrayBaseInfo
+
+from ..routing import get_grid_signature
 
 if TYPE_CHECKING:
     from bag.layout.routing import RoutingGrid
     from bag.layout.template import TemplateDB
 
+# substrate height cache, keyed by grid signature and substrate parameters.
+_sub_height_cache = {}  # type: Dict[Tuple[Any, ...], int]
+
 
 class SubstrateWrapper(TemplateBase):
     """A class that appended substrate contacts on top and bottom of a given block.
@@ -38,6 +44,8 @@ class SubstrateWrapper(TemplateBase):
         TemplateBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
         self._sch_params = None
         self._fg_sub = None
+        self._num_dev = {}
+        self._fill_info = None
 
     @property
     def sch_params(self):
@@ -49,13 +57,57 @@ class SubstrateWrapper(TemplateBase):
         # type: () -> int
         return self._fg_sub
 
+    @property
+    def num_res(self):
+        # type: () -> Optional[int]
+        """Number of non-dummy resistors in the wrapped block.  None if unknown."""
+        return self._num_dev.get('num_res', None)
+
+    @property
+    def num_res_dum(self):
+        # type: () -> Optional[int]
+        """Number of dummy resistors in the wrapped block.  None if unknown."""
+        return self._num_dev.get('num_res_dum', None)
+
+    @property
+    def num_fg(self):
+        # type: () -> Optional[int]
+        """Number of non-dummy transistor fingers in the wrapped block.  None if unknown."""
+        return self._num_dev.get('num_fg', None)
+
+    @property
+    def num_fg_dum(self):
+        # type: () -> Optional[int]
+        """Number of dummy transistor fingers in the wrapped block.  None if unknown."""
+        return self._num_dev.get('num_fg_dum', None)
+
+    @property
+    def fill_info(self):
+        # type: () -> Optional[Dict[str, Any]]
+        """The deferred dummy fill information of the wrapped block, None if not deferred.
+
+        The fill box is in the coordinate of this template.
+        """
+        return self._fill_info
+
     @classmethod
     def get_substrate_height(cls, grid, top_layer, lch, w, sub_type, threshold,
                              end_mode=15, **kwargs):
         # type: (RoutingGrid, int, float, Union[int, float], str, str, int, **kwargs) -> int
-        """Compute height of the substrate contact block, given parameters."""
-        return SubstrateContact.get_substrate_height(grid, top_layer, lch, w, sub_type, threshold,
-                                                     end_mode=end_mode, **kwargs)
+        """Compute height of the substrate contact block, given parameters.
+
+        Results are cached, keyed by the signature of the routing grid layers from the
+        transistor connection layer up to top_layer, and by the substrate parameters.
+        """
+        hm_layer = AnalogBase.get_mos_conn_layer(grid.tech_info) + 1
+        grid_key = get_grid_signature(grid, layers=range(hm_layer, top_layer + 1))
+        key = (grid_key, grid.get_block_size(top_layer, unit_mode=True), top_layer, lch, w,
+               sub_type, threshold, end_mode, tuple(sorted(kwargs.items())))
+        ans = _sub_height_cache.get(key, None)
+        if ans is None:
+            ans = _sub_height_cache[key] = SubstrateContact.get_substrate_height(
+                grid, top_layer, lch, w, sub_type, threshold, end_mode=end_mode, **kwargs)
+        return ans
 
     @classmethod
     def get_sub_end_modes(cls, end_mode):
@@ -63,6 +115,113 @@ class SubstrateWrapper(TemplateBase):
         top_end_mode = ((end_mode | 0b0011) & 0b1110) | ((end_mode & 0b0010) >> 1)
         return bot_end_mode, top_end_mode
 
+    @classmethod
+    def get_res_array_box(cls, grid, l, w, sub_type, threshold, nx, ny, top_layer,
+                          min_tracks=None, em_specs=None, min_height=0, half_blk_x=True,
+                          half_blk_y=True, **kwargs):
+        # type: (RoutingGrid, float, float, str, str, int, int, int, Any, Any, int, bool, bool, **Any) -> BBox
+        """Returns the bounding box ResArrayBase.draw_array() will produce, without drawing.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        l : float
+            unit resistor length, in meters.
+        w : float
+            unit resistor width, in meters.
+        sub_type : str
+            the substrate type.
+        threshold : str
+            the substrate threshold flavor.
+        nx : int
+            number of resistors in a row.
+        ny : int
+            number of resistors in a column.
+        top_layer : int
+            the top quantization layer.
+        min_tracks : Any
+            minimum number of tracks on each layer, same as draw_array().
+        em_specs : Any
+            EM specifications, same as draw_array().
+        min_height : int
+            the minimum array height, in resolution units.
+        half_blk_x : bool
+            True to allow half horizontal blocks.
+        half_blk_y : bool
+            True to allow half vertical blocks.
+        **kwargs :
+            other ResArrayBaseInfo parameters, such as res_type, grid_type, ext_dir, options,
+            and connect_up.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the resistor array bounding box.
+        """
+        res = grid.resolution
+        lay_unit = grid.layout_unit
+        l_unit = int(round(l / lay_unit / res))
+        w_unit = int(round(w / lay_unit / res))
+        info = ResArrayBaseInfo(grid, sub_type, threshold, top_layer=top_layer,
+                                half_blk_x=half_blk_x, half_blk_y=half_blk_y, **kwargs)
+        place_info = info.get_place_info(l_unit, w_unit, nx, ny, min_tracks=min_tracks,
+                                         em_specs=em_specs)
+        blk_w, blk_h = grid.get_block_size(top_layer, unit_mode=True, half_blk_x=half_blk_x,
+                                           half_blk_y=half_blk_y)
+        w_tot = -(-place_info[2] // blk_w) * blk_w
+        h_tot = -(-max(place_info[3], min_height) // blk_h) * blk_h
+        return BBox(0, 0, w_tot, h_tot, res, unit_mode=True)
+
+    @classmethod
+    def get_wrapped_box(cls, grid, core_box, top_layer, sub_lch, sub_w, sub_type, threshold,
+                        end_mode=15, is_passive=True, bot_only=False):
+        # type: (RoutingGrid, BBox, int, float, float, str, str, int, bool, bool) -> BBox
+        """Returns the bounding box place_instances() will produce for the given core.
+
+        Parameters
+        ----------
+        grid : RoutingGrid
+            the routing grid.
+        core_box : BBox
+            the core bounding box.  The core must be drawn with half_blk_x = False if
+            sub_w is not 0.
+        top_layer : int
+            the core top layer ID.
+        sub_lch : float
+            substrate contact channel length.
+        sub_w : float
+            substrate contact width.  0 if no substrate contacts are drawn.
+        sub_type : str
+            the substrate type.
+        threshold : str
+            the substrate threshold flavor.
+        end_mode : int
+            the substrate end mode.
+        is_passive : bool
+            True if the core is a passive device.
+        bot_only : bool
+            True if only the bottom substrate contact is drawn.
+
+        Returns
+        -------
+        bnd_box : BBox
+            the wrapped bounding box.
+        """
+        if sub_w == 0:
+            return core_box
+
+        bot_end_mode, top_end_mode = cls.get_sub_end_modes(end_mode)
+        height = core_box.height_unit + cls.get_substrate_height(grid, top_layer, sub_lch, sub_w,
+                                                                 sub_type, threshold,
+                                                                 end_mode=bot_end_mode,
+                                                                 is_passive=is_passive)
+        if not bot_only:
+            height += cls.get_substrate_height(grid, top_layer, sub_lch, sub_w, sub_type,
+                                               threshold, end_mode=top_end_mode,
+                                               is_passive=is_passive)
+        return BBox(0, 0, core_box.width_unit, height, grid.resolution, unit_mode=True)
+
     @classmethod
     def get_params_info(cls):
         # type: () -> Dict[str, str]
@@ -249,5 +408,12 @@ class SubstrateWrapper(TemplateBase):
         self._sch_params = master.sch_params.copy()
         self._sch_params['sub_name'] = sub_port_name
         self._fg_sub = fg_sub
+        self._num_dev = {name: getattr(master, name, None)
+                         for name in ('num_res', 'num_res_dum', 'num_fg', 'num_fg_dum')}
+        fill_info = getattr(master, 'fill_info', None)
+        if fill_info is not None:
+            fill_info = fill_info.copy()
+            fill_info['fill_box'] = inst.translate_master_box(fill_info['fill_box'])
+        self._fill_info = fill_info
 
         return inst, sub_insts, sub_port_name
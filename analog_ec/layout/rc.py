@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""This module contains a geometric RC estimator for routing wires.
+
+Resistance uses the sheet resistance of each layer, and capacitance uses an area plus
+fringe model, so routes can be sized without running the external extractor.  The RC
+table maps each routing layer ID to a dictionary with entries:
+
+rsh : float
+    sheet resistance, in ohms per square.
+ca : float
+    area capacitance, in farads per square meter.
+cf : float
+    fringe capacitance of each wire edge, in farads per meter.
+
+A tech RC table can be given in the tech parameters under layout/rc_extract.  Technologies
+without that entry have no tech RC table, and an RC table must be given explicitly.
+"""
+
+from typing import TYPE_CHECKING, Dict, List, Tuple, Iterable, Optional
+
+if TYPE_CHECKING:
+    from bag.layout.core import TechInfo
+    from bag.layout.routing import RoutingGrid, WireArray
+
+# a wire segment, as (layer ID, wire width, wire length, number of parallel wires).
+# widths and lengths are in resolution units.
+WireInfo = Tuple[int, int, int, int]
+# the RC table, from layer ID to RC parameters.
+RCTable = Dict[int, Dict[str, float]]
+
+
+def get_tech_rc_table(tech_info):
+    # type: (TechInfo) -> Optional[RCTable]
+    """Returns the RC table in the tech parameters, or None if there is no RC table."""
+    return tech_info.tech_params.get('layout', {}).get('rc_extract', None)
+
+
+def get_wire_info(grid, warr):
+    # type: (RoutingGrid, WireArray) -> WireInfo
+    """Returns the wire segment information of the given WireArray.
+
+    Parameters
+    ----------
+    grid : RoutingGrid
+        the routing grid.
+    warr : WireArray
+        the wire array.
+
+    Returns
+    -------
+    info : WireInfo
+        the (layer ID, wire width, wire length, number of parallel wires) tuple.
+    """
+    tid = warr.track_id
+    width = grid.get_track_width(tid.layer_id, tid.width, unit_mode=True)
+    return tid.layer_id, width, warr.upper_unit - warr.lower_unit, tid.num
+
+
+def get_segment_rc(wire, rc_table, scale):
+    # type: (WireInfo, RCTable, float) -> Tuple[float, float]
+    """Returns the (resistance, capacitance) of the given wire segment.
+
+    Parallel wires in a segment are assumed to share current equally.  scale is the size of
+    a resolution unit in meters.
+    """
+    lay_id, width, length, num = wire
+    if lay_id not in rc_table:
+        raise ValueError('No RC information for layer %d.' % lay_id)
+    lay_info = rc_table[lay_id]
+    w = width * scale
+    l = length * scale
+    return (lay_info['rsh'] * l / w / num,
+            num * (lay_info['ca'] * w * l + 2 * lay_info['cf'] * l))
+
+
+def estimate_rc(wire_list, rc_table, res, layout_unit):
+    # type: (Iterable[WireInfo], RCTable, float, float) -> Tuple[float, float, float]
+    """Estimate the resistance, capacitance, and delay of a net.
+
+    Wire segments of a net are assumed to be in series, ordered from the driver to the far
+    end.  The delay is the Elmore delay of the distributed line, where each segment sees half
+    of its own capacitance and all capacitance after it.  For a uniform wire this is
+    0.5 * R * C, not the lumped R * C.
+
+    Parameters
+    ----------
+    wire_list : Iterable[WireInfo]
+        the wire segments of the net, from the driver to the far end.
+    rc_table : RCTable
+        the RC table.
+    res : float
+        the layout resolution.
+    layout_unit : float
+        the layout unit, in meters.
+
+    Returns
+    -------
+    r : float
+        the total series resistance, in ohms.
+    c : float
+        the total capacitance to ground, in farads.
+    delay : float
+        the Elmore delay from the driver to the far end, in seconds.
+    """
+    scale = res * layout_unit
+    rc_list = [get_segment_rc(wire, rc_table, scale) for wire in wire_list]
+    r_tot = sum((r for r, _ in rc_list))
+    c_tot = sum((c for _, c in rc_list))
+    delay = 0.0
+    c_rem = c_tot
+    for r, c in rc_list:
+        c_rem -= c
+        delay += r * (c / 2 + c_rem)
+    return r_tot, c_tot, delay
+
+
+def estimate_rc_table(net_table, rc_table, grid):
+    # type: (Dict[str, List[WireInfo]], RCTable, RoutingGrid) -> Dict[str, Tuple[float, ...]]
+    """Estimate the resistance, capacitance, and delay of all given nets.
+
+    See :func:`estimate_rc` for the delay model.
+
+    Parameters
+    ----------
+    net_table : Dict[str, List[WireInfo]]
+        dictionary from net name to list of wire segments, from the driver to the far end.
+    rc_table : RCTable
+        the RC table.
+    grid : RoutingGrid
+        the routing grid.
+
+    Returns
+    -------
+    result : Dict[str, Tuple[float, ...]]
+        dictionary from net name to (resistance, capacitance, Elmore delay) tuple.
+    """
+    res = grid.resolution
+    layout_unit = grid.layout_unit
+    return {name: estimate_rc(wire_list, rc_table, res, layout_unit)
+            for name, wire_list in net_table.items()}
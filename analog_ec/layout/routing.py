@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""This module contains routing helper methods shared by various layout generators."""
+
+from typing import (TYPE_CHECKING, Sequence, Union, List, Callable, Optional, Iterable, Tuple, Any,
+                    Dict)
+
+import numpy as np
+
+from bag.layout.routing.base import TrackID, WireArray
+
+if TYPE_CHECKING:
+    from bag.layout.objects import Instance
+    from bag.layout.routing import RoutingGrid
+    from bag.layout.template import TemplateBase
+
+
+def get_grid_signature(grid, layers=None):
+    # type: (RoutingGrid, Optional[Iterable[int]]) -> Tuple[Any, ...]
+    """Returns a hashable signature of the given routing grid.
+
+    Routing grids are copied for every template, so they cannot be used as cache keys
+    directly.  The signature contains the resolution, the flip parity, and the direction,
+    pitch, unit width, and offset of every given routing layer.
+
+    Parameters
+    ----------
+    grid : RoutingGrid
+        the routing grid.
+    layers : Optional[Iterable[int]]
+        the routing layers to include.  Defaults to all layers of the grid.
+
+    Returns
+    -------
+    signature : Tuple[Any, ...]
+        the routing grid signature.
+    """
+    if layers is None:
+        layers = grid.layers
+    lay_info = tuple((lay, grid.get_direction(lay),
+                      grid.get_track_pitch(lay, unit_mode=True),
+                      grid.get_track_width(lay, 1, unit_mode=True),
+                      grid.track_to_coord(lay, 0, unit_mode=True))
+                     for lay in layers)
+    return grid.resolution, tuple(sorted(grid.get_flip_parity().items())), lay_info
+
+
+def get_arith_runs(tr_list):
+    # type: (Sequence[Union[float, int]]) -> List[List[int]]
+    """Partition the given track indices into maximal arithmetic sequences.
+
+    This method is used to emit many wires as a few arrayed WireArrays.  Track indices
+    are compared in half-track units, and duplicate indices always start a new sequence.
+
+    Parameters
+    ----------
+    tr_list : Sequence[Union[float, int]]
+        list of track indices, in any order.
+
+    Returns
+    -------
+    run_list : List[List[int]]
+        list of arithmetic sequences.  Each sequence is a list of indices into tr_list,
+        sorted in increasing track index order.
+    """
+    htr_list = [int(round(2 * tr_idx)) for tr_idx in tr_list]
+    run_list = []
+    cur_run = []
+    htr_pitch = 0
+    for idx in sorted(range(len(htr_list)), key=lambda x: htr_list[x]):
+        if cur_run:
+            htr_diff = htr_list[idx] - htr_list[cur_run[-1]]
+            if len(cur_run) == 1 and htr_diff > 0:
+                htr_pitch = htr_diff
+                cur_run.append(idx)
+                continue
+            elif len(cur_run) > 1 and htr_diff == htr_pitch:
+                cur_run.append(idx)
+                continue
+            run_list.append(cur_run)
+        cur_run = [idx]
+
+    if cur_run:
+        run_list.append(cur_run)
+    return run_list
+
+
+def get_mosaic_pins(inst, port_name):
+    # type: (Instance, str) -> np.ndarray
+    """Returns the first pin of the given port on every element of a mosaic instance.
+
+    This is the arrayed equivalent of calling get_pins(row=row, col=col)[0] on every
+    element.
+
+    Parameters
+    ----------
+    inst : Instance
+        the mosaic instance.
+    port_name : str
+        the port name.
+
+    Returns
+    -------
+    pin_arr : np.ndarray
+        a 2D object array of WireArrays, indexed by [row, column].
+    """
+    nx, ny = inst.nx, inst.ny
+    pin_arr = np.empty(nx * ny, dtype=object)
+    pin_arr[:] = [pins[0] for pins in get_element_pins(inst, port_name)]
+    return pin_arr.reshape(nx, ny).T
+
+
+def get_element_pins(inst, port_name):
+    # type: (Instance, str) -> List[List[WireArray]]
+    """Returns the pins of the given port on each element of a mosaic instance.
+
+    Every element has the same master, so every element has the same number of pins.
+
+    Parameters
+    ----------
+    inst : Instance
+        the mosaic instance.
+    port_name : str
+        the port name.
+
+    Returns
+    -------
+    pin_lists : List[List[WireArray]]
+        the pins of each element, in column-major order (index = col * ny + row).
+    """
+    num_elem = inst.nx * inst.ny
+    pin_list = inst.get_all_port_pins(port_name)
+    num_pins = len(pin_list) // num_elem
+    if num_pins == 0 or num_pins * num_elem != len(pin_list):
+        raise ValueError('Port %s has %d pins on a %d x %d mosaic.'
+                         % (port_name, len(pin_list), inst.ny, inst.nx))
+    return [pin_list[idx:idx + num_pins] for idx in range(0, len(pin_list), num_pins)]
+
+
+def merge_wire_arrays(warr_list, resolution):
+    # type: (Iterable[WireArray], float) -> List[WireArray]
+    """Merge the given wires into as few arrayed WireArrays as possible.
+
+    Wires with the same layer, width, and extent are merged, one WireArray per arithmetic
+    run of tracks.
+
+    Parameters
+    ----------
+    warr_list : Iterable[WireArray]
+        the wires to merge.
+    resolution : float
+        the layout resolution.
+
+    Returns
+    -------
+    merged_list : List[WireArray]
+        the merged wires.
+    """
+    groups = {}
+    for warr in warr_list:
+        for single in warr.to_warr_list():
+            tid = single.track_id
+            key = (tid.layer_id, tid.width, single.lower_unit, single.upper_unit)
+            groups.setdefault(key, []).append(tid.base_index)
+
+    ans = []
+    for (lay_id, width, lower, upper), tr_list in groups.items():
+        for run in get_arith_runs(tr_list):
+            tr0 = tr_list[run[0]]
+            pitch = tr_list[run[1]] - tr0 if len(run) > 1 else 0
+            tid = TrackID(lay_id, tr0, width=width, num=len(run), pitch=pitch)
+            ans.append(WireArray(tid, lower, upper, res=resolution, unit_mode=True))
+    return ans
+
+
+def reexport_mosaic_ports(template, inst, name, index_fun, nbits=0, new_name=None,
+                          show=True):
+    # type: (TemplateBase, Instance, str, Callable, int, Optional[str], bool) -> None
+    """Re-export a port bus of every element of a mosaic instance with new bus indices.
+
+    Pins are grouped by new net name, and each net is exported with a single add_pin()
+    call.  Pins of the same net are merged into arrayed WireArrays with merge_wire_arrays(),
+    so a port that maps every element to the same net is exported as a few arrayed wires.
+    All pins of every element are kept.
+
+    Parameters
+    ----------
+    template : TemplateBase
+        the template to add pins to.
+    inst : Instance
+        the mosaic instance.
+    name : str
+        the port base name.  If nbits is 0, this is the port name, otherwise ports are
+        named '<name><bit>'.
+    index_fun : Callable[[int, int, int], Optional[int]]
+        a function from (row, column, bit) to the new bus index.  None to use new_name
+        directly as the net name.
+    nbits : int
+        number of bits of the port bus on each element.  0 if the port is not a bus.
+    new_name : Optional[str]
+        the new base name.  Defaults to name.
+    show : bool
+        True to show pins.
+    """
+    if new_name is None:
+        new_name = name
+    ny = inst.ny
+    net_table = {}  # type: Dict[str, List[WireArray]]
+    for bit in range(max(nbits, 1)):
+        old_name = name if nbits == 0 else '%s<%d>' % (name, bit)
+        for elem_idx, pin_list in enumerate(get_element_pins(inst, old_name)):
+            col, row = divmod(elem_idx, ny)
+            new_idx = index_fun(row, col, bit)
+            net_name = new_name if new_idx is None else '%s<%d>' % (new_name, new_idx)
+            net_table.setdefault(net_name, []).extend(pin_list)
+
+    res = template.grid.resolution
+    for net_name, pin_list in net_table.items():
+        template.add_pin(net_name, merge_wire_arrays(pin_list, res), show=show)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""This module contains the standard cell base class shared by all standard cell generators."""
+
+from typing import TYPE_CHECKING, Dict, Any, Tuple, Set
+
+import os
+import weakref
+
+from bag.io import read_yaml
+from bag.layout.digital import StdCellTemplate, StdCellBase
+
+from .routing import get_grid_signature
+
+if TYPE_CHECKING:
+    from bag.layout.routing import RoutingGrid
+    from bag.layout.template import TemplateDB
+
+# parsed standard cell configuration files, keyed by configuration key.
+_config_cache = {}  # type: Dict[Tuple[str, float], Dict[str, Any]]
+# derived standard cell routing grids of each template database, keyed by configuration key
+# and base grid signature.
+_grid_cache = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary
+
+
+def get_config_key(config_file):
+    # type: (str) -> Tuple[str, float]
+    """Returns the (absolute path, modification time) key of the given configuration file.
+
+    Keying on modification time makes sure an edited configuration file is read again.
+    """
+    fname = os.path.abspath(config_file)
+    return fname, os.path.getmtime(fname)
+
+
+def get_std_config(config_file):
+    # type: (str) -> Dict[str, Any]
+    """Returns the parsed standard cell configuration file.
+
+    Each configuration file is parsed once per process.  The returned dictionary is shared,
+    so it must not be modified.
+    """
+    key = get_config_key(config_file)
+    ans = _config_cache.get(key, None)
+    if ans is None:
+        ans = _config_cache[key] = read_yaml(key[0])
+    return ans
+
+
+class StdCellCachedBase(StdCellBase):
+    """A StdCellBase that shares the derived routing grid across templates.
+
+    Every standard cell generator derives the same routing grid from the same configuration
+    file.  This class keeps the derived grids of each template database, keyed by the
+    configuration file path and modification time and by the signature of the incoming
+    routing grid.  The cache is released with the template database.
+
+    Parameters
+    ----------
+    temp_db : TemplateDB
+        the template database.
+    lib_name : str
+        the layout library name.
+    params : Dict[str, Any]
+        the parameter values.
+    used_names : Set[str]
+        a set of already used cell names.
+    **kwargs :
+        dictionary of optional parameters.  See documentation of
+        :class:`bag.layout.template.TemplateBase` for details.
+    """
+
+    def __init__(self, temp_db, lib_name, params, used_names, **kwargs):
+        # type: (TemplateDB, str, Dict[str, Any], Set[str], **kwargs) -> None
+        StdCellBase.__init__(self, temp_db, lib_name, params, used_names, **kwargs)
+        self._std_grid_cache = _grid_cache.setdefault(temp_db, {})  # type: Dict[Any, RoutingGrid]
+
+    def update_routing_grid(self):
+        # type: () -> None
+        """Add standard cell routing layers to the routing grid.
+
+        The derived routing grid depends on every layer and the flip parity of the incoming
+        routing grid, so the grid signature is part of the cache key.
+        """
+        key = get_config_key(self.params['config_file']) + get_grid_signature(self.grid)
+        grid = self._std_grid_cache.get(key, None)
+        if grid is None:
+            StdCellBase.update_routing_grid(self)
+            self._std_grid_cache[key] = self.grid.copy()
+        else:
+            self.grid = grid.copy()
+
+    def get_std_master(self, cell_name):
+        # type: (str) -> StdCellTemplate
+        """Returns the standard cell master with the given name.
+
+        Parameters
+        ----------
+        cell_name : str
+            the standard cell name.
+
+        Returns
+        -------
+        master : StdCellTemplate
+            the standard cell master.
+        """
+        params = dict(cell_name=cell_name, config_file=self.params['config_file'])
+        return self.new_template(params=params, temp_cls=StdCellTemplate)
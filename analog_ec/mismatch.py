@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+"""This module contains a fast Monte Carlo mismatch model of the resistor ladder.
+
+The model follows the serpentine connection order of ResLadderCore: the ladder starts at
+VSS at the bottom left resistor, goes left to right on even rows and right to left on odd
+rows, and ends at VDD at the top row.  Each trial draws random Pelgrom mismatch for every
+resistor, plus a random linear gradient across the array, and computes the tap voltages
+of all trials at once with NumPy.
+"""
+
+from typing import Dict, Any, Tuple, Optional
+
+import numpy as np
+
+
+def get_serpentine_coord(nx, ny):
+    # type: (int, int) -> Tuple[np.ndarray, np.ndarray]
+    """Returns the (row, column) index of each ladder resistor, in order from VSS.
+
+    Parameters
+    ----------
+    nx : int
+        number of resistors in a row.
+    ny : int
+        number of resistors in a column.
+
+    Returns
+    -------
+    row_arr : np.ndarray
+        the row index of each resistor.
+    col_arr : np.ndarray
+        the column index of each resistor.
+    """
+    idx_arr = np.arange(nx * ny)
+    row_arr = idx_arr // nx
+    col_arr = idx_arr % nx
+    odd_row = row_arr % 2 == 1
+    col_arr[odd_row] = nx - 1 - col_arr[odd_row]
+    return row_arr, col_arr
+
+
+class ResLadderMismatch(object):
+    """A Monte Carlo mismatch model of the ResLadderCore resistor ladder.
+
+    INL and DNL are in LSBs, where one LSB is the ideal tap step (VDD - VSS) / (nx * ny).
+    Since the ladder ends are tied to VDD and VSS, the end points are exact and INL is
+    the deviation from the end point fit.
+
+    Parameters
+    ----------
+    nx : int
+        number of resistors in a row.
+    ny : int
+        number of resistors in a column.
+    l : float
+        unit resistor length, in meters.
+    w : float
+        unit resistor width, in meters.
+    a_r : float
+        Pelgrom coefficient of the relative resistance, in meters.  The relative
+        resistance standard deviation of a unit resistor is a_r / sqrt(w * l).
+    grad_sigma : float
+        standard deviation of the relative resistance gradient, from the array center to
+        the array edge, along each direction.
+    grad : Tuple[float, float]
+        a fixed (x, y) relative resistance gradient, from the array center to the array
+        edge, added to the random gradient.
+    seed : Optional[int]
+        the random number generator seed.
+    """
+
+    def __init__(self, nx, ny, l, w, a_r, grad_sigma=0.0, grad=(0.0, 0.0), seed=None):
+        # type: (int, int, float, float, float, float, Tuple[float, float], Optional[int]) -> None
+        if nx <= 0 or ny <= 0:
+            raise ValueError('nx and ny must be positive.')
+
+        self._num = nx * ny
+        self._sigma = a_r / np.sqrt(w * l)
+        self._grad_sigma = grad_sigma
+        self._grad = np.array(grad, dtype=float)
+        self._rng = np.random.RandomState(seed)
+
+        # normalized resistor coordinates, from -1 to 1 across the array
+        row_arr, col_arr = get_serpentine_coord(nx, ny)
+        xn = 1.0 if nx == 1 else (nx - 1) / 2
+        yn = 1.0 if ny == 1 else (ny - 1) / 2
+        self._coord = np.stack(((col_arr - (nx - 1) / 2) / xn,
+                                (row_arr - (ny - 1) / 2) / yn))
+
+    @classmethod
+    def from_layout_params(cls, params, a_r, **kwargs):
+        # type: (Dict[str, Any], float, **Any) -> ResLadderMismatch
+        """Create the model from ResLadderCore or ResLadder layout parameters.
+
+        Parameters
+        ----------
+        params : Dict[str, Any]
+            the layout parameters.  Uses the nx, ny, l, and w entries.
+        a_r : float
+            Pelgrom coefficient of the relative resistance, in meters.
+        **kwargs : Any
+            other model parameters.
+
+        Returns
+        -------
+        model : ResLadderMismatch
+            the mismatch model.
+        """
+        return cls(params['nx'], params['ny'], params['l'], params['w'], a_r, **kwargs)
+
+    @property
+    def sigma(self):
+        # type: () -> float
+        """Relative resistance standard deviation of a unit resistor."""
+        return self._sigma
+
+    def sample_res(self, num_trials):
+        # type: (int) -> np.ndarray
+        """Returns relative resistance samples, with shape (num_trials, nx * ny)."""
+        res = 1.0 + self._sigma * self._rng.standard_normal((num_trials, self._num))
+        grad = self._grad + self._grad_sigma * self._rng.standard_normal((num_trials, 2))
+        res += grad.dot(self._coord)
+        return res
+
+    def run(self, num_trials, batch_size=10000):
+        # type: (int, int) -> Dict[str, np.ndarray]
+        """Run the Monte Carlo simulation.
+
+        Parameters
+        ----------
+        num_trials : int
+            number of trials.
+        batch_size : int
+            maximum number of trials computed at once.
+
+        Returns
+        -------
+        results : Dict[str, np.ndarray]
+            the results dictionary.  'inl' is the INL of taps 0 to nx * ny, with shape
+            (num_trials, nx * ny + 1).  'dnl' is the DNL of each tap step, with shape
+            (num_trials, nx * ny).
+        """
+        num = self._num
+        inl = np.empty((num_trials, num + 1))
+        dnl = np.empty((num_trials, num))
+        ideal = np.arange(num + 1)
+        for start in range(0, num_trials, batch_size):
+            stop = min(start + batch_size, num_trials)
+            res = self.sample_res(stop - start)
+            scale = num / res.sum(axis=1, keepdims=True)
+            dnl[start:stop] = res * scale - 1
+            inl[start:stop, 0] = 0
+            np.cumsum(res * scale, axis=1, out=inl[start:stop, 1:])
+            inl[start:stop] -= ideal
+
+        return dict(inl=inl, dnl=dnl)
+
+    def get_stats(self, num_trials, batch_size=10000):
+        # type: (int, int) -> Dict[str, np.ndarray]
+        """Run the Monte Carlo simulation and returns INL/DNL statistics.
+
+        Parameters
+        ----------
+        num_trials : int
+            number of trials.
+        batch_size : int
+            maximum number of trials computed at once.
+
+        Returns
+        -------
+        stats : Dict[str, np.ndarray]
+            the statistics dictionary.  'inl_std' and 'dnl_std' are the standard deviations
+            of each tap, and 'inl_max' and 'dnl_max' are the maximum absolute INL/DNL of
+            each trial.
+        """
+        results = self.run(num_trials, batch_size=batch_size)
+        inl = results['inl']
+        dnl = results['dnl']
+        return dict(
+            inl_std=inl.std(axis=0),
+            dnl_std=dnl.std(axis=0),
+            inl_max=np.abs(inl).max(axis=1),
+            dnl_max=np.abs(dnl).max(axis=1),
+        )
@@ -0,0 +1,653 @@
+# -*- coding: utf-8 -*-
+
+"""This module writes CDL netlists of schematic generators without a schematic database.
+
+A NetlistDB runs the design() method of each BagModules schematic generator on a lightweight
+NetlistModule, which reads the netlist_info YAML file and records the effect of
+array_instance(), rename_pin(), reconnect_instance_terminal() and the other Module methods
+in memory.  The designed hierarchy is then written out directly as a hierarchical CDL
+netlist, with one subcircuit per unique (cell, parameters) pair.  This is meant for
+simulation loops; LVS netlists should still come from the schematic database.
+
+BAG_prim devices are netlisted with the model names of the technology, read from the
+BAG_prim entries of netlist_map in the netlist setup file of the tech config directory,
+$BAG_TECH_CONFIG_DIR/netlist_setup/netlist_setup.yaml.  Each entry maps a primitive cell
+name, such as nmos4_lvt or res_metal_4, to a dictionary whose 'cell_name' entry is the
+model or subcircuit name.
+"""
+
+from typing import Dict, Any, List, Tuple, Optional, Union
+
+import os
+import re
+import copy
+import importlib
+
+import yaml
+
+from bag import float_to_si_string
+
+from BagModules.bag_analog_ec.design_cache import freeze_params
+from BagModules.bag_analog_ec.registry import load_netlist_info
+
+# library cells that mark pins or no-connects, and are not netlisted.
+_skip_libs = frozenset(('basic', ))
+
+# terminal order of primitive devices.
+_prim_terms = {
+    'nmos4': ('D', 'G', 'S', 'B'),
+    'pmos4': ('D', 'G', 'S', 'B'),
+    'res': ('PLUS', 'MINUS', 'BULK'),
+    'res_metal': ('PLUS', 'MINUS'),
+    'cap': ('PLUS', 'MINUS'),
+    'vcvs': ('PLUS', 'MINUS', 'NC+', 'NC-'),
+    'ideal_balun': ('d', 'c', 'p', 'n'),
+}
+
+# primitive model table, from primitive cell name to netlist information.
+PrimTable = Dict[str, Dict[str, Any]]
+
+_bus_re = re.compile(r'^(.*)<(\d+)(?::(\d+))?>$')
+_rep_re = re.compile(r'^<\*(\d+)>(.*)$')
+
+
+def expand_name(name):
+    # type: (str) -> List[str]
+    """Expands the given bus name string into a list of single bit names.
+
+    Supports comma-separated lists, 'a<3:0>' and 'a<0:3>' ranges, 'a<2>' single bits, and
+    '<*2>a' repetition.
+
+    Parameters
+    ----------
+    name : str
+        the bus name string.
+
+    Returns
+    -------
+    bit_list : List[str]
+        the single bit names, in order.
+    """
+    ans = []
+    for term in name.split(','):
+        term = term.strip()
+        if not term:
+            continue
+        num_rep = 1
+        mat = _rep_re.match(term)
+        if mat is not None:
+            num_rep = int(mat.group(1))
+            term = mat.group(2)
+        mat = _bus_re.match(term)
+        if mat is None:
+            bits = [term]
+        else:
+            base = mat.group(1)
+            start = int(mat.group(2))
+            if mat.group(3) is None:
+                bits = ['%s<%d>' % (base, start)]
+            else:
+                stop = int(mat.group(3))
+                step = -1 if stop < start else 1
+                bits = ['%s<%d>' % (base, idx) for idx in range(start, stop + step, step)]
+        ans.extend(bits * num_rep)
+    return ans
+
+
+def get_prim_table(fname=None):
+    # type: (Optional[str]) -> PrimTable
+    """Returns the BAG_prim model table from the netlist setup file.
+
+    Parameters
+    ----------
+    fname : Optional[str]
+        the netlist setup file.  Defaults to netlist_setup/netlist_setup.yaml in the
+        $BAG_TECH_CONFIG_DIR directory.
+
+    Returns
+    -------
+    prim_table : PrimTable
+        dictionary from primitive cell name to netlist information.
+    """
+    if fname is None:
+        tech_dir = os.environ.get('BAG_TECH_CONFIG_DIR', None)
+        if tech_dir is None:
+            raise ValueError('BAG_TECH_CONFIG_DIR is not set; cannot find netlist setup.')
+        fname = os.path.join(tech_dir, 'netlist_setup', 'netlist_setup.yaml')
+    with open(fname, 'r') as f:
+        setup = yaml.load(f)
+    try:
+        return setup['netlist_map']['BAG_prim']
+    except KeyError:
+        raise ValueError('No netlist_map/BAG_prim entry in %s.' % fname)
+
+
+def get_base_name(name):
+    # type: (str) -> str
+    """Returns the given pin name without the bus suffix."""
+    mat = _bus_re.match(name)
+    return name if mat is None else mat.group(1)
+
+
+def _set_term(conns, term, net):
+    # type: (Dict[str, str], str, str) -> None
+    """Connect the given instance terminal, replacing connections of the same base name."""
+    base = get_base_name(term)
+    for key in list(conns.keys()):
+        if key != term and get_base_name(key) == base:
+            del conns[key]
+    conns[term] = net
+
+
+def _format_value(val):
+    # type: (Any) -> str
+    """Returns the netlist string of the given parameter value."""
+    if isinstance(val, float):
+        return float_to_si_string(val)
+    return str(val)
+
+
+class NetlistInstance(object):
+    """An instance in a NetlistModule.
+
+    Parameters
+    ----------
+    db : NetlistDB
+        the netlist database.
+    name : str
+        the instance name.  May be an arrayed name such as 'XR<3:0>'.
+    lib_name : str
+        the master library name.
+    cell_name : str
+        the master cell name.
+    conns : Dict[str, str]
+        dictionary from terminal name to net name.
+    """
+
+    def __init__(self, db, name, lib_name, cell_name, conns):
+        # type: (NetlistDB, str, str, str, Dict[str, str]) -> None
+        self._db = db
+        self.name = name
+        self.lib_name = lib_name
+        self.cell_name = cell_name
+        self.conns = conns
+        self.parameters = {}  # type: Dict[str, Any]
+        self.master = None  # type: Optional[NetlistModule]
+        self.static = False
+
+    def copy(self, name):
+        # type: (str) -> NetlistInstance
+        """Returns a copy of this instance with the given name."""
+        ans = NetlistInstance(self._db, name, self.lib_name, self.cell_name, dict(self.conns))
+        ans.parameters = copy.deepcopy(self.parameters)
+        ans.master = self.master
+        ans.static = self.static
+        return ans
+
+    def design(self, **kwargs):
+        # type: (**Any) -> None
+        """Design this instance.
+
+        Instances of schematic generators get a designed master; primitive instances only
+        record the given parameters.
+        """
+        if not self.static and self._db.is_generator(self.lib_name, self.cell_name):
+            self.master = self._db.new_master(self.lib_name, self.cell_name, kwargs)
+        else:
+            self.parameters.update(kwargs)
+
+
+class NetlistModule(object):
+    """An in-memory stand-in of bag.design.Module that records schematic edits.
+
+    Parameters
+    ----------
+    db : NetlistDB
+        the netlist database.
+    lib_name : str
+        the library name.
+    cell_name : str
+        the cell name.
+    yaml_file : str
+        the netlist_info YAML file of this cell.
+    """
+
+    def __init__(self, db, lib_name, cell_name, yaml_file):
+        # type: (NetlistDB, str, str, str) -> None
+        info = load_netlist_info(yaml_file)
+
+        self._db = db
+        self.lib_name = lib_name
+        self.cell_name = cell_name
+        self.subckt_name = cell_name
+        self.parameters = {}  # type: Dict[str, Any]
+        self.pins = list(info['pins'])
+        # maps current pin names to pin names in the YAML file
+        self.pin_origin = {name: name for name in self.pins}
+        self.instances = {}  # type: Dict[str, Union[NetlistInstance, List[NetlistInstance]]]
+        for inst_name, inst_info in info['instances'].items():
+            if inst_info['lib_name'] in _skip_libs:
+                continue
+            conns = {term: term_info['net_name']
+                     for term, term_info in inst_info['instpins'].items()}
+            self.instances[inst_name] = NetlistInstance(db, inst_name, inst_info['lib_name'],
+                                                        inst_info['cell_name'], conns)
+
+    def _get_inst_list(self, inst_name, index=None):
+        # type: (str, Optional[int]) -> List[NetlistInstance]
+        inst = self.instances[inst_name]
+        if isinstance(inst, list):
+            return inst if index is None else [inst[index]]
+        return [inst]
+
+    def rename_pin(self, old_pin, new_pin):
+        # type: (str, str) -> None
+        idx = self.pins.index(old_pin)
+        self.pins[idx] = new_pin
+        self.pin_origin[new_pin] = self.pin_origin.pop(old_pin)
+
+    def add_pin(self, new_pin, pin_type):
+        # type: (str, str) -> None
+        self.pins.append(new_pin)
+        self.pin_origin[new_pin] = new_pin
+
+    def remove_pin(self, remove_pin):
+        # type: (str) -> None
+        self.pins.remove(remove_pin)
+        del self.pin_origin[remove_pin]
+
+    def delete_instance(self, inst_name):
+        # type: (str) -> None
+        del self.instances[inst_name]
+
+    def replace_instance_master(self, inst_name, lib_name, cell_name, static=False, index=None):
+        # type: (str, str, str, bool, Optional[int]) -> None
+        for inst in self._get_inst_list(inst_name, index=index):
+            inst.lib_name = lib_name
+            inst.cell_name = cell_name
+            inst.static = static
+            inst.master = None
+            inst.parameters = {}
+
+    def reconnect_instance_terminal(self, inst_name, term_name, net_name, index=None):
+        # type: (str, str, str, Optional[int]) -> None
+        for inst in self._get_inst_list(inst_name, index=index):
+            _set_term(inst.conns, term_name, net_name)
+
+    def array_instance(self, inst_name, inst_name_list, term_list=None):
+        # type: (str, List[str], Optional[List[Dict[str, str]]]) -> None
+        orig = self._get_inst_list(inst_name)[0]
+        new_list = []
+        for idx, new_name in enumerate(inst_name_list):
+            inst = orig.copy(new_name)
+            if term_list is not None:
+                for term, net in term_list[idx].items():
+                    _set_term(inst.conns, term, net)
+            new_list.append(inst)
+        self.instances[inst_name] = new_list
+
+    def design_dummy_transistors(self, dum_info, inst_name, vdd_name, vss_name):
+        # type: (List[Tuple[Any, ...]], str, str, str) -> None
+        if not dum_info:
+            self.delete_instance(inst_name)
+            return
+
+        self.array_instance(inst_name, ['XDUMMY%d' % idx for idx in range(len(dum_info))])
+        for idx, ((mos_type, w, lch, th, s_net, d_net), fg) in enumerate(dum_info):
+            if mos_type == 'pch':
+                cell_name = 'pmos4_standard'
+                sup_name = vdd_name
+            else:
+                cell_name = 'nmos4_standard'
+                sup_name = vss_name
+            self.replace_instance_master(inst_name, 'BAG_prim', cell_name, static=True,
+                                         index=idx)
+            self.reconnect_instance_terminal(inst_name, 'G', sup_name, index=idx)
+            self.reconnect_instance_terminal(inst_name, 'B', sup_name, index=idx)
+            self.reconnect_instance_terminal(inst_name, 'D', d_net or sup_name, index=idx)
+            self.reconnect_instance_terminal(inst_name, 'S', s_net or sup_name, index=idx)
+            self.instances[inst_name][idx].design(w=w, l=lch, nf=fg, intent=th)
+
+    def get_pin_bits(self):
+        # type: () -> List[str]
+        """Returns the single bit names of all pins of this cell."""
+        ans = []
+        for pin in self.pins:
+            ans.extend(expand_name(pin))
+        return ans
+
+    def _get_term_bits(self, inst, term, width, num_inst):
+        # type: (NetlistInstance, str, int, int) -> List[List[str]]
+        """Returns the net bits connected to the given terminal of each arrayed instance."""
+        net = inst.conns.get(term, None)
+        if net is None:
+            base = get_base_name(term)
+            for key, val in inst.conns.items():
+                if get_base_name(key) == base:
+                    net = val
+                    break
+            else:
+                raise ValueError('Terminal %s of instance %s in cell %s is not '
+                                 'connected.' % (term, inst.name, self.cell_name))
+
+        net_bits = expand_name(net)
+        if len(net_bits) == width:
+            return [net_bits] * num_inst
+        if len(net_bits) == width * num_inst:
+            return [net_bits[idx * width:(idx + 1) * width] for idx in range(num_inst)]
+        raise ValueError('Cannot connect net %s to terminal %s of instance %s in cell %s.'
+                         % (net, term, inst.name, self.cell_name))
+
+    def get_inst_conns(self, inst):
+        # type: (NetlistInstance) -> List[Tuple[str, List[Tuple[str, str]]]]
+        """Returns the single bit connections of the given instance.
+
+        Parameters
+        ----------
+        inst : NetlistInstance
+            the instance.
+
+        Returns
+        -------
+        conn_list : List[Tuple[str, List[Tuple[str, str]]]]
+            list of (instance bit name, list of (terminal bit name, net bit name)), in
+            instance bit order.  Terminals are in netlist order.
+        """
+        inst_bits = expand_name(inst.name)
+        num_inst = len(inst_bits)
+        master = inst.master
+        if master is not None:
+            # schematic generator instance; connect by pin names of the master
+            term_list = []
+            for pin in master.pins:
+                term_list.append((pin, master.pin_origin[pin]))
+        else:
+            prim_key = inst.cell_name
+            if prim_key not in _prim_terms:
+                prim_key = prim_key.rsplit('_', 1)[0]
+            if prim_key in _prim_terms:
+                term_list = [(term, term) for term in _prim_terms[prim_key]]
+            else:
+                term_list = [(term, term)
+                             for term in self._db.get_cell_pins(inst.lib_name, inst.cell_name)]
+
+        conn_list2 = [[] for _ in range(num_inst)]  # type: List[List[Tuple[str, str]]]
+        for pin, orig_pin in term_list:
+            pin_bits = expand_name(pin)
+            term = pin if pin in inst.conns or orig_pin not in inst.conns else orig_pin
+            for conns, bits in zip(conn_list2, self._get_term_bits(inst, term, len(pin_bits),
+                                                                   num_inst)):
+                conns.extend(zip(pin_bits, bits))
+
+        return list(zip(inst_bits, conn_list2))
+
+    def _get_inst_lines(self, inst):
+        # type: (NetlistInstance) -> List[str]
+        """Returns the netlist lines of the given instance."""
+        if inst.master is not None:
+            cell_name = inst.master.subckt_name
+            prefix = 'X'
+            par_str = ''
+        else:
+            cell_name, prefix, par_str = self._db.get_prim_info(inst)
+
+        lines = []
+        for inst_bit, conns in self.get_inst_conns(inst):
+            if inst_bit[0].upper() != prefix:
+                inst_bit = prefix + inst_bit
+            nets = ' '.join((net for _, net in conns))
+            line = '%s %s / %s%s' % (inst_bit, nets, cell_name, par_str)
+            if prefix == 'M':
+                line = line.replace(' / ', ' ')
+            lines.append(line)
+        return lines
+
+    def get_all_instances(self):
+        # type: () -> List[NetlistInstance]
+        """Returns all netlisted instances of this cell, sorted by name."""
+        ans = []
+        for inst_name in sorted(self.instances.keys()):
+            for inst in self._get_inst_list(inst_name):
+                if inst.lib_name not in _skip_libs:
+                    ans.append(inst)
+        return ans
+
+    def get_subckt_lines(self, subckt_name=None):
+        # type: (Optional[str]) -> List[str]
+        """Returns the subcircuit definition lines of this cell.
+
+        Parameters
+        ----------
+        subckt_name : Optional[str]
+            the subcircuit name.  Defaults to the subckt_name attribute.
+        """
+        if subckt_name is None:
+            subckt_name = self.subckt_name
+        lines = ['.SUBCKT %s %s' % (subckt_name, ' '.join(self.get_pin_bits()))]
+        for inst in self.get_all_instances():
+            lines.extend(self._get_inst_lines(inst))
+        lines.append('.ENDS')
+        return lines
+
+    def get_children(self):
+        # type: () -> List[NetlistModule]
+        """Returns the unique designed masters of all instances."""
+        ans = []
+        for inst in self.get_all_instances():
+            if inst.master is not None and inst.master not in ans:
+                ans.append(inst.master)
+        return ans
+
+
+class NetlistDB(object):
+    """A database of designed NetlistModules.
+
+    Each unique (library, cell, parameters) triple is designed once and becomes one
+    subcircuit.  Cells without a BagModules schematic generator, and masters replaced
+    with static=True, are netlisted as calls to subcircuits defined elsewhere, with the pin
+    order of their netlist_info files.
+
+    Parameters
+    ----------
+    prim_table : Optional[PrimTable]
+        the BAG_prim model table.  Defaults to the table in the netlist setup file, which
+        is only read when a primitive is netlisted.
+    """
+
+    def __init__(self, prim_table=None):
+        # type: (Optional[PrimTable]) -> None
+        self._prim_table = prim_table
+        self._master_table = {}  # type: Dict[Tuple[Any, ...], NetlistModule]
+        self._name_cnt = {}  # type: Dict[str, int]
+        self._gen_table = {}  # type: Dict[Tuple[str, str], Optional[Tuple[type, str]]]
+
+    def _get_generator(self, lib_name, cell_name):
+        # type: (str, str) -> Optional[Tuple[type, str]]
+        """Returns the (schematic generator class, YAML file) tuple of the given cell."""
+        key = (lib_name, cell_name)
+        if key not in self._gen_table:
+            try:
+                mod = importlib.import_module('BagModules.%s.%s' % (lib_name, cell_name))
+            except ImportError:
+                self._gen_table[key] = None
+            else:
+                cls = getattr(mod, '%s__%s' % (lib_name, cell_name))
+                yaml_file = getattr(mod, 'yaml_file', None)
+                if yaml_file is None:
+                    registry = importlib.import_module('BagModules.%s.registry' % lib_name)
+                    yaml_file = registry.get_yaml_file(cell_name)
+                self._gen_table[key] = cls, yaml_file
+        return self._gen_table[key]
+
+    def is_generator(self, lib_name, cell_name):
+        # type: (str, str) -> bool
+        """Returns True if the given cell has a BagModules schematic generator."""
+        return self._get_generator(lib_name, cell_name) is not None
+
+    def get_cell_pins(self, lib_name, cell_name):
+        # type: (str, str) -> List[str]
+        """Returns the pin names of the given cell, in subcircuit definition order.
+
+        The pin order is read from the netlist_info YAML file of the cell.
+
+        Parameters
+        ----------
+        lib_name : str
+            the library name.
+        cell_name : str
+            the cell name.
+
+        Returns
+        -------
+        pins : List[str]
+            the pin names.
+        """
+        gen_info = self._get_generator(lib_name, cell_name)
+        if gen_info is not None:
+            yaml_file = gen_info[1]
+        else:
+            try:
+                registry = importlib.import_module('BagModules.%s.registry' % lib_name)
+            except ImportError:
+                yaml_file = None
+            else:
+                yaml_file = registry.get_yaml_file(cell_name)
+        if yaml_file is None or not os.path.isfile(yaml_file):
+            raise ValueError('Cannot find the pin order of %s__%s: no netlist_info file.'
+                             % (lib_name, cell_name))
+        return list(load_netlist_info(yaml_file)['pins'])
+
+    def new_master(self, lib_name, cell_name, params):
+        # type: (str, str, Dict[str, Any]) -> NetlistModule
+        """Returns the designed NetlistModule of the given cell and parameters.
+
+        Parameters
+        ----------
+        lib_name : str
+            the library name.
+        cell_name : str
+            the cell name.
+        params : Dict[str, Any]
+            the design() parameters.
+
+        Returns
+        -------
+        master : NetlistModule
+            the designed module.
+        """
+        gen_info = self._get_generator(lib_name, cell_name)
+        if gen_info is None:
+            raise ValueError('Cannot find schematic generator of %s__%s.'
+                             % (lib_name, cell_name))
+        gen_cls, yaml_file = gen_info
+        design_params = gen_cls.get_default_param_values()
+        design_params.update(params)
+
+        key = (lib_name, cell_name, freeze_params(design_params))
+        master = self._master_table.get(key, None)
+        if master is None:
+            master = NetlistModule(self, lib_name, cell_name, yaml_file)
+            master.parameters.update(design_params)
+            # run the undecorated design method on this module
+            design_fun = getattr(gen_cls.design, '__wrapped__', gen_cls.design)
+            design_fun(master, **design_params)
+            cnt = self._name_cnt.get(cell_name, 0)
+            if cnt > 0:
+                master.subckt_name = '%s_%d' % (cell_name, cnt)
+            self._name_cnt[cell_name] = cnt + 1
+            self._master_table[key] = master
+        return master
+
+    def get_prim_info(self, inst):
+        # type: (NetlistInstance) -> Tuple[str, str, str]
+        """Returns the (model or cell name, name prefix, parameter string) of a primitive."""
+        params = dict(inst.parameters)
+        cell_name = inst.cell_name
+        prefix = 'X'
+        if inst.lib_name == 'BAG_prim':
+            intent = params.pop('intent', None)
+            if cell_name.startswith('nmos4') or cell_name.startswith('pmos4'):
+                prefix = 'M'
+                if intent is not None:
+                    cell_name = '%s_%s' % (cell_name.split('_', 1)[0], intent)
+            elif cell_name == 'res_metal':
+                cell_name = 'res_metal_%s' % params.pop('layer', '')
+            elif intent is not None:
+                cell_name = 'res_%s' % intent
+
+            if self._prim_table is None:
+                self._prim_table = get_prim_table()
+            prim_info = self._prim_table.get(cell_name, None)
+            if prim_info is None:
+                raise ValueError('No netlist model for BAG_prim cell %s.' % cell_name)
+            cell_name = prim_info['cell_name']
+
+        par_str = ''.join((' %s=%s' % (key, _format_value(params[key]))
+                           for key in sorted(params.keys())))
+        return cell_name, prefix, par_str
+
+    def get_netlist(self, lib_name, cell_name, params, top_name=None):
+        # type: (str, str, Dict[str, Any], Optional[str]) -> str
+        """Design the given cell and returns its hierarchical CDL netlist.
+
+        Parameters
+        ----------
+        lib_name : str
+            the library name.
+        cell_name : str
+            the cell name.
+        params : Dict[str, Any]
+            the design() parameters.
+        top_name : Optional[str]
+            the top level subcircuit name.  Defaults to the cell name.
+
+        Returns
+        -------
+        netlist : str
+            the netlist.
+        """
+        top = self.new_master(lib_name, cell_name, params)
+
+        # write children before parents
+        order = []  # type: List[NetlistModule]
+        visited = set()
+
+        def add_master(master):
+            # type: (NetlistModule) -> None
+            if id(master) not in visited:
+                visited.add(id(master))
+                for child in master.get_children():
+                    add_master(child)
+                order.append(master)
+
+        add_master(top)
+        lines = ['* generated by analog_ec.netlist', '']
+        for master in order:
+            lines.extend(master.get_subckt_lines(top_name if master is top else None))
+            lines.append('')
+        return '\n'.join(lines)
+
+
+def write_netlist(fname, lib_name, cell_name, params, top_name=None, prim_table=None):
+    # type: (str, str, str, Dict[str, Any], Optional[str], Optional[PrimTable]) -> None
+    """Write the CDL netlist of the given schematic generator to a file.
+
+    Parameters
+    ----------
+    fname : str
+        the output file name.
+    lib_name : str
+        the library name.
+    cell_name : str
+        the cell name.
+    params : Dict[str, Any]
+        the design() parameters.
+    top_name : Optional[str]
+        the top level subcircuit name.  Defaults to the cell name.
+    prim_table : Optional[PrimTable]
+        the BAG_prim model table.  Defaults to the table in the netlist setup file.
+    """
+    netlist_db = NetlistDB(prim_table=prim_table)
+    content = netlist_db.get_netlist(lib_name, cell_name, params, top_name=top_name)
+    with open(fname, 'w') as f:
+        f.write(content)
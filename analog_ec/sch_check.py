@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""This module checks layout generators against the schematics designed from their sch_params.
+
+The schematic generator is designed in memory with :class:`analog_ec.netlist.NetlistDB`,
+so no schematic database or LVS run is needed.  The checker compares the schematic pins
+with the layout pins, and the schematic device counts with the num_res/num_res_dum and
+num_fg/num_fg_dum properties of layout generators that have them.  SubstrateWrapper and
+ResLadderTop forward these properties from the block they wrap.  Resistors are counted
+per device, and transistors per finger.  A schematic resistor with both terminals on the
+same net, or a transistor with its gate on the body net, is counted as a dummy.
+"""
+
+from typing import TYPE_CHECKING, Dict, Any, List, Set, Tuple, Optional, Iterable
+
+from .netlist import NetlistDB, NetlistModule, expand_name
+
+if TYPE_CHECKING:
+    from bag.layout.template import TemplateBase
+
+
+def get_device_type(lib_name, cell_name):
+    # type: (str, str) -> Optional[str]
+    """Returns the device type of the given primitive cell, or None if it is not a device."""
+    if lib_name != 'BAG_prim':
+        return None
+    if cell_name.startswith('nmos4') or cell_name.startswith('pmos4'):
+        return 'mos'
+    if cell_name.startswith('res'):
+        return 'res'
+    return None
+
+
+def get_device_key(dev_type, conns, params):
+    # type: (str, Dict[str, str], Dict[str, Any]) -> Tuple[str, int]
+    """Returns the count key and count of a single primitive device.
+
+    Parameters
+    ----------
+    dev_type : str
+        the device type, either 'mos' or 'res'.
+    conns : Dict[str, str]
+        dictionary from terminal bit name to net bit name.
+    params : Dict[str, Any]
+        the device parameters.
+
+    Returns
+    -------
+    key : str
+        the count key.  One of 'mos', 'mos_dum', 'res', or 'res_dum'.
+    num : int
+        the count.  Number of fingers for transistors, 1 for resistors.
+    """
+    if dev_type == 'mos':
+        key = 'mos_dum' if conns['G'] == conns['B'] else 'mos'
+        return key, int(params.get('nf', 1))
+    key = 'res_dum' if conns['PLUS'] == conns['MINUS'] else 'res'
+    return key, 1
+
+
+def get_device_counts(master, table=None):
+    # type: (NetlistModule, Optional[Dict[int, Dict[str, int]]]) -> Dict[str, int]
+    """Returns the number of primitive devices of each type in the given designed module.
+
+    Parameters
+    ----------
+    master : NetlistModule
+        the designed module.
+    table : Optional[Dict[int, Dict[str, int]]]
+        device counts of already counted modules, keyed by id().
+
+    Returns
+    -------
+    counts : Dict[str, int]
+        dictionary from count key to number of devices.  See get_device_key().
+    """
+    if table is None:
+        table = {}
+    memo_key = id(master)
+    if memo_key in table:
+        return table[memo_key]
+
+    counts = {}  # type: Dict[str, int]
+    for inst in master.get_all_instances():
+        if inst.master is not None:
+            num_inst = len(expand_name(inst.name))
+            for key, num in get_device_counts(inst.master, table=table).items():
+                counts[key] = counts.get(key, 0) + num_inst * num
+        else:
+            dev_type = get_device_type(inst.lib_name, inst.cell_name)
+            if dev_type is not None:
+                for _, conns in master.get_inst_conns(inst):
+                    key, num = get_device_key(dev_type, dict(conns), inst.parameters)
+                    counts[key] = counts.get(key, 0) + num
+
+    table[memo_key] = counts
+    return counts
+
+
+def get_sch_summary(lib_name, cell_name, sch_params, db=None):
+    # type: (str, str, Dict[str, Any], Optional[NetlistDB]) -> Tuple[Set[str], Dict[str, int]]
+    """Design the given schematic generator and returns its pins and device counts.
+
+    Parameters
+    ----------
+    lib_name : str
+        the schematic library name.
+    cell_name : str
+        the schematic cell name.
+    sch_params : Dict[str, Any]
+        the schematic parameters.
+    db : Optional[NetlistDB]
+        the netlist database.  A new one is created if None.
+
+    Returns
+    -------
+    pin_set : Set[str]
+        the single bit pin names.
+    counts : Dict[str, int]
+        dictionary from count key to number of devices.  See get_device_key().
+    """
+    if db is None:
+        db = NetlistDB()
+    master = db.new_master(lib_name, cell_name, sch_params)
+    return set(master.get_pin_bits()), get_device_counts(master)
+
+
+def get_layout_pins(master):
+    # type: (TemplateBase) -> Set[str]
+    """Returns the single bit pin names of the given layout master."""
+    ans = set()
+    for name in master.port_names_iter():
+        ans.update(expand_name(name))
+    return ans
+
+
+def check_sch_params(master, lib_name, cell_name, ignore_pins=None, db=None):
+    # type: (TemplateBase, str, str, Optional[Iterable[str]], Optional[NetlistDB]) -> List[str]
+    """Check the given layout master against the schematic designed from its sch_params.
+
+    Parameters
+    ----------
+    master : TemplateBase
+        the layout master.  Must have a sch_params property.
+    lib_name : str
+        the schematic library name.
+    cell_name : str
+        the schematic cell name.
+    ignore_pins : Optional[Iterable[str]]
+        pin names to ignore, such as supply pins added by a wrapper.
+    db : Optional[NetlistDB]
+        the netlist database.  A new one is created if None.
+
+    Returns
+    -------
+    err_list : List[str]
+        list of mismatch descriptions.  Empty if no mismatch is found.
+    """
+    sch_pins, sch_counts = get_sch_summary(lib_name, cell_name, master.sch_params, db=db)
+    lay_pins = get_layout_pins(master)
+    if ignore_pins is not None:
+        ignore_set = set()
+        for name in ignore_pins:
+            ignore_set.update(expand_name(name))
+        sch_pins -= ignore_set
+        lay_pins -= ignore_set
+
+    err_list = []
+    for msg, pin_set in (('pins only in schematic', sch_pins - lay_pins),
+                         ('pins only in layout', lay_pins - sch_pins)):
+        if pin_set:
+            err_list.append('%s: %s' % (msg, ', '.join(sorted(pin_set))))
+
+    for key, prop_name, dev_name in (('res', 'num_res', 'resistor'),
+                                     ('res_dum', 'num_res_dum', 'dummy resistor'),
+                                     ('mos', 'num_fg', 'transistor finger'),
+                                     ('mos_dum', 'num_fg_dum', 'dummy transistor finger')):
+        num_lay = getattr(master, prop_name, None)
+        num_sch = sch_counts.get(key, 0)
+        if num_lay is not None and num_lay != num_sch:
+            err_list.append('%s count mismatch: layout = %d, schematic = %d'
+                            % (dev_name, num_lay, num_sch))
+    return err_list
@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+
+"""This module contains an incremental LVS/RCX scheduler.
+
+Every layout master generated in the TemplateDB is fingerprinted from its master key, its
+drawn layout content (every shape, via, pin, and child instance), its port names, its
+schematic parameters, and the fingerprints of its child masters.  The layout content is only
+available if the TemplateDB does not use cybagoa.  Otherwise, the drawn content is replaced
+by all source files in the packages of the layout generator class and its base classes, so
+edits in helper modules are still detected.  A cell fingerprint is the fingerprint of its
+master plus its library, cell, routing grid, the technology parameters, and the source
+files of all schematic generators.  Any change in the hierarchy, technology, or schematic
+generators changes the fingerprint of every cell it affects.  Verification results are
+stored per fingerprint in a JSON file.
+
+Besides the top cells given by the specs, every generated master with a schematic is
+verified as its own cell.  A master has a schematic if it has schematic parameters and its
+layout generator class maps to a schematic cell in the schematic table.  The schematic
+cells written for the top cell are named after schematic generators, not layout masters,
+so each such master is written to a separate verification cell, '<cell>_verify'.  The
+schematic cells below it get the suffix '_<cell>_verify', so they never replace cells
+written for the top cell.  Only cells whose fingerprint changed since the last run are
+regenerated and verified.  A change in one sub-block reverifies that sub-block and the cells
+above it, and reuses the cached results of all other sub-blocks.
+
+Cell specs use the same format as :mod:`analog_ec.generator`.
+
+Verification runs are coroutines gathered with BAG's batch_async_task() in the calling
+thread.  BAG's subprocess manager bounds the number of concurrent LVS/RCX runs; local
+commands are bounded by CommandRunner.
+"""
+
+from typing import TYPE_CHECKING, Dict, Any, List, Tuple, Sequence, Optional, Union, Iterable
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import importlib
+
+from bag.concurrent.core import batch_async_task
+
+if TYPE_CHECKING:
+    from bag.core import BagProject
+    from bag.layout.template import TemplateDB, TemplateBase
+    from .generator import GeneratorSession
+
+# cache of source file hashes, keyed by file name and modification time.
+_source_hash_cache = {}  # type: Dict[str, str]
+# suffix of the cells used to verify generated masters on their own.
+VERIFY_SUFFIX = '_verify'
+
+
+class CommandRunner(object):
+    """Runs a local verification command.
+
+    This is useful as a stand-in for LVS/RCX when testing verification flows.
+
+    Parameters
+    ----------
+    cmd : Sequence[str]
+        the command arguments.  '{lib}' and '{cell}' are replaced by the library and cell
+        names.
+    timeout : Optional[float]
+        the command timeout in seconds.
+    max_workers : int
+        maximum number of concurrent commands.
+    """
+
+    def __init__(self, cmd, timeout=None, max_workers=4):
+        # type: (Sequence[str], Optional[float], int) -> None
+        self._cmd = list(cmd)
+        self._timeout = timeout
+        self._max_workers = max_workers
+        self._sem = None  # type: Optional[asyncio.Semaphore]
+
+    async def async_verify(self, lib_name, cell_name):
+        # type: (str, str) -> Tuple[bool, str]
+        """Run the command on the given cell.  Returns (passed, log)."""
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self._max_workers)
+        args = [arg.format(lib=lib_name, cell=cell_name) for arg in self._cmd]
+        async with self._sem:
+            proc = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE,
+                                                        stderr=asyncio.subprocess.STDOUT)
+            try:
+                stdout, _ = await asyncio.wait_for(proc.communicate(), self._timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return False, 'command timed out: %s' % ' '.join(args)
+        return proc.returncode == 0, stdout.decode('utf-8', errors='replace')
+
+
+class BagRunner(object):
+    """Runs LVS, and optionally RCX, with the BagProject implementation database.
+
+    Parameters
+    ----------
+    prj : BagProject
+        the BagProject instance.
+    rcx : bool
+        True to run RCX after LVS passes.
+    """
+
+    def __init__(self, prj, rcx=False):
+        # type: (BagProject, bool) -> None
+        self._prj = prj
+        self._rcx = rcx
+
+    async def async_verify(self, lib_name, cell_name):
+        # type: (str, str) -> Tuple[bool, str]
+        """Run LVS, and optionally RCX, on the given cell.  Returns (passed, log file)."""
+        impl_db = self._prj.impl_db
+        passed, log = await impl_db.async_run_lvs(lib_name, cell_name)
+        if passed and self._rcx:
+            netlist, log = await impl_db.async_run_rcx(lib_name, cell_name)
+            passed = bool(netlist)
+        return passed, log
+
+
+# a verification runner.
+VerifyRunner = Union[CommandRunner, BagRunner]
+
+
+def _get_file_hash(fname):
+    # type: (str) -> str
+    """Returns the SHA-1 hash of the given file, cached by modification time."""
+    key = '%s:%r' % (fname, os.path.getmtime(fname))
+    file_hash = _source_hash_cache.get(key, None)
+    if file_hash is None:
+        with open(fname, 'rb') as f:
+            file_hash = _source_hash_cache[key] = hashlib.sha1(f.read()).hexdigest()
+    return file_hash
+
+
+def get_package_hash(pkg_names):
+    # type: (Iterable[str]) -> str
+    """Returns a hash of all source files of the given packages.
+
+    Every Python and YAML file in the package directories is hashed, whether it is imported
+    or not, so helper modules and netlist_info files are covered.
+
+    Parameters
+    ----------
+    pkg_names : Iterable[str]
+        the top level package names.
+
+    Returns
+    -------
+    pkg_hash : str
+        the hash of all package source files.
+    """
+    md = hashlib.sha1()
+    for pkg_name in sorted(set(pkg_names)):
+        pkg = importlib.import_module(pkg_name)
+        pkg_dirs = getattr(pkg, '__path__', None)
+        if pkg_dirs is None:
+            # a single module
+            md.update(('%s:%s' % (pkg_name, _get_file_hash(pkg.__file__))).encode('utf-8'))
+            continue
+        for pkg_dir in sorted(pkg_dirs):
+            for root, dir_names, file_names in os.walk(pkg_dir):
+                dir_names.sort()
+                for name in sorted(file_names):
+                    if name.endswith('.py') or name.endswith('.yaml'):
+                        fname = os.path.join(root, name)
+                        md.update(('%s/%s:%s' % (pkg_name, os.path.relpath(fname, pkg_dir),
+                                                 _get_file_hash(fname))).encode('utf-8'))
+    return md.hexdigest()
+
+
+def get_source_hash(temp_cls):
+    # type: (type) -> str
+    """Returns a hash of the source files of the packages of the given class.
+
+    The packages are the top level packages of the given class and all of its base
+    classes.  See get_package_hash().
+    """
+    pkg_names = set()
+    for cls in temp_cls.__mro__:
+        if cls.__module__ != 'builtins':
+            pkg_names.add(cls.__module__.split('.', 1)[0])
+    return get_package_hash(pkg_names)
+
+
+def get_tech_hash(temp_db):
+    # type: (TemplateDB) -> str
+    """Returns a hash of the technology parameters of the given TemplateDB."""
+    return _hash_content(temp_db.grid.tech_info.tech_params)
+
+
+def get_layout_hash(temp_db, master):
+    # type: (TemplateDB, TemplateBase) -> Optional[str]
+    """Returns a hash of the drawn layout content of the given master.
+
+    The content contains every shape, via, pin, and child instance of the master, but not
+    the content of its child masters.
+
+    Parameters
+    ----------
+    temp_db : TemplateDB
+        the template database containing the master.
+    master : TemplateBase
+        the layout master.
+
+    Returns
+    -------
+    layout_hash : Optional[str]
+        the layout content hash.  None if temp_db uses cybagoa, in which case the content
+        is an OpenAccess layout object.
+    """
+    content = master.get_content(temp_db.lib_name, lambda name: name)
+    if len(content) < 3:
+        # (cell name, cybagoa layout) tuple
+        return None
+    return _hash_content(content)
+
+
+def _hash_content(content):
+    # type: (Dict[str, Any]) -> str
+    """Returns the SHA-1 hash of the given JSON-serializable content."""
+    data = json.dumps(content, sort_keys=True, default=repr)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def _get_box_bounds(box):
+    # type: (Any) -> Optional[Tuple[int, int, int, int]]
+    """Returns the bounds of the given BBox in resolution units, or None."""
+    if box is None:
+        return None
+    return box.left_unit, box.bottom_unit, box.right_unit, box.top_unit
+
+
+def get_master_fingerprint(temp_db, master, fp_table=None):
+    # type: (TemplateDB, TemplateBase, Optional[Dict[Any, str]]) -> str
+    """Returns the fingerprint of the given layout master and all of its child masters.
+
+    Parameters
+    ----------
+    temp_db : TemplateDB
+        the template database containing the master.
+    master : TemplateBase
+        the layout master.
+    fp_table : Optional[Dict[Any, str]]
+        fingerprints of already visited masters of temp_db, keyed by master key.
+
+    Returns
+    -------
+    fingerprint : str
+        the fingerprint.
+    """
+    if fp_table is None:
+        fp_table = {}
+    key = master.key
+    fp = fp_table.get(key, None)
+    if fp is None:
+        child_list = []
+        for child_key in master.children():
+            child = temp_db.find_master(child_key)
+            child_list.append(get_master_fingerprint(temp_db, child, fp_table=fp_table))
+        layout_hash = get_layout_hash(temp_db, master)
+        if layout_hash is None:
+            layout_hash = get_source_hash(master.__class__)
+        content = dict(
+            key=key,
+            layout=layout_hash,
+            bound_box=_get_box_bounds(master.bound_box),
+            array_box=_get_box_bounds(master.array_box),
+            ports=sorted(master.port_names_iter()),
+            sch_params=getattr(master, 'sch_params', None),
+            children=sorted(child_list),
+        )
+        fp = fp_table[key] = _hash_content(content)
+    return fp
+
+
+def get_fingerprint(specs, master_fp, tech_fp, sch_fp):
+    # type: (Dict[str, Any], str, str, str) -> str
+    """Returns the verification fingerprint of the given cell.
+
+    Parameters
+    ----------
+    specs : Dict[str, Any]
+        the cell specification dictionary.
+    master_fp : str
+        the fingerprint of the layout master, from get_master_fingerprint().
+    tech_fp : str
+        the technology parameters hash, from get_tech_hash().
+    sch_fp : str
+        the schematic generator source hash, from get_package_hash().
+
+    Returns
+    -------
+    fingerprint : str
+        the fingerprint.
+    """
+    content = dict(
+        master=master_fp,
+        tech=tech_fp,
+        sch_source=sch_fp,
+        params=specs['params'],
+        routing_grid=specs['routing_grid'],
+        names=[specs['impl_lib'], specs['impl_cell'], specs['sch_lib'], specs['sch_cell']],
+    )
+    return _hash_content(content)
+
+
+def iter_masters(temp_db, master):
+    # type: (TemplateDB, TemplateBase) -> Iterable[TemplateBase]
+    """Iterate over the given layout master and all of its child masters, each once."""
+    visited = set()
+    stack = [master]
+    while stack:
+        cur = stack.pop()
+        if cur.key not in visited:
+            visited.add(cur.key)
+            yield cur
+            stack.extend((temp_db.find_master(child_key) for child_key in cur.children()))
+
+
+class VerifyScheduler(object):
+    """Regenerates and verifies only the cells whose fingerprints changed.
+
+    Parameters
+    ----------
+    session : GeneratorSession
+        the generator session used to create masters and write layouts and schematics.
+    runner : VerifyRunner
+        the verification runner, with an async_verify(lib_name, cell_name) coroutine that
+        returns (passed, log).
+    db_file : str
+        the JSON file storing verification results of each fingerprint.
+    sch_table : Optional[Dict[str, Tuple[str, str]]]
+        dictionary from layout generator class name to schematic (library, cell) names.
+        Generated masters of these classes are verified as separate cells.  The layout
+        class of each spec is added from its sch_lib and sch_cell entries.
+    """
+
+    def __init__(self, session, runner, db_file, sch_table=None):
+        # type: (GeneratorSession, VerifyRunner, str, Optional[Dict[str, Tuple[str, str]]]) -> None
+        self._session = session
+        self._runner = runner
+        self._db_file = db_file
+        self._sch_table = {} if sch_table is None else dict(sch_table)
+        if os.path.isfile(db_file):
+            with open(db_file, 'r') as f:
+                self._db = json.load(f)
+        else:
+            self._db = {}
+
+    def _save_db(self):
+        # type: () -> None
+        tmp_file = self._db_file + '.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self._db, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self._db_file)
+
+    def run(self, specs_list, force=False):
+        # type: (Sequence[Dict[str, Any]], bool) -> Dict[str, Dict[str, Any]]
+        """Verify the given cells and all of their generated masters with a schematic.
+
+        Parameters
+        ----------
+        specs_list : Sequence[Dict[str, Any]]
+            list of cell specification dictionaries.
+        force : bool
+            True to verify all cells, even if their fingerprints did not change.
+
+        Returns
+        -------
+        results : Dict[str, Dict[str, Any]]
+            dictionary from cell name to result dictionary, with entries 'fingerprint',
+            'passed', 'log', 'time' (verification time in seconds), and 'cached' (True if
+            the result is from a previous run).
+        """
+        for specs in specs_list:
+            self._sch_table[specs['layout_class']] = (specs['sch_lib'], specs['sch_cell'])
+
+        # master fingerprints and technology hash of each TemplateDB.
+        fp_tables = {}  # type: Dict[int, Tuple[Dict[Any, str], str]]
+        sch_fp = get_package_hash(['BagModules'])
+        results = {}  # type: Dict[str, Dict[str, Any]]
+        run_list = []  # type: List[Tuple[str, str]]
+        coro_list = []
+        scheduled = set()
+        for specs in specs_list:
+            impl_lib = specs['impl_lib']
+            temp_db, top_master = self._session.new_template(specs)
+            db_info = fp_tables.get(id(temp_db), None)
+            if db_info is None:
+                db_info = fp_tables[id(temp_db)] = ({}, get_tech_hash(temp_db))
+            fp_table, tech_fp = db_info
+            get_master_fingerprint(temp_db, top_master, fp_table=fp_table)
+
+            job_list = []
+            for master in iter_masters(temp_db, top_master):
+                if master is top_master:
+                    cell_specs = specs
+                else:
+                    sch_info = self._sch_table.get(master.__class__.__name__, None)
+                    sch_params = getattr(master, 'sch_params', None)
+                    if sch_info is None or sch_params is None:
+                        continue
+                    cell_specs = dict(impl_lib=impl_lib,
+                                      impl_cell=master.cell_name + VERIFY_SUFFIX,
+                                      sch_lib=sch_info[0], sch_cell=sch_info[1], params=None,
+                                      routing_grid=specs['routing_grid'])
+                impl_cell = cell_specs['impl_cell']
+                fp = get_fingerprint(cell_specs, fp_table[master.key], tech_fp, sch_fp)
+                cache_val = self._db.get(fp, None)
+                if cache_val is not None and not force:
+                    results[impl_cell] = dict(cache_val, fingerprint=fp, cached=True)
+                elif fp not in scheduled:
+                    scheduled.add(fp)
+                    job_list.append((master, cell_specs, fp))
+
+            for master, cell_specs, fp in job_list:
+                impl_cell = cell_specs['impl_cell']
+                if master is top_master:
+                    self._session.run_job(dict(specs=specs, gen_lay=True, gen_sch=True))
+                else:
+                    self._write_cell(temp_db, master, cell_specs)
+                run_list.append((impl_cell, fp))
+                coro_list.append(self._verify(impl_lib, impl_cell))
+
+        if coro_list:
+            # run in this thread; batch_async_task() uses the current thread's event loop.
+            result_list = batch_async_task(coro_list)
+            if result_list is None:
+                self._save_db()
+                raise ValueError('Verification was cancelled.')
+            for (impl_cell, fp), result in zip(run_list, result_list):
+                if isinstance(result, Exception):
+                    passed, log, run_time = False, 'verification error: %r' % result, 0.0
+                else:
+                    passed, log, run_time = result
+                self._db[fp] = dict(cell=impl_cell, passed=passed, log=log, time=run_time)
+                results[impl_cell] = dict(self._db[fp], fingerprint=fp, cached=False)
+
+        self._save_db()
+        return results
+
+    def _write_cell(self, temp_db, master, cell_specs):
+        # type: (TemplateDB, TemplateBase, Dict[str, Any]) -> None
+        """Write the layout and schematic of a generated master to its verification cell.
+
+        Child layout cells keep their names, and have the same content as the ones written
+        for the top cell.  Child schematic cells are suffixed with the verification cell
+        name, so they never replace the schematic cells written for the top cell.
+        """
+        prj = self._session.prj
+        impl_lib = cell_specs['impl_lib']
+        impl_cell = cell_specs['impl_cell']
+        temp_db.batch_layout(prj, [master], [impl_cell])
+        dsn = prj.create_design_module(cell_specs['sch_lib'], cell_specs['sch_cell'])
+        dsn.design(**master.sch_params)
+        dsn.implement_design(impl_lib, top_cell_name=impl_cell, suffix='_' + impl_cell)
+
+    async def _verify(self, lib_name, cell_name):
+        # type: (str, str) -> Tuple[bool, str, float]
+        t0 = time.time()
+        passed, log = await self._runner.async_verify(lib_name, cell_name)
+        return passed, log, time.time() - t0
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+
+"""Check that compact arrayed instances match the per-instance expansion they replace.
+
+The transistor stacks are designed with compact=True and compact=False.  For res_term_diff,
+the per-branch expansion is rebuilt on a designed copy.  Each pair of designs is reduced to
+series chains of devices between pins, and the chain lists are compared, so only the names
+of internal nets may differ.  Exits with status 1 if any design does not match.
+
+Example::
+
+    python scripts_test/array_equiv_check.py
+"""
+
+from typing import Dict, Any, List, Tuple
+
+import sys
+from collections import Counter
+
+from analog_ec.netlist import NetlistDB, NetlistModule
+from BagModules.bag_analog_ec.design_cache import freeze_params
+
+# the two terminals of the device channel, by primitive cell name prefix.
+_chain_terms = {
+    'nmos4': ('S', 'D'),
+    'pmos4': ('S', 'D'),
+    'res': ('PLUS', 'MINUS'),
+}
+
+
+def get_chain_list(master):
+    # type: (NetlistModule) -> Counter
+    """Returns the series device chains between pins of the given flat module.
+
+    Each chain is (start net, devices, end net), where each device is (cell name,
+    parameters, entry terminal, other terminal connections).  Chains are stored in the
+    direction with the smaller representation.
+    """
+    pin_set = set(master.get_pin_bits())
+    dev_list = []  # type: List[Tuple[str, Any, Dict[str, str]]]
+    for inst in master.get_all_instances():
+        if inst.master is not None:
+            raise ValueError('Instance %s is not a primitive.' % inst.name)
+        par_key = freeze_params(inst.parameters)
+        for _, conns in master.get_inst_conns(inst):
+            dev_list.append((inst.cell_name, par_key, dict(conns)))
+
+    # map internal nets to the device terminals on them
+    net_table = {}  # type: Dict[str, List[Tuple[int, str]]]
+    for dev_idx, (cell_name, _, conns) in enumerate(dev_list):
+        term0, term1 = _chain_terms[cell_name.split('_', 1)[0]]
+        for term, net in conns.items():
+            if net in pin_set:
+                continue
+            if term != term0 and term != term1:
+                raise ValueError('Terminal %s of a %s device is on internal net %s.'
+                                 % (term, cell_name, net))
+            net_table.setdefault(net, []).append((dev_idx, term))
+    for net, term_list in net_table.items():
+        if len(term_list) != 2:
+            raise ValueError('Internal net %s is not between two devices.' % net)
+
+    visited = set()
+    chain_list = Counter()
+    for start_idx, (cell_name, _, conns) in enumerate(dev_list):
+        if start_idx in visited:
+            continue
+        for start_term in _chain_terms[cell_name.split('_', 1)[0]]:
+            if conns[start_term] in pin_set:
+                break
+        else:
+            # every device in a chain ending on pins is visited from its start.
+            continue
+
+        start_net = conns[start_term]
+        dev_idx, term = start_idx, start_term
+        devices = []
+        while True:
+            visited.add(dev_idx)
+            cell_name, par_key, conns = dev_list[dev_idx]
+            term0, term1 = _chain_terms[cell_name.split('_', 1)[0]]
+            other = term1 if term == term0 else term0
+            side = tuple(sorted(((key, val) for key, val in conns.items()
+                                 if key != term0 and key != term1)))
+            devices.append((cell_name, par_key, term, side))
+            net = conns[other]
+            if net in pin_set:
+                break
+            dev_idx, term = [item for item in net_table[net] if item[0] != dev_idx][0]
+
+        fwd = (start_net, tuple(devices), net)
+        rev_devices = []
+        for cell_name, par_key, term, side in reversed(devices):
+            term0, term1 = _chain_terms[cell_name.split('_', 1)[0]]
+            rev_devices.append((cell_name, par_key, term1 if term == term0 else term0, side))
+        rev = (net, tuple(rev_devices), start_net)
+        chain_list[min(repr(fwd), repr(rev))] += 1
+
+    if len(visited) != len(dev_list):
+        raise ValueError('Some devices are not in a chain between pins.')
+    return chain_list
+
+
+def compare(title, master, ref_master):
+    # type: (str, NetlistModule, NetlistModule) -> bool
+    """Print and returns whether the two modules have the same pins and device chains."""
+    if set(master.get_pin_bits()) != set(ref_master.get_pin_bits()):
+        msg = 'pin mismatch'
+    else:
+        try:
+            same = get_chain_list(master) == get_chain_list(ref_master)
+        except ValueError as ex:
+            msg = 'connectivity mismatch: %s' % ex
+        else:
+            msg = '' if same else 'connectivity mismatch'
+    print('%-60s %s' % (title, msg or 'ok'))
+    return not msg
+
+
+def expand_res_term_diff(master, nser, npar, sub_name):
+    # type: (NetlistModule, int, int, str) -> None
+    """Replace the arrayed resistors of res_term_diff with one arrayed instance per branch."""
+    for inst_name, in_name, mid_name in (('RP', 'inp', 'midp'), ('RN', 'inn', 'midn')):
+        name_list = []
+        term_list = []
+        for par_idx in range(npar):
+            if nser == 2:
+                pos_name = '%s,%s%d' % (in_name, mid_name, par_idx)
+                neg_name = '%s%d,incm' % (mid_name, par_idx)
+            else:
+                pos_name = '%s,%s%d<%d:0>' % (in_name, mid_name, par_idx, nser - 2)
+                neg_name = '%s%d<%d:0>,incm' % (mid_name, par_idx, nser - 2)
+            if sub_name and sub_name != 'VSS':
+                term_dict = dict(PLUS=pos_name, MINUS=neg_name, BULK=sub_name)
+            else:
+                term_dict = dict(PLUS=pos_name, MINUS=neg_name)
+            name_list.append('%s%d<%d:0>' % (inst_name, par_idx, nser - 1))
+            term_list.append(term_dict)
+
+        master.array_instance(inst_name, name_list, term_list=term_list)
+
+
+def run_main():
+    # type: () -> int
+    num_fail = 0
+    for cell_name in ('nch_stack', 'pch_stack'):
+        seg_min = 1 if cell_name == 'nch_stack' else 2
+        for stack in range(2, 5):
+            for seg in range(seg_min, 5):
+                params = dict(w=4, l=20e-9, seg=seg, intent='standard', stack=stack)
+                master = NetlistDB().new_master('bag_analog_ec', cell_name,
+                                                dict(params, compact=True))
+                ref = NetlistDB().new_master('bag_analog_ec', cell_name,
+                                             dict(params, compact=False))
+                title = '%s stack=%d seg=%d' % (cell_name, stack, seg)
+                if not compare(title, master, ref):
+                    num_fail += 1
+
+    for sub_name in ('VSS', 'VSUB'):
+        for nser in range(2, 5):
+            for npar in range(1, 5):
+                params = dict(l=2e-6, w=0.5e-6, intent='standard', nser=nser, npar=npar,
+                              ndum=2, sub_name=sub_name)
+                master = NetlistDB().new_master('bag_analog_ec', 'res_term_diff', params)
+                ref = NetlistDB().new_master('bag_analog_ec', 'res_term_diff', params)
+                expand_res_term_diff(ref, nser, npar, sub_name)
+                title = 'res_term_diff nser=%d npar=%d sub_name=%s' % (nser, npar, sub_name)
+                if not compare(title, master, ref):
+                    num_fail += 1
+
+    return num_fail
+
+
+if __name__ == '__main__':
+    if run_main() > 0:
+        sys.exit(1)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""Generate layouts of many spec files in one process.
+
+All specs share one BagProject, and specs with the same library and routing grid share one
+TemplateDB, so identical masters are only drawn once.  Use --lib to put every cell in the
+same library, which lets all specs with the same routing grid share masters.
+
+Example::
+
+    python scripts_test/batch_gen.py --lib AAAFOO_BATCH specs_test_sample/*.yaml
+"""
+
+import argparse
+
+from bag.core import BagProject
+
+from analog_ec.generator import GeneratorSession, load_specs
+
+
+def parse_options():
+    parser = argparse.ArgumentParser(description='Generate layouts of many spec files.')
+    parser.add_argument('specs_files', nargs='+', help='YAML specification files.')
+    parser.add_argument('--lib', dest='impl_lib', default=None,
+                        help='Generate all cells in this library.')
+    return parser.parse_args()
+
+
+def run_main(prj, args):
+    specs_list = []
+    for fname in args.specs_files:
+        specs = load_specs(fname)
+        if 'layout_class' not in specs:
+            print('skipping %s: no layout_class entry.' % fname)
+            continue
+        if args.impl_lib is not None:
+            specs['impl_lib'] = args.impl_lib
+        specs_list.append(specs)
+
+    session = GeneratorSession(prj)
+    time_list = session.batch_generate(specs_list)
+
+    total = 0.0
+    for name, cur_time in time_list:
+        print('%-40s %8.3f s' % (name, cur_time))
+        total += cur_time
+    print('%-40s %8.3f s' % ('total', total))
+
+
+if __name__ == '__main__':
+    cmd_args = parse_options()
+
+    local_dict = locals()
+    if 'bprj' not in local_dict:
+        print('creating BAG project')
+        bprj = BagProject()
+
+    else:
+        print('loading BAG project')
+        bprj = local_dict['bprj']
+
+    run_main(bprj, cmd_args)
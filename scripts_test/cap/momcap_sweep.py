@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""Characterize MOMCapCore layouts over a grid of sizes and layers.
+
+Each unique parameter set is generated once in a process pool.  Every worker keeps
+its own BagProject and TemplateDB, and no layout is written to the database.
+"""
+
+import csv
+import json
+import hashlib
+import itertools
+import multiprocessing
+
+import yaml
+
+from bag.core import BagProject
+from bag.layout import RoutingGrid, TemplateDB
+
+from analog_ec.layout.passives.capacitor.momcap import MOMCapCore
+
+_temp_db = None
+
+
+def make_tdb(prj, target_lib, specs):
+    grid_specs = specs['routing_grid']
+    layers = grid_specs['layers']
+    spaces = grid_specs['spaces']
+    widths = grid_specs['widths']
+    bot_dir = grid_specs['bot_dir']
+
+    routing_grid = RoutingGrid(prj.tech_info, layers, spaces, widths, bot_dir)
+    tdb = TemplateDB('template_libs.def', routing_grid, target_lib, use_cybagoa=True)
+    return tdb
+
+
+def get_params_key(params):
+    """Returns a hash of the given parameter dictionary."""
+    params_str = json.dumps(params, sort_keys=True)
+    return hashlib.md5(params_str.encode('utf-8')).hexdigest()
+
+
+def get_sweep_params(specs):
+    """Returns a dictionary from parameter hash to MOMCapCore parameters."""
+    base_params = specs['params']
+    sweep = specs['sweep']
+
+    params_table = {}
+    for width, height, (bot_layer, top_layer) in itertools.product(sweep['width'],
+                                                                   sweep['height'],
+                                                                   sweep['layers']):
+        params = base_params.copy()
+        params['width'] = width
+        params['height'] = height
+        params['bot_layer'] = bot_layer
+        params['top_layer'] = top_layer
+        params['show_pins'] = False
+        params_table[get_params_key(params)] = params
+
+    return params_table
+
+
+def init_worker(specs):
+    global _temp_db
+    prj = BagProject()
+    _temp_db = make_tdb(prj, specs['impl_lib'], specs)
+
+
+def characterize(key_params):
+    key, params = key_params
+    master = _temp_db.new_template(params=params, temp_cls=MOMCapCore)
+    bnd_box = master.bound_box
+    sch_params = master.sch_params
+    return dict(
+        key=key,
+        width=params['width'],
+        height=params['height'],
+        bot_layer=params['bot_layer'],
+        top_layer=params['top_layer'],
+        bbox_w=bnd_box.width,
+        bbox_h=bnd_box.height,
+        area=bnd_box.width * bnd_box.height,
+        res_in_info=sch_params['res_in_info'],
+        res_out_info=sch_params['res_out_info'],
+    )
+
+
+def run_sweep(specs):
+    num_workers = specs.get('num_workers', multiprocessing.cpu_count())
+    results_fname = specs['results_fname']
+
+    params_table = get_sweep_params(specs)
+    print('characterizing %d unique MOM caps with %d workers' % (len(params_table),
+                                                                  num_workers))
+    pool = multiprocessing.Pool(processes=num_workers, initializer=init_worker,
+                                initargs=(specs,))
+    try:
+        results = pool.map(characterize, sorted(params_table.items()), chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    fields = ['key', 'width', 'height', 'bot_layer', 'top_layer', 'bbox_w', 'bbox_h',
+              'area', 'res_in_info', 'res_out_info']
+    with open(results_fname, 'w') as f:
+        writer = csv.DictWriter(f, fields)
+        writer.writeheader()
+        for row in sorted(results, key=lambda x: (x['bot_layer'], x['top_layer'],
+                                                  x['width'], x['height'])):
+            writer.writerow(row)
+
+    print('results written to %s' % results_fname)
+
+
+if __name__ == '__main__':
+    with open('specs_test/analog_ec/cap/momcap_sweep.yaml', 'r') as f:
+        block_specs = yaml.load(f)
+
+    run_sweep(block_specs)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""Compare estimate_size() of layout generators against the drawn bounding boxes.
+
+For every spec file, the layout master is created and its bounding box is compared with the
+box returned by the estimate_size() class method of its layout class.  For layouts with
+clkp/clkn pins whose class has get_size_info(), such as HighPassArrayClk, the estimated
+clock track indices are also compared with the drawn pins.  This checks the assumption
+that the MOM cap clock ports start at the cap bottom edge.  Use --set to override layout
+parameters, for example to check the wrapped configuration of passives with substrate
+contacts.  Exits with status 1 if any estimate does not match.
+
+Example::
+
+    python scripts_test/estimate_check.py specs_test_sample/res/*.yaml
+    python scripts_test/estimate_check.py --set sub_w=0.5e-6 specs_test_sample/res/termination.yaml
+    python scripts_test/estimate_check.py specs_test_sample/filter/hp_array_clk.yaml
+"""
+
+import sys
+import inspect
+import argparse
+
+import yaml
+
+from bag.core import BagProject
+
+from analog_ec.generator import GeneratorSession, get_template_class, load_specs
+
+
+def parse_options():
+    parser = argparse.ArgumentParser(description='Compare estimate_size() with drawn layouts.')
+    parser.add_argument('specs_files', nargs='+', help='YAML specification files.')
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        help='layout parameter override, as name=value.')
+    return parser.parse_args()
+
+
+def get_estimate(temp_cls, temp_db, params):
+    """Call estimate_size() with a TemplateDB or a RoutingGrid, whichever it takes."""
+    arg_name = list(inspect.signature(temp_cls.estimate_size).parameters)[0]
+    if arg_name == 'temp_db':
+        return temp_cls.estimate_size(temp_db, params)
+    return temp_cls.estimate_size(temp_db.grid, params)
+
+
+def get_clock_tracks(temp_cls, temp_db, params, master):
+    """Returns the estimated and drawn clkp/clkn track indices, or None if not applicable."""
+    if not hasattr(temp_cls, 'get_size_info') or not master.has_port('clkp'):
+        return None
+    est_info = temp_cls.get_size_info(temp_db.grid, params)
+    est_tracks = (est_info[1], est_info[2])
+    drawn_tracks = tuple(master.get_port(name).get_pins()[0].track_id.base_index
+                         for name in ('clkp', 'clkn'))
+    return est_tracks, drawn_tracks
+
+
+def run_main(prj, args):
+    overrides = {}
+    for item in args.overrides:
+        key, val = item.split('=', 1)
+        overrides[key] = yaml.load(val)
+
+    session = GeneratorSession(prj)
+    num_fail = 0
+    for fname in args.specs_files:
+        specs = load_specs(fname)
+        if 'layout_class' not in specs:
+            print('skipping %s: no layout_class entry.' % fname)
+            continue
+        temp_cls = get_template_class(specs)
+        if not hasattr(temp_cls, 'estimate_size'):
+            print('skipping %s: %s has no estimate_size().' % (fname, temp_cls.__name__))
+            continue
+
+        specs['params'].update(overrides)
+        temp_db, master = session.new_template(specs, temp_cls=temp_cls)
+        est_box = get_estimate(temp_cls, temp_db, specs['params'])
+        bnd_box = master.bound_box
+        est_size = (est_box.width_unit, est_box.height_unit)
+        bnd_size = (bnd_box.width_unit, bnd_box.height_unit)
+        if est_size == bnd_size:
+            status = 'ok'
+        else:
+            status = 'MISMATCH'
+            num_fail += 1
+        print('%-40s %-8s estimate = %s, drawn = %s' % (specs['impl_cell'], status,
+                                                         est_size, bnd_size))
+
+        clk_info = get_clock_tracks(temp_cls, temp_db, specs['params'], master)
+        if clk_info is not None:
+            est_tracks, drawn_tracks = clk_info
+            if est_tracks == drawn_tracks:
+                status = 'ok'
+            else:
+                status = 'MISMATCH'
+                num_fail += 1
+            print('%-40s %-8s clock tracks estimate = %s, drawn = %s'
+                  % (specs['impl_cell'], status, est_tracks, drawn_tracks))
+
+    return num_fail
+
+
+if __name__ == '__main__':
+    cmd_args = parse_options()
+
+    local_dict = locals()
+    if 'bprj' not in local_dict:
+        print('creating BAG project')
+        bprj = BagProject()
+
+    else:
+        print('loading BAG project')
+        bprj = local_dict['bprj']
+
+    if run_main(bprj, cmd_args) > 0:
+        sys.exit(1)
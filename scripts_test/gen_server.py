@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""A local layout generation server that keeps BAG state warm between jobs.
+
+The server holds one BagProject and a GeneratorSession, so tech information, routing grids,
+and TemplateDBs (with all previously created masters) are reused by every job.  It only
+listens on the loopback interface.
+
+Before every job, the session checks the source files of the generator packages it has
+imported.  If any file changed, all TemplateDBs are dropped and the packages are imported
+again.  POST to /reload to force a reload.  Changes to the bag package itself need a server
+restart.
+
+Send a job by POSTing a JSON object to /generate::
+
+    {"specs": {...cell specs with layout_package/layout_class...},
+     "gen_lay": true, "gen_sch": false}
+
+or a spec file name to /generate_file::
+
+    {"specs_file": "specs_test_sample/clk_inv_amp.yaml", "gen_lay": true,
+     "impl_lib": "AAAFOO_ITER", "impl_cell": "CLK_INV_AMP_V2"}
+
+impl_lib and impl_cell override the output names of the specs.  With "gen_lay": false the
+job only designs the schematic; if the job also has a "sch_params" entry, no layout master
+is created at all.  See GeneratorSession.run_job() for all job entries.
+
+The response is a JSON object with the bounding box, schematic parameters, library/cell
+names, and run time, or {"error": message} on failure.  POST to /shutdown to stop.
+"""
+
+import json
+import argparse
+import threading
+import traceback
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from bag.core import BagProject
+
+from analog_ec.generator import GeneratorSession, load_specs
+
+
+class GeneratorHandler(BaseHTTPRequestHandler):
+    """Handles generation requests.  Jobs run one at a time in the server thread."""
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            job = json.loads(self.rfile.read(length).decode('utf-8')) if length > 0 else {}
+            if self.path == '/generate':
+                result = self.server.session.run_job(job)
+            elif self.path == '/generate_file':
+                job = dict(job, specs=load_specs(job['specs_file']))
+                result = self.server.session.run_job(job)
+            elif self.path == '/reload':
+                self.server.session.reload()
+                result = dict(status='reloaded')
+            elif self.path == '/shutdown':
+                result = dict(status='shutting down')
+                threading.Thread(target=self.server.shutdown).start()
+            else:
+                self.send_error(404, 'Unknown path %s' % self.path)
+                return
+            code = 200
+        except Exception as ex:
+            traceback.print_exc()
+            result = dict(error='%s: %s' % (type(ex).__name__, ex))
+            code = 500
+
+        content = json.dumps(result, default=str).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+def run_server(prj, port):
+    server = HTTPServer(('127.0.0.1', port), GeneratorHandler)
+    server.session = GeneratorSession(prj, auto_reload=True)
+    print('generator server listening on 127.0.0.1:%d' % port)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a local layout generation server.')
+    parser.add_argument('--port', type=int, default=8765, help='the port to listen on.')
+    cmd_args = parser.parse_args()
+
+    local_dict = locals()
+    if 'bprj' not in local_dict:
+        print('creating BAG project')
+        bprj = BagProject()
+
+    else:
+        print('loading BAG project')
+        bprj = local_dict['bprj']
+
+    run_server(bprj, cmd_args.port)
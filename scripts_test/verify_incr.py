@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""Incrementally verify the cells of many spec files.
+
+Only cells whose layout masters, including all sub-masters, changed since the last run are
+regenerated and verified.  Generated sub-masters whose layout class is listed in the
+--sch-table YAML file, a dictionary from layout class name to [sch_lib, sch_cell], are
+verified as separate cells.  Use --cmd to replace LVS with a local command,
+where {lib} and {cell} are replaced by the library and cell names.  Layouts are written
+without cybagoa, so masters are fingerprinted from their drawn layout content.
+
+Example::
+
+    python scripts_test/verify_incr.py specs_test/res/termination.yaml
+    python scripts_test/verify_incr.py --workers 4 --cmd "echo {lib} {cell}" specs_test/res/*.yaml
+    python scripts_test/verify_incr.py --sch-table sch_table.yaml specs_test/dac/*.yaml
+"""
+
+import shlex
+import argparse
+
+from bag.core import BagProject
+
+from analog_ec.generator import GeneratorSession, load_specs
+from analog_ec.verify import VerifyScheduler, CommandRunner, BagRunner
+
+
+def parse_options():
+    parser = argparse.ArgumentParser(description='Incrementally verify many spec files.')
+    parser.add_argument('specs_files', nargs='+', help='YAML specification files.')
+    parser.add_argument('--db', dest='db_file', default='verify_db.json',
+                        help='verification result file.')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='maximum number of concurrent --cmd runs.  LVS/RCX runs are '
+                             'bounded by the BAG configuration.')
+    parser.add_argument('--cmd', default=None, help='local verification command.')
+    parser.add_argument('--rcx', action='store_true', help='run RCX after LVS.')
+    parser.add_argument('--force', action='store_true', help='verify all cells.')
+    parser.add_argument('--sch-table', dest='sch_table', default=None,
+                        help='YAML file mapping layout class names to [sch_lib, sch_cell].')
+    return parser.parse_args()
+
+
+def run_main(prj, args):
+    specs_list = []
+    for fname in args.specs_files:
+        specs = load_specs(fname)
+        if 'layout_class' not in specs:
+            print('skipping %s: no layout_class entry.' % fname)
+            continue
+        specs_list.append(specs)
+
+    if args.cmd is None:
+        runner = BagRunner(prj, rcx=args.rcx)
+    else:
+        runner = CommandRunner(shlex.split(args.cmd), max_workers=args.workers)
+
+    sch_table = None if args.sch_table is None else load_specs(args.sch_table)
+    session = GeneratorSession(prj, use_cybagoa=False)
+    sched = VerifyScheduler(session, runner, args.db_file, sch_table=sch_table)
+    results = sched.run(specs_list, force=args.force)
+    for cell_name, info in results.items():
+        status = 'passed' if info['passed'] else 'FAILED'
+        src = 'cached' if info['cached'] else '%.3f s' % info['time']
+        print('%-40s %-8s %s' % (cell_name, status, src))
+
+
+if __name__ == '__main__':
+    cmd_args = parse_options()
+
+    local_dict = locals()
+    if 'bprj' not in local_dict:
+        print('creating BAG project')
+        bprj = BagProject()
+
+    else:
+        print('loading BAG project')
+        bprj = local_dict['bprj']
+
+    run_main(bprj, cmd_args)